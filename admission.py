@@ -0,0 +1,398 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, session
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+from models import db, AdmissionState
+from database import begin_write
+from jobs import periodic_task
+
+# Seconds between two deletions of idle waiting rooms from the database store
+ADMISSION_PRUNE_INTERVAL = 3600
+
+# Seconds without any visitor after which an event's waiting room is dropped
+ADMISSION_IDLE_TTL = 3600
+
+
+# Helper function to refill an event's token bucket and admit the next tickets in line.
+# Tokens accumulate at rate per second up to burst, and each token admits one ticket,
+# in the order the tickets were handed out. Returns (tokens, next_ticket, serving).
+def _advance(tokens, elapsed, next_ticket, serving, rate, burst, new_ticket):
+    tokens = min(burst, tokens + max(elapsed, 0) * rate)
+    if new_ticket:
+        next_ticket += 1
+    admitted = min(int(tokens), next_ticket - serving)
+    return tokens - admitted, next_ticket, serving + admitted
+
+
+class AdmissionStore:
+    """
+    Interface for the state of the per-event waiting rooms. Buyers take numbered
+    tickets; a ticket may book once the event's "now serving" number reaches it.
+    take() atomically refills the event's token bucket, admits as many waiting tickets
+    as there are tokens, optionally hands out a new ticket, and returns the last ticket
+    handed out and the serving number.
+    """
+
+    def __init__(self, rate=5.0, burst=10):
+        self.rate = rate
+        self.burst = burst
+
+    def take(self, event_id, new_ticket):
+        raise NotImplementedError
+
+    def is_sold_out(self, event_id):
+        raise NotImplementedError
+
+    def mark_sold_out(self, event_id, ttl):
+        raise NotImplementedError
+
+    def reopen(self, event_id):
+        raise NotImplementedError
+
+
+class MemoryAdmissionStore(AdmissionStore):
+    """
+    In-process store for a single server, keeping the waiting rooms of the
+    max_entries most recently booked events.
+    """
+
+    def __init__(self, rate=5.0, burst=10, max_entries=10000):
+        super().__init__(rate, burst)
+        self.max_entries = max_entries
+        self._rooms = OrderedDict()
+        self._sold_out = {}
+        self._lock = threading.Lock()
+
+    def take(self, event_id, new_ticket):
+        now = time.monotonic()
+        with self._lock:
+            tokens, refilled_at, next_ticket, serving = self._rooms.get(
+                event_id, (self.burst, now, 0, 0)
+            )
+            tokens, next_ticket, serving = _advance(
+                tokens,
+                now - refilled_at,
+                next_ticket,
+                serving,
+                self.rate,
+                self.burst,
+                new_ticket,
+            )
+            self._rooms[event_id] = (tokens, now, next_ticket, serving)
+            self._rooms.move_to_end(event_id)
+            while len(self._rooms) > self.max_entries:
+                self._rooms.popitem(last=False)
+        return next_ticket, serving
+
+    def is_sold_out(self, event_id):
+        expires_at = self._sold_out.get(event_id)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def mark_sold_out(self, event_id, ttl):
+        with self._lock:
+            self._sold_out[event_id] = time.monotonic() + ttl
+            if len(self._sold_out) > self.max_entries:
+                now = time.monotonic()
+                self._sold_out = {
+                    key: value for key, value in self._sold_out.items() if value > now
+                }
+
+    def reopen(self, event_id):
+        with self._lock:
+            self._sold_out.pop(event_id, None)
+
+
+class DatabaseAdmissionStore(AdmissionStore):
+    """
+    Stores the waiting rooms in the admission_state table, shared by every server
+    using the database. Each call is a short transaction of its own, outside the ORM
+    session of the request, that locks the event's row (the database on SQLite).
+    Idle rows are deleted by the worker.
+    """
+
+    def take(self, event_id, new_ticket):
+        now = datetime.utcnow()
+        with Session(db.engine) as transaction:
+            begin_write(transaction)
+            state = transaction.execute(
+                select(AdmissionState)
+                .where(AdmissionState.event_id == event_id)
+                .with_for_update()
+            ).scalar()
+            if state is None:
+                state = AdmissionState(
+                    event_id=event_id,
+                    tokens=self.burst,
+                    next_ticket=0,
+                    serving=0,
+                    refilled_at=now,
+                )
+                transaction.add(state)
+            state.tokens, state.next_ticket, state.serving = _advance(
+                state.tokens,
+                (now - state.refilled_at).total_seconds(),
+                state.next_ticket,
+                state.serving,
+                self.rate,
+                self.burst,
+                new_ticket,
+            )
+            state.refilled_at = now
+            result = state.next_ticket, state.serving
+            transaction.commit()
+        return result
+
+    def is_sold_out(self, event_id):
+        with db.engine.connect() as connection:
+            return (
+                connection.execute(
+                    select(AdmissionState.event_id).where(
+                        AdmissionState.event_id == event_id,
+                        AdmissionState.sold_out_until > datetime.utcnow(),
+                    )
+                ).first()
+                is not None
+            )
+
+    def mark_sold_out(self, event_id, ttl):
+        sold_out_until = datetime.utcnow() + timedelta(seconds=ttl)
+        with db.engine.begin() as connection:
+            marked = connection.execute(
+                update(AdmissionState)
+                .where(AdmissionState.event_id == event_id)
+                .values(sold_out_until=sold_out_until)
+            ).rowcount
+            if not marked:
+                # Events booked without going through the waiting room have no row yet
+                connection.execute(
+                    insert(AdmissionState).values(
+                        event_id=event_id,
+                        tokens=self.burst,
+                        next_ticket=0,
+                        serving=0,
+                        refilled_at=datetime.utcnow(),
+                        sold_out_until=sold_out_until,
+                    )
+                )
+
+    def reopen(self, event_id):
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(AdmissionState)
+                .where(
+                    AdmissionState.event_id == event_id,
+                    AdmissionState.sold_out_until.is_not(None),
+                )
+                .values(sold_out_until=None)
+            )
+
+    def prune(self):
+        """
+        Deletes the waiting rooms nobody visited for ADMISSION_IDLE_TTL seconds and
+        returns how many there were.
+        """
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            return connection.execute(
+                delete(AdmissionState).where(
+                    AdmissionState.refilled_at
+                    < now - timedelta(seconds=ADMISSION_IDLE_TTL),
+                    or_(
+                        AdmissionState.sold_out_until.is_(None),
+                        AdmissionState.sold_out_until <= now,
+                    ),
+                )
+            ).rowcount
+
+
+# Redis version of take(): the same steps as _advance() run atomically on the server,
+# using the server clock so every web server refills the buckets at the same pace
+TAKE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'refilled_at', 'next_ticket', 'serving')
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = tonumber(state[1]) or burst
+local refilled_at = tonumber(state[2]) or now
+local next_ticket = (tonumber(state[3]) or 0) + tonumber(ARGV[3])
+local serving = tonumber(state[4]) or 0
+tokens = math.min(burst, tokens + math.max(now - refilled_at, 0) * rate)
+local admitted = math.min(math.floor(tokens), next_ticket - serving)
+tokens = tokens - admitted
+serving = serving + admitted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'refilled_at', tostring(now),
+    'next_ticket', next_ticket, 'serving', serving)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {next_ticket, serving}
+"""
+
+
+class RedisAdmissionStore(AdmissionStore):
+    """
+    Stores the waiting rooms in Redis (or any server speaking its protocol) for
+    several servers: a hash per event updated by a Lua script, and a key per sold-out
+    event expiring with its TTL.
+    """
+
+    def __init__(self, client, rate=5.0, burst=10, prefix="admission:"):
+        super().__init__(rate, burst)
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def _sold_out_key(self, event_id):
+        return f"{self.prefix}{event_id}:sold_out"
+
+    def take(self, event_id, new_ticket):
+        next_ticket, serving = self._take(
+            keys=[f"{self.prefix}{event_id}"],
+            args=[self.rate, self.burst, int(new_ticket), ADMISSION_IDLE_TTL],
+        )
+        return int(next_ticket), int(serving)
+
+    def is_sold_out(self, event_id):
+        return bool(self.client.exists(self._sold_out_key(event_id)))
+
+    def mark_sold_out(self, event_id, ttl):
+        self.client.setex(self._sold_out_key(event_id), ttl, 1)
+
+    def reopen(self, event_id):
+        self.client.delete(self._sold_out_key(event_id))
+
+
+# Helper function to connect to Redis only when the redis backend is selected
+def _redis_client(url):
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError(
+            "The redis admission backend needs the redis package (pip install redis)."
+        )
+    return redis.Redis.from_url(url)
+
+
+def create_admission_store(config):
+    """
+    Returns the store selected by ADMISSION_BACKEND: "memory", "database" or "redis".
+    Returns None for "off", which lets every booking through to the database.
+    """
+    backend = config["ADMISSION_BACKEND"]
+    options = {"rate": config["ADMISSION_RATE"], "burst": config["ADMISSION_BURST"]}
+    if backend == "memory":
+        return MemoryAdmissionStore(**options)
+    if backend == "database":
+        return DatabaseAdmissionStore(**options)
+    if backend == "redis":
+        return RedisAdmissionStore(
+            _redis_client(config["ADMISSION_REDIS_URL"]), **options
+        )
+    if backend != "off":
+        raise ValueError(f"Unknown ADMISSION_BACKEND {backend!r}.")
+    return None
+
+
+def init_app(app):
+    """
+    Sets up the admission store selected by ADMISSION_BACKEND.
+    """
+    app.extensions["admission"] = create_admission_store(app.config)
+
+
+# Helper function to get the configured store, or None when admission control is off
+def _store():
+    return current_app.extensions.get("admission")
+
+
+def is_sold_out(event_id):
+    """
+    True when the last booking filled the event, so new bookings can be turned away
+    without querying the events table.
+    """
+    store = _store()
+    return store is not None and store.is_sold_out(event_id)
+
+
+def mark_sold_out(event_id):
+    """
+    Records that an event has no seats left, for ADMISSION_SOLD_OUT_TTL seconds.
+    """
+    store = _store()
+    if store is not None:
+        store.mark_sold_out(event_id, current_app.config["ADMISSION_SOLD_OUT_TTL"])
+
+
+def reopen(event_id):
+    """
+    Clears the sold-out mark of an event after seats were released or added.
+    """
+    store = _store()
+    if store is not None:
+        store.reopen(event_id)
+
+
+def admit(event_id, seats=None):
+    """
+    Lets the current user through to book seats on an event, or puts them in the
+    event's waiting room. The user's ticket is kept in the session, so repeated
+    requests keep their place in line; a ticket is used up once it is admitted.
+    Returns 0 when the user may book now, otherwise their position in line.
+    """
+    store = _store()
+    if store is None:
+        return 0
+
+    ticket = session.get("admission")
+    if ticket is not None and ticket["event_id"] == event_id:
+        if seats is None:
+            seats = ticket["seats"]
+        number = ticket["number"]
+        next_ticket, serving = store.take(event_id, new_ticket=False)
+        # The waiting room was dropped while idle, so the old number means nothing
+        if number > next_ticket:
+            number, serving = store.take(event_id, new_ticket=True)
+    else:
+        number, serving = store.take(event_id, new_ticket=True)
+
+    if number <= serving:
+        session.pop("admission", None)
+        return 0
+    session["admission"] = {"event_id": event_id, "number": number, "seats": seats}
+    return number - serving
+
+
+def waiting_ticket(event_id):
+    """
+    Returns the session's waiting room ticket for an event, or None.
+    """
+    ticket = session.get("admission")
+    if ticket is not None and ticket["event_id"] == event_id:
+        return ticket
+    return None
+
+
+def queue_position(event_id):
+    """
+    Returns the current user's position in an event's waiting room without using up
+    their ticket: 0 once they may book. The polling itself admits the next tickets.
+    """
+    store = _store()
+    ticket = waiting_ticket(event_id)
+    if store is None or ticket is None:
+        return 0
+    next_ticket, serving = store.take(event_id, new_ticket=False)
+    if ticket["number"] > next_ticket:
+        return admit(event_id)
+    return max(ticket["number"] - serving, 0)
+
+
+@periodic_task(ADMISSION_PRUNE_INTERVAL)
+def prune_admission():
+    """
+    Deletes idle waiting rooms from the database store.
+    """
+    store = _store()
+    if isinstance(store, DatabaseAdmissionStore):
+        store.prune()
@@ -0,0 +1,248 @@
+import hashlib
+import json
+from flask import Blueprint, Response, request, session
+from sqlalchemy import func
+from werkzeug.http import is_resource_modified
+from models import db, User, Event, Reservation
+from helpers import filter_events, is_authenticated, paginate_listing
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library encoder is used instead
+    orjson = None
+
+# Blueprint for the versioned JSON API
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Columns returned for each event, selected as plain tuples without ORM objects
+EVENT_FIELDS = [
+    Event.id,
+    Event.title,
+    Event.description,
+    Event.event_type,
+    Event.location,
+    Event.event_date,
+    Event.start_time,
+    Event.duration,
+    Event.capacity,
+    Event.reserved_seats,
+    Event.updated_at,
+    User.company_name.label("organizer"),
+]
+
+# Columns returned for each of the user's reservations and the event booked
+RESERVATION_FIELDS = [
+    Reservation.id,
+    Reservation.seats,
+    Reservation.date,
+    Event.id.label("event_id"),
+    Event.title.label("event_title"),
+    Event.event_type.label("event_type"),
+    Event.location.label("event_location"),
+    Event.event_date.label("event_date"),
+    Event.start_time.label("event_start_time"),
+    User.company_name.label("event_organizer"),
+]
+
+
+# Helper function to encode dates and times for the standard library encoder
+def _isoformat(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Helper function to encode a payload, with orjson when it is installed
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_isoformat, separators=(",", ":")).encode()
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype="application/json")
+
+
+def json_error(message, status):
+    return json_response({"error": message}, status=status)
+
+
+# Helper function to answer a conditional GET without building the body when possible
+def conditional_response(validator, last_modified, build, private=False):
+    """
+    Derives a strong ETag from the request URL and the validator values. If the
+    client already has this version (If-None-Match / If-Modified-Since) an empty
+    304 is returned and build() is never called; otherwise build() makes the response.
+    Either way clients are told to revalidate before reusing their copy.
+    """
+    key = "|".join([request.full_path] + [str(value) for value in validator])
+    etag = hashlib.sha1(key.encode()).hexdigest()
+
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = build()
+    else:
+        response = Response(status=304)
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    if private:
+        response.cache_control.private = True
+    return response
+
+
+# Helper function to convert an event row to its JSON representation
+def serialize_event(row):
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "event_type": row.event_type,
+        "location": row.location,
+        "event_date": row.event_date,
+        "start_time": row.start_time,
+        "duration": row.duration,
+        "capacity": row.capacity,
+        "available_seats": row.capacity - row.reserved_seats,
+        "organizer": row.organizer,
+        "updated_at": row.updated_at,
+    }
+
+
+# Helper function to convert a reservation row to its JSON representation
+def serialize_reservation(row):
+    return {
+        "id": row.id,
+        "seats": row.seats,
+        "date": row.date,
+        "event": {
+            "id": row.event_id,
+            "title": row.event_title,
+            "event_type": row.event_type,
+            "location": row.event_location,
+            "event_date": row.event_date,
+            "start_time": row.event_start_time,
+            "organizer": row.event_organizer,
+        },
+    }
+
+
+# Helper function to describe the page of a listing for API clients
+def serialize_pagination(pagination):
+    if pagination.is_keyset:
+        return {
+            "per_page": pagination.per_page,
+            "prev_cursor": pagination.prev_cursor if pagination.has_prev else None,
+            "next_cursor": pagination.next_cursor if pagination.has_next else None,
+        }
+    return {
+        "page": pagination.page,
+        "per_page": pagination.per_page,
+        "total": pagination.total,
+        "pages": pagination.pages,
+    }
+
+
+# API route for the events listing
+@bp.route("/events")
+def events():
+    """
+    Lists events with the same filters (event_type, start_date, end_date, search) and
+    pagination (page/per_page or cursor) as the events page. The ETag and Last-Modified
+    come from one aggregate query, so unchanged pages are answered with 304.
+    """
+    try:
+        query = filter_events(
+            db.session.query(*EVENT_FIELDS).join(Event.organizer), request.args
+        )
+    except ValueError:
+        return json_error("Dates must be in YYYY-MM-DD format.", 400)
+
+    count, last_modified = (
+        query.order_by(None)
+        .with_entities(func.count(Event.id), func.max(Event.updated_at))
+        .one()
+    )
+
+    def build():
+        events_paginated = paginate_listing(
+            query, [Event.event_date, Event.start_time, Event.id]
+        )
+        return json_response(
+            {
+                "events": [serialize_event(row) for row in events_paginated.items],
+                "pagination": serialize_pagination(events_paginated),
+            }
+        )
+
+    return conditional_response((count, last_modified), last_modified, build)
+
+
+# API route for a single event
+@bp.route("/events/<int:event_id>")
+def event_detail(event_id):
+    """
+    Returns one event. Its updated_at timestamp is the ETag and Last-Modified validator.
+    """
+    row = (
+        db.session.query(*EVENT_FIELDS)
+        .join(Event.organizer)
+        .filter(Event.id == event_id)
+        .one_or_none()
+    )
+    if row is None:
+        return json_error("Event not found.", 404)
+
+    return conditional_response(
+        (row.updated_at,),
+        row.updated_at,
+        lambda: json_response({"event": serialize_event(row)}),
+    )
+
+
+# API route for the reservations of the logged-in user
+@bp.route("/me/reservations")
+def my_reservations():
+    """
+    Lists the logged-in user's reservations, newest last, paginated like the profile page.
+    Reservation and event timestamps validate the response, which is private to the user.
+    """
+    if not is_authenticated():
+        return json_error("Authentication required.", 401)
+
+    query = (
+        db.session.query(*RESERVATION_FIELDS)
+        .join(Reservation.event)
+        .join(Event.organizer)
+        .filter(Reservation.user_id == session["user_id"])
+    )
+
+    count, reservations_modified, events_modified = query.with_entities(
+        func.count(Reservation.id),
+        func.max(Reservation.updated_at),
+        func.max(Event.updated_at),
+    ).one()
+    last_modified = max(
+        filter(None, [reservations_modified, events_modified]), default=None
+    )
+
+    def build():
+        reservations_paginated = paginate_listing(
+            query, [Reservation.date, Reservation.id]
+        )
+        return json_response(
+            {
+                "reservations": [
+                    serialize_reservation(row) for row in reservations_paginated.items
+                ],
+                "pagination": serialize_pagination(reservations_paginated),
+            }
+        )
+
+    return conditional_response(
+        (count, reservations_modified, events_modified),
+        last_modified,
+        build,
+        private=True,
+    )
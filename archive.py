@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+from models import db, Event, Reservation, ArchivedEvent, ArchivedReservation
+from database import begin_write
+from jobs import periodic_task
+from stats import remove_events
+
+# Seconds between two archive runs of the worker
+ARCHIVE_INTERVAL = 3600
+
+# Columns shared by the live and archive tables
+EVENT_COLUMNS = [column.name for column in Event.__table__.columns]
+RESERVATION_COLUMNS = [column.name for column in Reservation.__table__.columns]
+
+
+# Helper function to select the shared columns of a live or archive table
+def _select_columns(model, names):
+    return select(*[getattr(model, name) for name in names])
+
+
+# Events and reservations of both tiers, mapped as Event and Reservation so the
+# listing queries and templates work unchanged when history is included
+EventHistory = aliased(
+    Event,
+    union_all(
+        _select_columns(Event, EVENT_COLUMNS),
+        _select_columns(ArchivedEvent, EVENT_COLUMNS),
+    ).subquery("event_history"),
+    adapt_on_names=True,
+)
+ReservationHistory = aliased(
+    Reservation,
+    union_all(
+        _select_columns(Reservation, RESERVATION_COLUMNS),
+        _select_columns(ArchivedReservation, RESERVATION_COLUMNS),
+    ).subquery("reservation_history"),
+    adapt_on_names=True,
+)
+
+
+def include_history(args):
+    """
+    True when a listing asks for archived events too (?history=1).
+    """
+    return args.get("history") == "1"
+
+
+def event_source(args):
+    """
+    Returns the entity a listing selects events from: the live event table, or with
+    ?history=1 the union of live and archived events.
+    """
+    return EventHistory if include_history(args) else Event
+
+
+def reservation_source(args):
+    """
+    Returns Reservation, or with ?history=1 the union of live and archived reservations.
+    """
+    return ReservationHistory if include_history(args) else Reservation
+
+
+def archived_ids(events):
+    """
+    Returns the ids of the given events that are archived, so history listings can
+    leave out the booking and editing links of past events.
+    """
+    ids = [event.id for event in events]
+    if not ids:
+        return set()
+    return set(
+        db.session.execute(
+            select(ArchivedEvent.id).where(ArchivedEvent.id.in_(ids))
+        ).scalars()
+    )
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves up to batch_size events that took place before cutoff, with their
+    reservations, to the archive tables in one transaction, and subtracts them from
+    the dashboard statistics of their organizers. The events are locked first, so a
+    booking made meanwhile either lands before the move or finds the event gone.
+    Returns the number of events moved.
+    """
+    begin_write(db.session)
+
+    # Archived ids are never handed out again: event and reservation use
+    # AUTOINCREMENT on SQLite and sequences on PostgreSQL
+    rows = db.session.execute(
+        select(Event.id)
+        .where(Event.event_date < cutoff)
+        .order_by(Event.id)
+        .limit(batch_size)
+        .with_for_update()
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    event_ids = [row.id for row in rows]
+    remove_events(event_ids)
+    now = literal(datetime.utcnow())
+    db.session.execute(
+        insert(ArchivedEvent).from_select(
+            EVENT_COLUMNS + ["archived_at"],
+            _select_columns(Event, EVENT_COLUMNS)
+            .add_columns(now)
+            .where(Event.id.in_(event_ids)),
+        )
+    )
+    db.session.execute(
+        insert(ArchivedReservation).from_select(
+            RESERVATION_COLUMNS + ["archived_at"],
+            _select_columns(Reservation, RESERVATION_COLUMNS)
+            .add_columns(now)
+            .where(Reservation.event_id.in_(event_ids)),
+        )
+    )
+    db.session.execute(
+        delete(Reservation)
+        .where(Reservation.event_id.in_(event_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(Event)
+        .where(Event.id.in_(event_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(event_ids)
+
+
+def archive_past_events(days, batch_size, max_batches=None):
+    """
+    Archives, batch by batch, the events that took place more than days ago.
+    Each batch is its own short transaction, so bookings are never blocked for long.
+    Returns the number of events archived.
+    """
+    cutoff = datetime.utcnow().date() - timedelta(days=days)
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+    return archived
+
+
+@periodic_task(ARCHIVE_INTERVAL)
+def archive_events():
+    """
+    Archives the events older than ARCHIVE_AFTER_DAYS, in ARCHIVE_BATCH_SIZE batches.
+    """
+    config = current_app.config
+    archive_past_events(config["ARCHIVE_AFTER_DAYS"], config["ARCHIVE_BATCH_SIZE"])
@@ -0,0 +1,227 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from io import BytesIO
+from flask import Blueprint, current_app, request, send_from_directory, url_for
+from markupsafe import Markup, escape
+from werkzeug.security import safe_join
+
+# Build output directory inside the static folder and its manifest
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Widths of the resized variants generated for every image
+IMAGE_WIDTHS = [320, 640, 960, 1280]
+IMAGE_EXTENSIONS = (".webp", ".jpg", ".jpeg", ".png")
+IMAGE_QUALITY = 80
+
+# Text assets that get precompressed .gz and .br copies
+COMPRESSIBLE_EXTENSIONS = (".css", ".js")
+
+# Fingerprinted files never change, so browsers may keep them for a year
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Blueprint serving the fingerprinted build output
+bp = Blueprint("assets", __name__)
+
+
+# Helper function to import Pillow only when images are built
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(
+            "Building image variants needs the Pillow package (pip install Pillow)."
+        )
+    return Image
+
+
+# Helper function to import brotli if it is installed
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+# Helper function to name a file after a hash of its content
+def _fingerprinted_name(path, data, suffix=""):
+    stem, extension = os.path.splitext(path)
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return f"{stem}{suffix}.{digest}{extension}"
+
+
+# Helper function to write a build output file, creating its directory
+def _write(dist, name, data):
+    path = os.path.join(dist, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as output:
+        output.write(data)
+
+
+# Helper function to encode a resized copy of an image in its own format
+def _resize(image, width, image_format):
+    height = round(image.height * width / image.width)
+    resized = image.resize((width, height), _pillow().LANCZOS)
+    buffer = BytesIO()
+    options = {"quality": IMAGE_QUALITY}
+    if image_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    resized.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def build_assets(static_folder, widths=IMAGE_WIDTHS):
+    """
+    Builds the static assets into static/dist. Every file is copied under a name with
+    a hash of its content, images also get resized variants for each smaller width, and
+    CSS/JS files get gzip (and, with the brotli package, brotli) compressed copies.
+    Writes and returns the manifest mapping each source path to its build output.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {"files": {}, "images": {}}
+    brotli = _brotli()
+
+    for directory, subdirectories, filenames in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(dist):
+            subdirectories.clear()
+            continue
+        subdirectories[:] = [name for name in subdirectories if name != DIST_DIR]
+
+        for filename in sorted(filenames):
+            source = os.path.join(directory, filename)
+            path = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            with open(source, "rb") as stream:
+                data = stream.read()
+
+            name = _fingerprinted_name(path, data)
+            _write(dist, name, data)
+            manifest["files"][path] = name
+
+            extension = os.path.splitext(path)[1].lower()
+            if extension in COMPRESSIBLE_EXTENSIONS:
+                _write(dist, name + ".gz", gzip.compress(data, 9, mtime=0))
+                if brotli is not None:
+                    _write(dist, name + ".br", brotli.compress(data))
+
+            if extension in IMAGE_EXTENSIONS:
+                with _pillow().open(source) as image:
+                    image_format = image.format
+                    variants = []
+                    for width in widths:
+                        if width >= image.width:
+                            continue
+                        variant = _resize(image, width, image_format)
+                        variant_name = _fingerprinted_name(path, variant, f"-{width}w")
+                        _write(dist, variant_name, variant)
+                        variants.append([variant_name, width])
+                    variants.append([name, image.width])
+                    manifest["images"][path] = {
+                        "variants": variants,
+                        "width": image.width,
+                        "height": image.height,
+                    }
+
+    _write(dist, MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def load_manifest(static_folder):
+    """
+    Returns the manifest written by the last build, or None if assets were not built.
+    """
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as stream:
+            return json.load(stream)
+    except FileNotFoundError:
+        return None
+
+
+def _manifest():
+    return current_app.extensions["assets"]
+
+
+def asset_url(path):
+    """
+    Template helper returning the URL of a static file: its fingerprinted build
+    output when assets have been built, otherwise the plain static URL.
+    """
+    manifest = _manifest()
+    if manifest and path in manifest["files"]:
+        return url_for("assets.asset", filename=manifest["files"][path])
+    return url_for("static", filename=path)
+
+
+def image_attrs(path, sizes="100vw", lazy=True):
+    """
+    Template helper returning the attributes of an <img> tag for a static image:
+    src, a srcset of the resized variants with the given sizes, the intrinsic width
+    and height (so the page does not shift while images load), and lazy loading.
+    Without a build only src and the loading attributes are returned.
+    """
+    manifest = _manifest()
+    image = manifest["images"].get(path) if manifest else None
+    attributes = {"src": asset_url(path)}
+    if image:
+        attributes["srcset"] = ", ".join(
+            f"{url_for('assets.asset', filename=name)} {width}w"
+            for name, width in image["variants"]
+        )
+        attributes["sizes"] = sizes
+        attributes["width"] = image["width"]
+        attributes["height"] = image["height"]
+    if lazy:
+        attributes["loading"] = "lazy"
+    attributes["decoding"] = "async"
+    return Markup(
+        " ".join(f'{name}="{escape(value)}"' for name, value in attributes.items())
+    )
+
+
+# Route serving the fingerprinted assets with immutable caching
+@bp.route("/assets/<path:filename>")
+def asset(filename):
+    """
+    Serves a build output file with a one year immutable Cache-Control header.
+    CSS and JS are sent precompressed (brotli, then gzip) when the client accepts it.
+    """
+    directory = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0]
+    compressible = filename.lower().endswith(COMPRESSIBLE_EXTENSIONS)
+    encoding = None
+
+    if compressible:
+        for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+            compressed = safe_join(directory, filename + suffix)
+            if request.accept_encodings[candidate] and compressed and os.path.isfile(
+                compressed
+            ):
+                encoding = candidate
+                filename += suffix
+                break
+
+    response = send_from_directory(
+        directory, filename, mimetype=mimetype, max_age=ASSET_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if compressible:
+        response.vary.add("Accept-Encoding")
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+
+def init_app(app):
+    """
+    Loads the asset manifest and registers the asset route and template helpers.
+    """
+    app.extensions["assets"] = load_manifest(app.static_folder)
+    app.register_blueprint(bp)
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.jinja_env.globals["image_attrs"] = image_attrs
@@ -0,0 +1,120 @@
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from models import db, User
+from passwords import password_verifier
+from helpers import forget_principal, remember_principal
+from replicas import use_primary
+
+# Blueprint for registration, login and logout
+bp = Blueprint("auth", __name__)
+
+
+# Route for user registration
+@bp.route("/register", methods=["GET", "POST"])
+@use_primary
+def register():
+    """
+    Handles user registration. Processes the form data to register a new user.
+    Includes validation for field lengths and checks for existing usernames or emails.
+    """
+    if request.method == "POST":
+        # Extracting form data
+        username = request.form["username"]
+        email = request.form["email"]
+        password = request.form["password"]
+        is_business = request.form.get("is_business") == "on"
+        company_name = request.form.get("company_name") if is_business else None
+
+        # Validation checks for field lengths
+        if len(username) > 80:
+            flash("Username is too long. Maximum 80 characters allowed.", "danger")
+            return render_template("register.html")
+        if len(email) > 120:
+            flash("Email is too long. Maximum 120 characters allowed.", "danger")
+            return render_template("register.html")
+        if len(password) > 128:
+            flash("Password is too long. Maximum 128 characters allowed.", "danger")
+            return render_template("register.html")
+        if company_name and len(company_name) > 100:
+            flash("Company name is too long. Maximum 100 characters allowed.", "danger")
+            return render_template("register.html")
+
+        # Check if username or email already exists
+        existing_user = User.query.filter(
+            (User.username == username) | (User.email == email)
+        ).first()
+        if existing_user:
+            flash("Username or email already registered.", "danger")
+            return redirect(url_for("auth.register"))
+
+        # Create new user object and set password
+        new_user = User(
+            username=username,
+            email=email,
+            is_business=is_business,
+            company_name=company_name,
+        )
+        new_user.set_password(password)
+
+        # Add to database and commit
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash("Registration successful. Please log in.", "success")
+        return redirect(url_for("auth.login"))
+
+    return render_template("register.html")
+
+
+# Route for user login
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    """
+    Handles user login. It processes the form data to authenticate the user.
+    On successful login, the user's ID, business status and names are stored in the session.
+    """
+    if request.method == "POST":
+        login_input = request.form["login"]  # Could be either username or email
+        password = request.form["password"]
+
+        # Check both username and email for login
+        user = User.query.filter(
+            (User.username == login_input) | (User.email == login_input)
+        ).first()
+
+        # Verify the password on the bounded hashing pool
+        password_ok = False
+        if user:
+            password_ok = password_verifier.verify(user.password_hash, password)
+        if password_ok is None:
+            flash("The server is busy, please try logging in again shortly.", "danger")
+            return render_template("login.html")
+
+        # If user exists and password is correct
+        if password_ok:
+            # Upgrade the stored hash if the hashing parameters have changed
+            if user.password_needs_rehash():
+                user.set_password(password)
+                db.session.commit()
+
+            # Store the user's ID, role and names in session
+            remember_principal(user)
+            flash("You have successfully logged in.", "success")
+            return redirect(url_for("main.index"))
+
+        # If authentication fails
+        flash("Invalid username, email or password.", "danger")
+
+    return render_template("login.html")
+
+
+# Route for user logout
+@bp.route("/logout")
+def logout():
+    """
+    Handles user logout. Clears the user's session data and redirects to the index page.
+    """
+    # Clearing the user's session data
+    forget_principal()
+
+    flash("You have been logged out.", "success")
+    return redirect(url_for("main.index"))
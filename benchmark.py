@@ -0,0 +1,989 @@
+"""
+Benchmark suite for the EventSphere routes.
+
+Seeds a synthetic dataset at a configurable scale, drives the main routes through the
+Flask test client (and optionally a multi-process HTTP load generator against a running
+server), and writes p50/p95/p99 latency, throughput and queries per request as JSON so
+runs can be compared across commits.
+
+Examples:
+
+    python benchmark.py --database-url sqlite:////tmp/b.db --seed --events 100000
+    python benchmark.py --database-url postgresql://localhost/eventsphere_bench --seed
+    python benchmark.py --database-url sqlite:////tmp/b.db --url http://localhost:8000
+    python benchmark.py --database-url sqlite:////tmp/b.db --compare results/a.json
+    python benchmark.py --database-url sqlite:////tmp/b.db --on-sale 8
+    python benchmark.py --database-url sqlite:////tmp/b.db --seed --events 100000 \
+        --search-compare
+    python benchmark.py --database-url sqlite:////tmp/b.db --login 8
+    python benchmark.py --database-url sqlite:////tmp/b.db --workers 1,2,4,8,16
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, time as dt_time, timedelta
+from multiprocessing import Pool
+from sqlalchemy import bindparam
+
+EVENT_TYPES = [
+    "Concert",
+    "Sport",
+    "Theatre",
+    "Cinema",
+    "Exhibition",
+    "Festival",
+    "Workshop",
+    "Other",
+]
+WORDS = (
+    "live music rock jazz opera theatre drama comedy football tennis marathon cinema "
+    "film premiere art gallery workshop pottery painting festival summer winter night "
+    "acoustic orchestra dance ballet market food wine tasting family kids city park"
+).split()
+LOCATIONS = ["Dublin", "Cork", "Galway", "Limerick", "Waterford", "Kilkenny", "Sligo"]
+BENCH_PASSWORD = "benchmark"
+SEED_BATCH_SIZE = 5000
+
+
+# Helper function to insert rows with executemany in fixed-size batches
+def _insert_batches(db, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= SEED_BATCH_SIZE:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+
+
+def seed(db, businesses, users, events, reservations, rng, past_days=730):
+    """
+    Fills an empty database with synthetic businesses, users, events and reservations.
+    Events are spread over five years starting past_days ago.
+    """
+    from models import User
+    from passwords import hash_password
+
+    password_hash = hash_password(BENCH_PASSWORD)
+    _insert_batches(
+        db,
+        User.__table__,
+        (
+            {
+                "username": f"business{i}",
+                "email": f"business{i}@example.com",
+                "password_hash": password_hash,
+                "is_business": True,
+                "company_name": f"Company {i}",
+            }
+            for i in range(1, businesses + 1)
+        ),
+    )
+    _insert_batches(
+        db,
+        User.__table__,
+        (
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password_hash": password_hash,
+                "is_business": False,
+            }
+            for i in range(1, users + 1)
+        ),
+    )
+
+    seed_events(
+        db,
+        businesses,
+        users,
+        events,
+        reservations,
+        rng,
+        first_day=date.today() - timedelta(days=past_days),
+        days=5 * 365,
+    )
+
+
+def seed_events(db, businesses, users, events, reservations, rng, first_day, days):
+    """
+    Adds events dated in the given number of days from first_day, with reservations.
+    Reservations never exceed an event's capacity and reserved_seats is kept in sync.
+    """
+    from models import Event, Reservation
+    from stats import refresh_stats
+
+    capacities = [rng.choice([50, 100, 500, 2000, 10000]) for _ in range(events)]
+    reserved = [0] * events
+
+    def event_rows():
+        for i in range(events):
+            yield {
+                "title": " ".join(rng.choices(WORDS, k=3)).title(),
+                "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 120))),
+                "event_date": first_day + timedelta(days=rng.randrange(days)),
+                "start_time": dt_time(rng.randrange(9, 23), rng.choice([0, 30])),
+                "duration": rng.choice([60, 90, 120, 180]),
+                "capacity": capacities[i],
+                "event_type": rng.choice(EVENT_TYPES),
+                "location": rng.choice(LOCATIONS),
+                "organizer_id": rng.randint(1, businesses),
+                "reserved_seats": 0,
+            }
+
+    first_event_id = (db.session.query(db.func.max(Event.id)).scalar() or 0) + 1
+    _insert_batches(db, Event.__table__, event_rows())
+    first_user_id = businesses + 1
+
+    def reservation_rows():
+        for _ in range(reservations):
+            index = rng.randrange(events)
+            seats = rng.randint(1, 4)
+            if reserved[index] + seats > capacities[index]:
+                continue
+            reserved[index] += seats
+            yield {
+                "user_id": rng.randint(first_user_id, first_user_id + users - 1),
+                "event_id": first_event_id + index,
+                "seats": seats,
+                "date": datetime.utcnow() - timedelta(minutes=rng.randrange(10**6)),
+            }
+
+    _insert_batches(db, Reservation.__table__, reservation_rows())
+
+    # Store the generated counters on the events
+    counters = (
+        {"event_id": first_event_id + index, "seats": seats}
+        for index, seats in enumerate(reserved)
+        if seats
+    )
+    statement = (
+        Event.__table__.update()
+        .where(Event.__table__.c.id == bindparam("event_id"))
+        .values(reserved_seats=bindparam("seats"))
+    )
+    batch = []
+    for row in counters:
+        batch.append(row)
+        if len(batch) >= SEED_BATCH_SIZE:
+            db.session.execute(statement, batch)
+            batch = []
+    if batch:
+        db.session.execute(statement, batch)
+    db.session.commit()
+
+    # Dashboard statistics of the generated events
+    refresh_stats()
+    db.session.commit()
+
+
+def scenarios(db, rng):
+    """
+    Returns the (name, role, method, path builder, form builder) request scenarios.
+    Path and form builders are called before every request to vary the parameters.
+    """
+    from models import Event, Reservation, User
+
+    max_event_id = db.session.query(db.func.max(Event.id)).scalar() or 1
+    bench_user = User.query.filter_by(is_business=False).first()
+    bench_business = User.query.filter_by(is_business=True).first()
+    reservation_ids = [
+        row[0]
+        for row in db.session.query(Reservation.id)
+        .filter_by(user_id=bench_user.id)
+        .limit(50)
+    ] or [0]
+    today = date.today()
+
+    def events_path(**filters):
+        return lambda: "/events?" + urllib.parse.urlencode(
+            {
+                name: value() if callable(value) else value
+                for name, value in filters.items()
+            }
+        )
+
+    def random_type():
+        return rng.choice(EVENT_TYPES)
+
+    def random_word():
+        return rng.choice(WORDS)
+
+    def start():
+        return (today + timedelta(days=rng.randrange(0, 365))).isoformat()
+
+    def end():
+        return (today + timedelta(days=rng.randrange(365, 730))).isoformat()
+
+    def no_form():
+        return None
+
+    return [
+        ("index", None, "GET", lambda: "/", no_form),
+        ("events", None, "GET", events_path(), no_form),
+        ("events_type", None, "GET", events_path(event_type=random_type), no_form),
+        (
+            "events_dates",
+            None,
+            "GET",
+            events_path(start_date=start, end_date=end),
+            no_form,
+        ),
+        ("events_search", None, "GET", events_path(search=random_word), no_form),
+        # A word no event contains, as for a typo
+        (
+            "events_search_miss",
+            None,
+            "GET",
+            events_path(search=lambda: random_word() + "zz"),
+            no_form,
+        ),
+        (
+            "events_all_filters",
+            None,
+            "GET",
+            events_path(
+                event_type=random_type,
+                start_date=start,
+                end_date=end,
+                search=random_word,
+            ),
+            no_form,
+        ),
+        (
+            "events_deep_page",
+            None,
+            "GET",
+            events_path(page=lambda: rng.randint(50, 500)),
+            no_form,
+        ),
+        ("events_keyset", None, "GET", events_path(cursor=""), no_form),
+        ("events_history", None, "GET", events_path(history="1"), no_form),
+        (
+            "api_events",
+            None,
+            "GET",
+            lambda: "/api/v1/events?"
+            + urllib.parse.urlencode({"event_type": random_type()}),
+            no_form,
+        ),
+        (
+            "api_event",
+            None,
+            "GET",
+            lambda: f"/api/v1/events/{rng.randint(1, max_event_id)}",
+            no_form,
+        ),
+        (
+            "business_profile",
+            bench_business.username,
+            "GET",
+            lambda: "/business_profile",
+            no_form,
+        ),
+        ("user_profile", bench_user.username, "GET", lambda: "/user_profile", no_form),
+        (
+            "reserve",
+            bench_user.username,
+            "POST",
+            lambda: f"/reserve/{rng.randint(1, max_event_id)}",
+            lambda: {"seats": "1"},
+        ),
+        (
+            "edit_reservation",
+            bench_user.username,
+            "POST",
+            lambda: f"/edit_reservation/{rng.choice(reservation_ids)}",
+            lambda: {"seats": str(rng.randint(1, 2))},
+        ),
+    ]
+
+
+# Helper function to summarise a list of request latencies in seconds
+def summarise(latencies, elapsed, queries=None):
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100)
+    else:
+        cuts = latencies * 99
+    summary = {
+        "requests": len(latencies),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+    if queries is not None:
+        summary["queries_per_request"] = round(statistics.mean(queries), 2)
+    return summary
+
+
+def run_test_client(app, db, rng, requests_per_scenario, names=None):
+    """
+    Runs every scenario (or the named ones) in-process through the Flask test client,
+    counting queries.
+    """
+    from querycount import QueryCounter
+
+    results = {}
+    with app.app_context():
+        scenario_list = scenarios(db, rng)
+        engine = db.engine
+
+    for name, role, method, path, form in scenario_list:
+        if names is not None and name not in names:
+            continue
+        client = app.test_client()
+        if role:
+            client.post("/login", data={"login": role, "password": BENCH_PASSWORD})
+
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(requests_per_scenario):
+            with QueryCounter(engine) as counter:
+                request_started = time.perf_counter()
+                client.open(path(), method=method, data=form())
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(counter.count)
+        results[name] = summarise(latencies, time.perf_counter() - started, queries)
+        print(f"  {name:20} {results[name]}")
+    return results
+
+
+# Worker process of the HTTP load generator
+def _http_worker(job):
+    base_url, role, method, paths, forms = job
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+    )
+    if role:
+        login = urllib.parse.urlencode({"login": role, "password": BENCH_PASSWORD})
+        opener.open(base_url + "/login", data=login.encode()).read()
+
+    latencies = []
+    for path, form in zip(paths, forms):
+        data = urllib.parse.urlencode(form).encode() if method == "POST" else None
+        started = time.perf_counter()
+        try:
+            opener.open(base_url + path, data=data).read()
+        except urllib.error.HTTPError:
+            pass
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_http(app, db, rng, base_url, requests_per_scenario, processes, names=None):
+    """
+    Drives a running server (e.g. gunicorn) over HTTP from several processes at once,
+    with every scenario or the named ones.
+    """
+    results = {}
+    with app.app_context():
+        scenario_list = scenarios(db, rng)
+
+    with Pool(processes) as pool:
+        for name, role, method, path, form in scenario_list:
+            if names is not None and name not in names:
+                continue
+            per_process = max(1, requests_per_scenario // processes)
+            jobs = [
+                (
+                    base_url,
+                    role,
+                    method,
+                    [path() for _ in range(per_process)],
+                    [form() for _ in range(per_process)],
+                )
+                for _ in range(processes)
+            ]
+            started = time.perf_counter()
+            chunks = pool.map(_http_worker, jobs)
+            latencies = [value for chunk in chunks for value in chunk]
+            results[name] = summarise(latencies, time.perf_counter() - started)
+            print(f"  {name:20} {results[name]}")
+    return results
+
+
+# Scenarios measured against gunicorn by --workers: reads, and writes on the database
+WORKER_SCENARIOS = ["index", "events", "events_type", "user_profile", "reserve"]
+
+# Seconds to wait for a gunicorn server to accept requests
+SERVER_START_TIMEOUT = 60
+
+
+# Helper function to start gunicorn (gunicorn.conf.py) with a number of workers on a
+# free local port, and wait until it answers. Returns the process and its base URL.
+def _start_gunicorn(database_url, workers):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=5).read()
+            return server, base_url
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn with {workers} worker(s) did not start.")
+
+
+def run_workers(app, db, rng, database_url, counts, requests, processes):
+    """
+    Starts gunicorn with each number of workers in turn and drives it over HTTP with
+    the worker scenarios, from at least as many load processes as there are workers,
+    to show how throughput, latency and database contention change with the count.
+    """
+    results = {}
+    for workers in counts:
+        server, base_url = _start_gunicorn(database_url, workers)
+        try:
+            load_processes = max(processes, workers)
+            print(f"{workers} worker(s), {load_processes} load processes:")
+            results[f"workers_{workers}"] = run_http(
+                app, db, rng, base_url, requests, load_processes, WORKER_SCENARIOS
+            )
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+# Listing scenarios measured as history grows
+HISTORY_SCENARIOS = [
+    "index",
+    "events",
+    "events_type",
+    "events_dates",
+    "events_deep_page",
+    "events_history",
+    "business_profile",
+]
+
+
+# Helper function to move every archived event and reservation back to the live tables
+def _unarchive(db):
+    from models import Event, Reservation, ArchivedEvent, ArchivedReservation
+    from archive import EVENT_COLUMNS, RESERVATION_COLUMNS
+
+    for live, archived, columns in (
+        (Event, ArchivedEvent, EVENT_COLUMNS),
+        (Reservation, ArchivedReservation, RESERVATION_COLUMNS),
+    ):
+        db.session.execute(
+            live.__table__.insert().from_select(
+                columns, db.select(*[getattr(archived, name) for name in columns])
+            )
+        )
+    db.session.execute(ArchivedReservation.__table__.delete())
+    db.session.execute(ArchivedEvent.__table__.delete())
+    db.session.commit()
+
+
+def run_history(app, db, rng, years, events, reservations, businesses, users, requests):
+    """
+    Measures the listing routes as history grows from 0 to the given number of years,
+    adding a year of past events (and their reservations) at each step. Every step
+    runs once with all the history in the live tables and once after archiving it.
+    """
+    from archive import archive_past_events
+    from stats import refresh_stats
+
+    results = {}
+    for year in range(years + 1):
+        with app.app_context():
+            _unarchive(db)
+            refresh_stats()
+            db.session.commit()
+            if year:
+                seed_events(
+                    db,
+                    businesses,
+                    users,
+                    events,
+                    reservations,
+                    rng,
+                    first_day=date.today() - timedelta(days=365 * year),
+                    days=365,
+                )
+
+        print(f"{year} year(s) of history in the live tables:")
+        results[f"history_{year}y_live"] = run_test_client(
+            app, db, rng, requests, HISTORY_SCENARIOS
+        )
+
+        with app.app_context():
+            started = time.perf_counter()
+            archived = archive_past_events(
+                app.config["ARCHIVE_AFTER_DAYS"], app.config["ARCHIVE_BATCH_SIZE"]
+            )
+            print(
+                f"{year} year(s) of history archived "
+                f"({archived} events in {time.perf_counter() - started:.1f}s):"
+            )
+        results[f"history_{year}y_archived"] = run_test_client(
+            app, db, rng, requests, HISTORY_SCENARIOS
+        )
+    return results
+
+
+# Scenarios measured with each SEARCH_MODE by --search-compare
+SEARCH_SCENARIOS = ["events_search", "events_search_miss", "events_all_filters"]
+
+
+def run_search_compare(app, db, requests):
+    """
+    Runs the search scenarios with the LIKE scan and then with full-text search, on
+    the same search words, with the facet counts recomputed for every mode.
+    """
+    from facets import invalidate_facets
+
+    results = {}
+    previous_mode = app.config["SEARCH_MODE"]
+    try:
+        for mode in ("like", "full_text"):
+            app.config["SEARCH_MODE"] = mode
+            with app.app_context():
+                invalidate_facets()
+            print(f"SEARCH_MODE={mode}:")
+            # Same seed for both modes, so they search for the same words
+            results[mode] = run_test_client(
+                app, db, random.Random(0), requests, SEARCH_SCENARIOS
+            )
+    finally:
+        app.config["SEARCH_MODE"] = previous_mode
+    return results
+
+
+# Password hashing settings measured by --login, from the most to the least costly
+LOGIN_HASH_METHODS = [
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:260000",
+    "pbkdf2:sha256:100000",
+    "bcrypt:12",
+    "bcrypt:10",
+]
+
+
+# Thread of a simulated user logging in over and over, recording each latency and
+# whether the login succeeded (a redirect) or was turned away as busy
+def _login_user(client, username, count, latencies, outcomes, lock):
+    form = {"login": username, "password": BENCH_PASSWORD}
+    for _ in range(count):
+        started = time.perf_counter()
+        response = client.post("/login", data=form)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            outcomes.append(response.status_code == 302)
+
+
+def run_login(app, db, concurrency, requests, methods):
+    """
+    Measures login throughput of one worker process with concurrency users logging
+    in at once, for each PASSWORD_HASH_METHOD. The benchmark user's password is
+    hashed with the method first, so no login rehashes it. Reports the logins turned
+    away by the PASSWORD_HASH_MAX_PENDING bound as "busy".
+    """
+    from models import User
+    from passwords import hash_password
+
+    with app.app_context():
+        user = User.query.filter_by(is_business=False).first()
+        username, previous_hash = user.username, user.password_hash
+    previous_method = app.config["PASSWORD_HASH_METHOD"]
+
+    results = {}
+    try:
+        for method in methods:
+            try:
+                password_hash = hash_password(BENCH_PASSWORD, method)
+            except RuntimeError as error:
+                print(f"  {method:20} skipped: {error}")
+                continue
+            app.config["PASSWORD_HASH_METHOD"] = method
+            with app.app_context():
+                db.session.get(User, user.id).password_hash = password_hash
+                db.session.commit()
+
+            latencies, outcomes, lock = [], [], threading.Lock()
+            threads = [
+                threading.Thread(
+                    target=_login_user,
+                    args=(
+                        app.test_client(),
+                        username,
+                        max(1, requests // concurrency),
+                        latencies,
+                        outcomes,
+                        lock,
+                    ),
+                )
+                for _ in range(concurrency)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results[method] = summarise(latencies, time.perf_counter() - started)
+            results[method]["busy"] = outcomes.count(False)
+            print(f"  {method:20} {results[method]}")
+    finally:
+        app.config["PASSWORD_HASH_METHOD"] = previous_method
+        with app.app_context():
+            db.session.get(User, user.id).password_hash = previous_hash
+            db.session.commit()
+    return results
+
+
+# Seconds between two waiting room polls of a simulated buyer
+ON_SALE_POLL_INTERVAL = 0.1
+
+
+# Helper function to put an on-sale event back to no reservations
+def _reset_on_sale_event(db, event_id):
+    from models import Event, Reservation
+    from jobs import enqueue
+
+    Reservation.query.filter_by(event_id=event_id).delete()
+    db.session.get(Event, event_id).reserved_seats = 0
+    enqueue("count_seats", {"event_id": event_id})
+    db.session.commit()
+
+
+# Thread of a simulated buyer: books one seat at a time until the deadline, waiting in
+# the waiting room whenever asked to, and records the latency of every request
+def _on_sale_buyer(client, event_id, deadline, latencies, lock):
+    reserve_path = f"/reserve/{event_id}"
+    position_path = f"/reserve/{event_id}/position"
+
+    def timed(method, path, **kwargs):
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        with lock:
+            latencies.append(time.perf_counter() - started)
+        return response
+
+    while time.perf_counter() < deadline:
+        response = timed("POST", reserve_path, data={"seats": "1"})
+        while response.headers.get("Location", "").endswith("/waiting"):
+            time.sleep(ON_SALE_POLL_INTERVAL)
+            state = timed("GET", position_path).get_json()
+            if state["sold_out"] or time.perf_counter() >= deadline:
+                break
+            if state["position"] == 0:
+                response = timed("POST", reserve_path, data={"seats": "1"})
+
+
+def run_on_sale(app, db, concurrency, capacity, seconds, backend):
+    """
+    Simulates an event going on sale: concurrency buyers, then ten times as many, book
+    one seat at a time for the given number of seconds, first without admission control
+    and then with the given ADMISSION_BACKEND. Buyers in a waiting room poll their
+    position like the waiting room page does.
+    """
+    from admission import create_admission_store
+    from models import Event, User
+
+    with app.app_context():
+        organizer = User.query.filter_by(is_business=True).first()
+        event = Event(
+            title="On Sale Benchmark",
+            description="Benchmark event going on sale.",
+            event_date=date.today() + timedelta(days=365),
+            start_time=dt_time(20, 0),
+            duration=120,
+            capacity=capacity,
+            event_type="Concert",
+            location=LOCATIONS[0],
+            organizer_id=organizer.id,
+        )
+        db.session.add(event)
+        db.session.commit()
+        event_id = event.id
+        usernames = [
+            user.username
+            for user in User.query.filter_by(is_business=False).limit(concurrency * 10)
+        ]
+
+    results = {}
+    previous_store = app.extensions.get("admission")
+    try:
+        for multiplier in (1, 10):
+            for admission_backend in ("off", backend):
+                with app.app_context():
+                    _reset_on_sale_event(db, event_id)
+                store = create_admission_store(
+                    {**app.config, "ADMISSION_BACKEND": admission_backend}
+                )
+                if store is not None:
+                    with app.app_context():
+                        store.reopen(event_id)
+                app.extensions["admission"] = store
+
+                # Buyers log in before the sale opens
+                clients = []
+                for i in range(concurrency * multiplier):
+                    client = app.test_client()
+                    client.post(
+                        "/login",
+                        data={
+                            "login": usernames[i % len(usernames)],
+                            "password": BENCH_PASSWORD,
+                        },
+                    )
+                    clients.append(client)
+
+                latencies, lock = [], threading.Lock()
+                started = time.perf_counter()
+                threads = [
+                    threading.Thread(
+                        target=_on_sale_buyer,
+                        args=(client, event_id, started + seconds, latencies, lock),
+                    )
+                    for client in clients
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+                name = f"on_sale_{multiplier}x_{admission_backend}"
+                results[name] = summarise(latencies, time.perf_counter() - started)
+                with app.app_context():
+                    results[name]["seats_sold"] = db.session.get(
+                        Event, event_id
+                    ).reserved_seats
+                print(f"  {name:20} {results[name]}")
+    finally:
+        app.extensions["admission"] = previous_store
+    return results
+
+
+# Helper function to print the change of each latency against a previous run
+def compare(current, previous_path):
+    with open(previous_path) as previous_file:
+        previous = json.load(previous_file)
+    for mode, scenario_results in current["results"].items():
+        for name, summary in scenario_results.items():
+            before = previous.get("results", {}).get(mode, {}).get(name)
+            if not before:
+                continue
+            changes = ", ".join(
+                f"{key} {before[key]} -> {summary[key]}"
+                for key in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request")
+                if key in summary and key in before
+            )
+            print(f"  {mode}/{name}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument(
+        "--seed", action="store_true", help="Recreate and seed the database."
+    )
+    parser.add_argument("--businesses", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--reservations", type=int, default=100000)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per scenario."
+    )
+    parser.add_argument("--url", help="Base URL of a running server to load test.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument(
+        "--page-cache", action="store_true", help="Keep the page cache on."
+    )
+    parser.add_argument("--output", help="JSON results file (results/<commit>.json).")
+    parser.add_argument("--compare", help="Previous JSON results file to compare.")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument(
+        "--history-years",
+        type=int,
+        default=0,
+        help="Instead of the route suite, measure the listings with 0 to N years of "
+        "past events (--events and --reservations per year), live and archived.",
+    )
+    parser.add_argument(
+        "--search-compare",
+        action="store_true",
+        help="Instead of the route suite, run the search scenarios with the LIKE "
+        "scan and with full-text search.",
+    )
+    parser.add_argument(
+        "--login",
+        type=int,
+        default=0,
+        metavar="USERS",
+        help="Instead of the route suite, measure login throughput with USERS "
+        "logging in at once, for each of --hash-methods.",
+    )
+    parser.add_argument(
+        "--hash-methods",
+        default=",".join(LOGIN_HASH_METHODS),
+        help="Comma separated PASSWORD_HASH_METHOD values measured by --login.",
+    )
+    parser.add_argument(
+        "--workers",
+        help="Instead of the route suite, start gunicorn with each of these comma "
+        "separated worker counts (e.g. 1,2,4,8,16) and load test it over HTTP.",
+    )
+    parser.add_argument(
+        "--on-sale",
+        type=int,
+        default=0,
+        metavar="BUYERS",
+        help="Instead of the route suite, book a new event with BUYERS and then ten "
+        "times as many concurrent buyers, without and with admission control.",
+    )
+    parser.add_argument("--on-sale-capacity", type=int, default=2000)
+    parser.add_argument(
+        "--on-sale-seconds", type=int, default=10, help="Duration of each on-sale run."
+    )
+    parser.add_argument(
+        "--admission-backend",
+        default="memory",
+        help="ADMISSION_BACKEND measured by --on-sale (memory, database or redis).",
+    )
+    args = parser.parse_args()
+
+    # The app reads its configuration from the environment when it is imported
+    os.environ["DATABASE_URL"] = args.database_url
+    if not args.page_cache:
+        os.environ["PAGE_CACHE_TTL"] = "0"
+    if args.seed and args.database_url.startswith("sqlite:///"):
+        path = args.database_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+
+    from app import app
+    from models import db
+
+    rng = random.Random(args.random_seed)
+    if args.seed:
+        with app.app_context():
+            if not args.database_url.startswith("sqlite"):
+                db.drop_all()
+            db.create_all()
+            started = time.perf_counter()
+            seed(
+                db,
+                args.businesses,
+                args.users,
+                args.events,
+                args.reservations,
+                rng,
+                # The history benchmark adds its past events year by year
+                past_days=0 if args.history_years else 730,
+            )
+            print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+    ).stdout.strip()
+    report = {
+        "commit": commit,
+        "database": args.database_url.split("://")[0],
+        "timestamp": datetime.utcnow().isoformat(),
+        "scale": {
+            "businesses": args.businesses,
+            "users": args.users,
+            "events": args.events,
+            "reservations": args.reservations,
+        },
+        "results": {},
+    }
+
+    if args.history_years:
+        report["results"] = run_history(
+            app,
+            db,
+            rng,
+            args.history_years,
+            args.events,
+            args.reservations,
+            args.businesses,
+            args.users,
+            args.requests,
+        )
+    elif args.search_compare:
+        report["results"]["search"] = run_search_compare(app, db, args.requests)
+    elif args.login:
+        print(f"Login with {args.login} concurrent users:")
+        report["results"]["login"] = run_login(
+            app, db, args.login, args.requests, args.hash_methods.split(",")
+        )
+    elif args.workers:
+        report["results"]["workers"] = run_workers(
+            app,
+            db,
+            rng,
+            args.database_url,
+            [int(count) for count in args.workers.split(",")],
+            args.requests,
+            args.processes,
+        )
+    elif args.on_sale:
+        print(f"On sale with {args.on_sale} and {args.on_sale * 10} buyers:")
+        report["results"]["on_sale"] = run_on_sale(
+            app,
+            db,
+            args.on_sale,
+            args.on_sale_capacity,
+            args.on_sale_seconds,
+            args.admission_backend,
+        )
+    else:
+        print("Flask test client:")
+        report["results"]["test_client"] = run_test_client(
+            app, db, rng, args.requests
+        )
+        if args.url:
+            print(f"HTTP load against {args.url} with {args.processes} processes:")
+            report["results"]["http"] = run_http(
+                app, db, rng, args.url.rstrip("/"), args.requests, args.processes
+            )
+
+    output = args.output or os.path.join("results", f"{commit or 'benchmark'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        print(f"Compared with {args.compare}:")
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import InvalidRequestError
+from models import db, Event, Reservation
+from database import begin_write
+from jobs import enqueue
+from admission import mark_sold_out, reopen
+
+# Event columns returned by the seat counter updates, for the sold-out mark
+COUNTER_FIELDS = [Event.capacity, Event.reserved_seats]
+
+
+# Helper function to atomically move an event's reserved_seats counter
+def _claim_seats(event_id, delta):
+    """
+    Adds delta to the event's reserved_seats counter in a single conditional UPDATE
+    that only matches while the result still fits in the event capacity.
+    Returns the updated counter fields, or None if not enough seats are left.
+    """
+    return db.session.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .where(Event.reserved_seats + delta <= Event.capacity)
+        .values(reserved_seats=Event.reserved_seats + delta)
+        .returning(*COUNTER_FIELDS)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+# Helper function to update the sold-out mark of the waiting room after a commit,
+# from the counter fields returned by the UPDATE that moved the event by delta seats
+def _update_sold_out(event_id, event, delta):
+    is_sold_out = event.reserved_seats >= event.capacity
+    was_sold_out = event.reserved_seats - delta >= event.capacity
+    if is_sold_out and not was_sold_out:
+        mark_sold_out(event_id)
+    elif was_sold_out and not is_sold_out:
+        reopen(event_id)
+
+
+# Helper function to roll back a booking whose seats could not be claimed. The counter
+# is read first, still under the write lock, and if the event is full its sold-out
+# mark is renewed, so the waiting room keeps turning buyers away once the mark set
+# when the event filled has expired.
+def _refuse_claim(event_id):
+    counters = db.session.execute(
+        select(Event.reserved_seats, Event.capacity).where(Event.id == event_id)
+    ).first()
+    db.session.rollback()
+    if counters is not None and counters.reserved_seats >= counters.capacity:
+        mark_sold_out(event_id)
+
+
+# Helper function to re-read a reservation once the write lock is held, so the seats
+# it holds can't change between reading them and moving the event counter.
+# Returns False if a concurrent cancellation deleted it.
+def _lock_reservation(reservation):
+    try:
+        db.session.refresh(reservation, with_for_update=True)
+    except InvalidRequestError:
+        return False
+    return True
+
+
+def reserve_seats(event_id, user_id, seats):
+    """
+    Books seats for a user on an event without overselling under concurrent requests.
+    The confirmation email and the count of the seats in the organizer's statistics
+    are enqueued in the same transaction and done by the worker.
+    Returns the new reservation, or None if not enough seats are left.
+    """
+    begin_write(db.session)
+    event = _claim_seats(event_id, seats)
+    if event is None:
+        _refuse_claim(event_id)
+        return None
+
+    reservation = Reservation(user_id=user_id, event_id=event_id, seats=seats)
+    db.session.add(reservation)
+    db.session.flush()
+    enqueue("send_confirmation", {"reservation_id": reservation.id})
+    enqueue("count_seats", {"event_id": event_id})
+    db.session.commit()
+    _update_sold_out(event_id, event, seats)
+    return reservation
+
+
+def change_reservation_seats(reservation, seats):
+    """
+    Changes the number of seats held by a reservation, claiming or releasing the
+    difference on the event counter. Returns False if the extra seats are not available
+    or the reservation was cancelled meanwhile.
+    """
+    begin_write(db.session)
+    if not _lock_reservation(reservation):
+        db.session.rollback()
+        return False
+
+    delta = seats - reservation.seats
+    event = _claim_seats(reservation.event_id, delta)
+    if event is None:
+        _refuse_claim(reservation.event_id)
+        return False
+
+    reservation.seats = seats
+    enqueue("count_seats", {"event_id": reservation.event_id})
+    db.session.commit()
+    _update_sold_out(reservation.event_id, event, delta)
+    return True
+
+
+def cancel_reservation(reservation):
+    """
+    Deletes a reservation and releases its seats back to the event.
+    Returns False if it was already cancelled by a concurrent request.
+    """
+    begin_write(db.session)
+    if not _lock_reservation(reservation):
+        db.session.rollback()
+        return False
+
+    event = db.session.execute(
+        update(Event)
+        .where(Event.id == reservation.event_id)
+        .values(reserved_seats=Event.reserved_seats - reservation.seats)
+        .returning(*COUNTER_FIELDS)
+        .execution_options(synchronize_session=False)
+    ).one()
+    event_id, seats = reservation.event_id, reservation.seats
+    db.session.delete(reservation)
+    enqueue("count_seats", {"event_id": event_id})
+    db.session.commit()
+    _update_sold_out(event_id, event, -seats)
+    return True
@@ -0,0 +1,243 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, select
+from models import db, User, Event, Reservation, event_period
+from stats import record_events
+from scheduling import describe_conflict, find_batch_conflicts, lock_venues
+
+# Columns accepted by the bulk import and written by the event export
+EVENT_COLUMNS = [
+    "title",
+    "description",
+    "event_date",
+    "start_time",
+    "duration",
+    "capacity",
+    "event_type",
+    "location",
+]
+
+# Length limits shared by the create_event form and the bulk import
+EVENT_FIELD_LIMITS = [
+    ("title", "Title", 100),
+    ("description", "Description", 1000),
+    ("location", "Location", 120),
+    ("event_type", "Event type", 50),
+]
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def event_field_error(fields):
+    """
+    Returns the error message for the first event field that is too long,
+    or None if all the fields are within their limits.
+    """
+    for name, label, limit in EVENT_FIELD_LIMITS:
+        if len(fields.get(name) or "") > limit:
+            return f"{label} is too long. Maximum {limit} characters allowed."
+    return None
+
+
+def parse_event_row(row, organizer_id):
+    """
+    Validates one imported row and converts it to the values of an event insert.
+    Raises ValueError with a readable message if the row is invalid.
+    """
+    row = {
+        name: str(row[name]).strip() if row.get(name) is not None else ""
+        for name in EVENT_COLUMNS
+    }
+    missing = [name for name in EVENT_COLUMNS if name != "location" and not row[name]]
+    if missing:
+        raise ValueError(f"Missing value for {', '.join(missing)}.")
+
+    error = event_field_error(row)
+    if error:
+        raise ValueError(error)
+
+    try:
+        event_date = datetime.strptime(row["event_date"], "%Y-%m-%d").date()
+        start_time = datetime.strptime(row["start_time"], "%H:%M").time()
+    except ValueError:
+        raise ValueError("Dates must be YYYY-MM-DD and start times HH:MM.")
+
+    try:
+        duration = int(row["duration"])
+        capacity = int(row["capacity"])
+    except ValueError:
+        raise ValueError("Duration and capacity must be whole numbers.")
+    if duration < 1 or capacity < 1:
+        raise ValueError("Duration and capacity must be greater than zero.")
+
+    starts_at, ends_at = event_period(event_date, start_time, duration)
+    return {
+        "title": row["title"],
+        "description": row["description"],
+        "event_date": event_date,
+        "start_time": start_time,
+        "duration": duration,
+        "capacity": capacity,
+        "event_type": row["event_type"],
+        "location": row["location"] or None,
+        "starts_at": starts_at,
+        "ends_at": ends_at,
+        "organizer_id": organizer_id,
+        "reserved_seats": 0,
+    }
+
+
+# Helper function to read the rows of an uploaded file one at a time
+def _read_rows(stream, file_format):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if file_format == "jsonl":
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        # Line 1 is the CSV header
+        for line_number, row in enumerate(csv.DictReader(text), start=2):
+            yield line_number, row
+
+
+# Helper function to add a batch of imported events to the organizer's statistics,
+# one change per event type
+def _record_imported(organizer_id, rows):
+    totals = defaultdict(lambda: [0, 0])
+    for row in rows:
+        totals[row["event_type"]][0] += 1
+        totals[row["event_type"]][1] += row["capacity"]
+    for event_type, (events, capacity) in totals.items():
+        record_events(organizer_id, event_type, events=events, capacity=capacity)
+
+
+def import_events(stream, file_format, organizer_id, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Streams events from a CSV or JSON Lines file into the database for an organizer.
+    Valid rows are inserted in executemany batches, each batch in its own transaction,
+    so memory use is bounded by the batch size. Invalid rows, and rows overlapping an
+    event at the same location (already saved or earlier in the file), are skipped
+    and reported. The organizer's dashboard statistics are recomputed once at the end.
+    Returns a dict with the number of imported rows, the number of rejected rows and
+    the (line, message) errors, of which at most MAX_REPORTED_ERRORS are kept.
+    """
+    report = {"imported": 0, "rejected": 0, "errors": []}
+    batch, line_numbers = [], []
+
+    def reject(line_number, message):
+        report["rejected"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append((line_number, message))
+
+    def flush():
+        # Each batch is checked against the events saved so far in one pass
+        lock_venues(values["location"] for values in batch)
+        conflicts = find_batch_conflicts(batch)
+        rows = []
+        for index, values in enumerate(batch):
+            if index not in conflicts:
+                rows.append(values)
+                continue
+            conflict = conflicts[index][0]
+            if isinstance(conflict, int):
+                reject(
+                    line_numbers[index],
+                    f"Overlaps line {line_numbers[conflict]} at {values['location']}.",
+                )
+            else:
+                reject(
+                    line_numbers[index], describe_conflict(values["location"], conflict)
+                )
+        if rows:
+            db.session.execute(insert(Event), rows)
+            _record_imported(organizer_id, rows)
+        db.session.commit()
+        report["imported"] += len(rows)
+        batch.clear()
+        line_numbers.clear()
+
+    for line_number, row in _read_rows(stream, file_format):
+        try:
+            if row is None:
+                raise ValueError("Line is not a valid JSON object.")
+            batch.append(parse_event_row(row, organizer_id))
+            line_numbers.append(line_number)
+        except ValueError as error:
+            reject(line_number, str(error))
+            continue
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
+
+
+# Helper function to format one exported row as CSV or JSON Lines
+def _format_row(row, columns, file_format):
+    values = {
+        name: value.isoformat() if hasattr(value, "isoformat") else value
+        for name, value in zip(columns, row)
+    }
+    if file_format == "jsonl":
+        return json.dumps(values) + "\n"
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values.values())
+    return buffer.getvalue()
+
+
+# Helper function to stream the result of a select as formatted lines
+def _stream_rows(statement, columns, file_format, batch_size=IMPORT_BATCH_SIZE):
+    if file_format != "jsonl":
+        yield _format_row(columns, columns, "csv")
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for row in result:
+        yield _format_row(row, columns, file_format)
+
+
+def export_events(organizer_id, file_format="csv"):
+    """
+    Yields an organizer's events as CSV or JSON Lines, one line at a time.
+    Rows are fetched from the database in batches instead of loading them all.
+    """
+    columns = ["id"] + EVENT_COLUMNS + ["reserved_seats"]
+    statement = (
+        select(*[getattr(Event, name) for name in columns])
+        .where(Event.organizer_id == organizer_id)
+        .order_by(Event.event_date, Event.start_time, Event.id)
+    )
+    return _stream_rows(statement, columns, file_format)
+
+
+def export_reservations(organizer_id, file_format="csv"):
+    """
+    Yields the reservations made for an organizer's events as CSV or JSON Lines.
+    """
+    columns = ["id", "event_id", "event_title", "event_date", "email", "seats", "date"]
+    statement = (
+        select(
+            Reservation.id,
+            Reservation.event_id,
+            Event.title,
+            Event.event_date,
+            User.email,
+            Reservation.seats,
+            Reservation.date,
+        )
+        .join(Event, Reservation.event_id == Event.id)
+        .join(User, Reservation.user_id == User.id)
+        .where(Event.organizer_id == organizer_id)
+        .order_by(Event.event_date, Event.id, Reservation.id)
+    )
+    return _stream_rows(statement, columns, file_format)
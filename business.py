@@ -0,0 +1,283 @@
+from datetime import datetime
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    flash,
+    redirect,
+    render_template,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
+from sqlalchemy import select
+from models import db, User, Event, event_period
+from bulk import (
+    EVENT_COLUMNS,
+    event_field_error,
+    import_events,
+    export_events,
+    export_reservations,
+)
+from helpers import (
+    business_required,
+    invalidate_event_caches,
+    login_required,
+    paginate_listing,
+)
+from stats import organizer_dashboard, record_events
+from archive import archived_ids, event_source, include_history, reservation_source
+from admission import reopen
+from jobs import enqueue
+from replicas import use_primary
+from scheduling import describe_conflict, find_conflicts, lock_venues
+
+# Blueprint for the pages of business users: their events, imports and exports
+bp = Blueprint("business", __name__)
+
+
+# Route for business profile
+@bp.route("/business_profile")
+@login_required
+@business_required
+def business_profile():
+    """
+    Renders the business profile page for business users: the dashboard statistics
+    and a paginated list of the events organized by the business user, each with the
+    reservations made for it. Archived events are only listed when history=1 is passed.
+    """
+    user_id = session["user_id"]
+
+    # Live events only, unless archived events are asked for with ?history=1
+    history = include_history(request.args)
+    source = event_source(request.args)
+    reservation = reservation_source(request.args)
+
+    # Pagination
+    events_paginated = paginate_listing(
+        db.session.query(source).filter(source.organizer_id == user_id),
+        [source.event_date, source.start_time, source.id],
+    )
+
+    # Reservations of the events on this page, loaded in one query
+    reservations = {event.id: [] for event in events_paginated.items}
+    if reservations:
+        rows = db.session.execute(
+            select(reservation.event_id, User.email, reservation.seats)
+            .join(User, User.id == reservation.user_id)
+            .where(reservation.event_id.in_(list(reservations)))
+            .order_by(reservation.id)
+        )
+        for row in rows:
+            reservations[row.event_id].append(row)
+
+    business_name = session["company_name"]
+
+    return render_template(
+        "business_profile.html",
+        events=events_paginated.items,
+        reservations=reservations,
+        pagination=events_paginated,
+        business_name=business_name,
+        stats=organizer_dashboard(user_id),
+        history=history,
+        archived=archived_ids(events_paginated.items) if history else set(),
+    )
+
+
+# Route for create event
+@bp.route("/create_event", methods=["GET", "POST"])
+@use_primary
+@login_required
+@business_required
+def create_event():
+    """
+    Handles the creation of new events by business users.
+    Validates the form data for length constraints and adds the new event to the database.
+    """
+    company_name = session["company_name"]
+
+    if request.method == "POST":
+        # Extracting form data
+        title = request.form["title"]
+        description = request.form["description"]
+        location = request.form["location"]
+
+        # Validation for field lengths (shared with the bulk import)
+        error = event_field_error(request.form)
+        if error:
+            flash(error, "danger")
+            return render_template("create_event.html", company_name=company_name)
+
+        # Extract and parse date and time
+        event_date_str = request.form["event_date"]
+        start_time_str = request.form["start_time"]
+        event_date = datetime.strptime(event_date_str, "%Y-%m-%d").date()
+        start_time = datetime.strptime(start_time_str, "%H:%M").time()
+
+        # Extract other event details
+        duration = int(request.form["duration"])
+        capacity = int(request.form["capacity"])
+        event_type = request.form["event_type"]
+
+        # Refuse a time slot already booked at the same location
+        starts_at, ends_at = event_period(event_date, start_time, duration)
+        lock_venues([location])
+        conflicts = find_conflicts(location, starts_at, ends_at, limit=1)
+        if conflicts:
+            flash(describe_conflict(location, conflicts[0]), "danger")
+            return render_template("create_event.html", company_name=company_name)
+
+        # Create new event object
+        new_event = Event(
+            title=title,
+            description=description,
+            event_date=event_date,
+            start_time=start_time,
+            duration=duration,
+            capacity=capacity,
+            event_type=event_type,
+            location=location,
+            organizer_id=session["user_id"],
+        )
+
+        # Add new event to database
+        db.session.add(new_event)
+        record_events(new_event.organizer_id, event_type, events=1, capacity=capacity)
+        db.session.commit()
+        invalidate_event_caches()
+
+        flash("Event created successfully.", "success")
+        return redirect(url_for("business.business_profile"))
+
+    return render_template("create_event.html", company_name=company_name)
+
+
+# Route for bulk event import
+@bp.route("/import_events", methods=["GET", "POST"])
+@login_required
+@business_required
+def import_events_view():
+    """
+    Lets business users upload a CSV or JSON Lines file of events.
+    Rows are validated with the same rules as the create event form and inserted in batches;
+    rejected rows are listed with their line number.
+    """
+    report = None
+
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Please choose a file to import.", "danger")
+            return redirect(url_for("business.import_events_view"))
+
+        is_json_lines = upload.filename.lower().endswith((".jsonl", ".json"))
+        file_format = "jsonl" if is_json_lines else "csv"
+        report = import_events(upload.stream, file_format, session["user_id"])
+        if report["imported"]:
+            invalidate_event_caches()
+        flash(
+            f"{report['imported']} event(s) imported, {report['rejected']} row(s) rejected.",
+            "success" if not report["rejected"] else "warning",
+        )
+
+    return render_template(
+        "import_events.html", report=report, columns=", ".join(EVENT_COLUMNS)
+    )
+
+
+# Route for streaming export of the business user's events or reservations
+@bp.route("/export/<kind>")
+@login_required
+@business_required
+def export_data(kind):
+    """
+    Streams the business user's events or the reservations for their events
+    as CSV (default) or JSON Lines (?format=jsonl) without loading them all in memory.
+    """
+    exporters = {"events": export_events, "reservations": export_reservations}
+    if kind not in exporters:
+        abort(404)
+
+    file_format = "jsonl" if request.args.get("format") == "jsonl" else "csv"
+    rows = exporters[kind](session["user_id"], file_format)
+    mimetype = "application/x-ndjson" if file_format == "jsonl" else "text/csv"
+    return Response(
+        stream_with_context(rows),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={kind}.{file_format}"},
+    )
+
+
+# Route for edit events
+@bp.route("/edit_event/<int:event_id>", methods=["GET", "POST"])
+@use_primary
+@login_required
+@business_required
+def edit_event(event_id):
+    """
+    Allows business users to edit an existing event. Includes detailed form data validation.
+    Ensures that only the organizer of the event can edit it.
+    """
+    event = Event.query.get_or_404(event_id)
+
+    # Check if the logged-in user is the organizer of the event
+    if session["user_id"] != event.organizer_id:
+        flash("Only the organizer can edit this event.", "danger")
+        return redirect(url_for("business.business_profile"))
+
+    if request.method == "POST":
+        event.title = request.form["title"]
+        event.description = request.form["description"]
+        event.location = request.form["location"]
+
+        # Validation for field lengths with error messages
+        if len(event.title) > 100:
+            flash("Title is too long. Maximum 100 characters allowed.", "danger")
+            return render_template("edit_event.html", event=event)
+        if len(event.description) > 1000:
+            flash("Description is too long. Maximum 1000 characters allowed.", "danger")
+            return render_template("edit_event.html", event=event)
+        if len(event.location) > 120:
+            flash("Location is too long. Maximum 120 characters allowed.", "danger")
+            return render_template("edit_event.html", event=event)
+
+        # Extract and parse date and time
+        event_date_str = request.form["event_date"]
+        start_time_str = request.form["start_time"]
+        event.event_date = datetime.strptime(event_date_str, "%Y-%m-%d").date()
+        event.start_time = datetime.strptime(start_time_str, "%H:%M").time()
+
+        # Extract other event details and update the event
+        capacity = int(request.form["capacity"])
+        capacity_change = capacity - event.capacity
+        event.capacity = capacity
+        event.duration = int(request.form["duration"])
+
+        # Refuse a time slot already booked at the same location
+        starts_at, ends_at = event_period(
+            event.event_date, event.start_time, event.duration
+        )
+        lock_venues([event.location])
+        conflicts = find_conflicts(
+            event.location, starts_at, ends_at, exclude_id=event.id, limit=1
+        )
+        if conflicts:
+            flash(describe_conflict(event.location, conflicts[0]), "danger")
+            return render_template("edit_event.html", event=event)
+
+        # Update the event in the database
+        record_events(event.organizer_id, event.event_type, capacity=capacity_change)
+        if capacity_change:
+            # The event may have sold out or have seats again
+            enqueue("count_seats", {"event_id": event.id})
+        db.session.commit()
+        invalidate_event_caches()
+        # The capacity may have grown, so let bookings through again
+        reopen(event.id)
+
+        flash("Event updated successfully.", "success")
+        return redirect(url_for("business.business_profile"))
+
+    return render_template("edit_event.html", event=event)
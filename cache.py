@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, session, make_response
+
+
+class CacheBackend:
+    """
+    Interface for the page cache storage. A shared store (for example a Redis
+    client) can be plugged in by implementing these three methods.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process cache with a maximum number of entries and a per-entry TTL.
+    The least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PageCache:
+    """
+    Caches the rendered HTML of public pages for anonymous visitors.
+    Pages are keyed on the endpoint and the normalized query string, and the whole
+    cache is cleared whenever events or reservations change.
+    """
+
+    def __init__(self, backend=None, ttl=30):
+        self.backend = backend or LRUCache()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key():
+        # Sort the arguments and drop empty ones so equivalent URLs share an entry
+        args = sorted(
+            (name, value)
+            for name, values in request.args.lists()
+            for value in values
+            if value != ""
+        )
+        return f"page:{request.endpoint}?{urlencode(args)}"
+
+    def cacheable(self):
+        # Logged-in users and pending flash messages get a freshly rendered page
+        return (
+            self.ttl > 0
+            and request.method == "GET"
+            and "user_id" not in session
+            and not session.get("_flashes")
+        )
+
+    def cached(self, view):
+        """
+        Decorator that serves a view from the cache when possible and stores
+        successful responses. Adds an X-Cache header with HIT or MISS.
+        """
+
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if not self.cacheable():
+                return view(*args, **kwargs)
+
+            key = self.make_key()
+            cached = self.backend.get(key)
+            if cached is not None:
+                self.hits += 1
+                body, mimetype = cached
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            self.misses += 1
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                self.backend.set(key, (response.get_data(), response.mimetype), self.ttl)
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return decorated_function
+
+    def init_app(self, app):
+        """
+        Configures the cache from PAGE_CACHE_TTL and PAGE_CACHE_SIZE.
+        """
+        self.backend = LRUCache(max_entries=app.config["PAGE_CACHE_SIZE"])
+        self.ttl = app.config["PAGE_CACHE_TTL"]
+        app.extensions["page_cache"] = self
+
+    def invalidate(self):
+        self.backend.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+# Cache of the rendered public pages (index and events) for anonymous visitors
+page_cache = PageCache()
@@ -0,0 +1,244 @@
+import os
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from models import db, User, Event, Reservation
+from bulk import import_events
+from helpers import invalidate_event_caches
+from assets import build_assets
+from jobs import run_worker
+from stats import refresh_stats
+from archive import archive_past_events
+from sessions import invalidate_user_sessions
+from mail import create_mailer
+from database import REPLICA_BIND_PREFIX
+
+
+# CLI command to create the schema of a new database
+@click.command("init-db")
+@with_appcontext
+def init_db():
+    """
+    Creates all the tables of an empty database and marks it as up to date with
+    the migrations. Existing databases are upgraded with "flask db upgrade" instead.
+    """
+    # Imported here so that only this command loads Alembic
+    from flask_migrate import stamp
+
+    db.create_all()
+    stamp()
+    click.echo("Database created.")
+
+
+# CLI command to bulk import events for an organizer from a file
+@click.command("import-events")
+@click.argument("organizer_id", type=int)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def import_events_command(organizer_id, path):
+    """
+    Imports events for the given business user from a CSV or JSON Lines file.
+    """
+    organizer = db.session.get(User, organizer_id)
+    if organizer is None or not organizer.is_business:
+        raise click.ClickException(f"User {organizer_id} is not a business user.")
+
+    file_format = "jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv"
+    with open(path, "rb") as stream:
+        report = import_events(stream, file_format, organizer_id)
+    invalidate_event_caches()
+
+    for line_number, message in report["errors"]:
+        click.echo(f"Line {line_number}: {message}")
+    click.echo(
+        f"{report['imported']} event(s) imported, {report['rejected']} row(s) rejected."
+    )
+
+
+# CLI command to detect drift in the denormalized reserved_seats counter
+@click.command("reconcile-seats")
+@click.option("--fix", is_flag=True, help="Rewrite drifted counters from reservations.")
+@with_appcontext
+def reconcile_seats(fix):
+    """
+    Compares each event's reserved_seats counter with the sum of its reservations.
+    Reports every event that has drifted and, with --fix, rewrites the counter.
+    """
+    reserved_totals = (
+        db.session.query(
+            Reservation.event_id, func.sum(Reservation.seats).label("total")
+        )
+        .group_by(Reservation.event_id)
+        .subquery()
+    )
+    drifted = (
+        db.session.query(Event, func.coalesce(reserved_totals.c.total, 0))
+        .outerjoin(reserved_totals, reserved_totals.c.event_id == Event.id)
+        .filter(Event.reserved_seats != func.coalesce(reserved_totals.c.total, 0))
+        .all()
+    )
+
+    for event, actual in drifted:
+        click.echo(
+            f"Event {event.id}: counter={event.reserved_seats} reservations={actual}"
+        )
+        if fix:
+            event.reserved_seats = actual
+
+    if fix and drifted:
+        db.session.commit()
+    click.echo(f"{len(drifted)} event(s) with drifted reserved_seats.")
+
+
+# CLI command to turn a user into a business user or back
+@click.command("set-role")
+@click.argument("user_id", type=int)
+@click.argument("role", type=click.Choice(["user", "business"]))
+@click.option("--company-name", help="Company name of a business user.")
+@with_appcontext
+def set_role(user_id, role, company_name):
+    """
+    Changes the role of a user and logs them out of every server-side session, so the
+    new role applies from their next login.
+    """
+    user = db.session.get(User, user_id)
+    if user is None:
+        raise click.ClickException(f"User {user_id} does not exist.")
+
+    user.is_business = role == "business"
+    if company_name is not None:
+        user.company_name = company_name
+    db.session.commit()
+    invalidate_user_sessions(user_id)
+    click.echo(f"User {user_id} role set to {role}.")
+
+
+# CLI command to recompute the organizer dashboard statistics
+@click.command("rebuild-stats")
+@click.option(
+    "--organizer", "organizer_id", type=int, help="Only rebuild this organizer."
+)
+@with_appcontext
+def rebuild_stats_command(organizer_id):
+    """
+    Recomputes the organizer dashboard statistics from the events table and reports
+    how many rows had drifted. The worker also runs a full rebuild every hour.
+    """
+    changed = refresh_stats(organizer_id)
+    db.session.commit()
+    click.echo(f"{changed} statistics row(s) rebuilt.")
+
+
+# CLI command to move past events and their reservations to the archive tables
+@click.command("archive-events")
+@click.option("--days", type=int, help="Age in days (default ARCHIVE_AFTER_DAYS).")
+@click.option(
+    "--batch-size", type=int, help="Events per batch (default ARCHIVE_BATCH_SIZE)."
+)
+@with_appcontext
+def archive_events_command(days, batch_size):
+    """
+    Moves the events that took place more than --days days ago, with their
+    reservations, to the archive tables. The worker also does this every hour.
+    """
+    config = current_app.config
+    archived = archive_past_events(
+        config["ARCHIVE_AFTER_DAYS"] if days is None else days,
+        batch_size or config["ARCHIVE_BATCH_SIZE"],
+    )
+    invalidate_event_caches()
+    click.echo(f"{archived} event(s) archived.")
+
+
+# CLI command to build the fingerprinted, resized and precompressed static assets
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    """
+    Builds static/dist: content-hashed copies of every static file, resized image
+    variants for srcset and gzip/brotli copies of CSS and JS. Run it on every deploy.
+    """
+    manifest = build_assets(current_app.static_folder)
+    click.echo(
+        f"{len(manifest['files'])} file(s) and {len(manifest['images'])} image(s) built."
+    )
+
+
+# CLI command to run the background job worker
+@click.command("worker")
+@click.option("--threads", type=int, help="Worker threads (default WORKER_THREADS).")
+@click.option("--once", is_flag=True, help="Exit when no job is due instead of polling.")
+@with_appcontext
+def worker_command(threads, once):
+    """
+    Runs background jobs: booking confirmations, day-before event reminders, and the
+    hourly archival of past events and rebuild of the dashboard statistics.
+    Several workers can run at once, each claims its own batches of jobs.
+    """
+    # Registers the notification job handlers and the reminder schedule (the hourly
+    # statistics rebuild, session and waiting room pruning and archival are registered
+    # by the modules imported by the app)
+    import notifications  # noqa: F401
+
+    app = current_app._get_current_object()
+    run_worker(
+        app,
+        create_mailer(app.config),
+        threads=threads or app.config["WORKER_THREADS"],
+        once=once,
+        report=click.echo,
+    )
+
+
+# CLI command to refresh local SQLite replicas from the primary
+@click.command("copy-replicas")
+@with_appcontext
+def copy_replicas_command():
+    """
+    Copies the primary SQLite database over each SQLite replica of
+    SQLALCHEMY_REPLICA_URIS with SQLite's online backup, to try the replica routing
+    on one machine. Server replicas are kept up to date by the database's own
+    replication instead.
+    """
+    if db.engine.dialect.name != "sqlite":
+        raise click.ClickException("Only SQLite replicas can be copied.")
+
+    primary = db.engine.raw_connection()
+    try:
+        for key, engine in db.engines.items():
+            if key is None or not key.startswith(REPLICA_BIND_PREFIX):
+                continue
+            replica = engine.raw_connection()
+            try:
+                primary.driver_connection.backup(replica.driver_connection)
+            finally:
+                replica.close()
+            click.echo(f"Copied the database to {engine.url.database}.")
+    finally:
+        primary.close()
+
+
+def init_app(app):
+    """
+    Registers the flask commands of the app. Flask-Migrate (and with it Alembic) is
+    only set up when the app is loaded by the flask command, so web workers and tests
+    never import the migration tooling.
+    """
+    for command in (
+        init_db,
+        import_events_command,
+        reconcile_seats,
+        set_role,
+        rebuild_stats_command,
+        archive_events_command,
+        build_assets_command,
+        worker_command,
+        copy_replicas_command,
+    ):
+        app.cli.add_command(command)
+
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        from flask_migrate import Migrate
+
+        Migrate(app, db)
@@ -5,3 +5,129 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'not-set')
 
 # SQLALCHEMY_DATABASE_URI
 SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3')
+
+# Read replicas: DATABASE_REPLICA_URLS is a comma separated list of replica URLs. GET requests
+# read from a random replica, except on the booking and event editing pages; after a write, the
+# user's reads stay on the primary for REPLICA_PIN_SECONDS so they see their own changes.
+SQLALCHEMY_REPLICA_URIS = [
+    url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+]
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+
+# PAGINATION_MODE: 'offset' (numbered pages) or 'keyset' (cursor based next/prev)
+PAGINATION_MODE = os.getenv('PAGINATION_MODE', 'offset')
+
+# MAX_PER_PAGE: upper bound for the per_page query argument of the listing pages
+MAX_PER_PAGE = int(os.getenv('MAX_PER_PAGE', '50'))
+
+# SEARCH_MODE: 'full_text' (FTS5 on SQLite, tsvector on PostgreSQL, ranked by relevance) or
+# 'like' (substring LIKE scan of the title and description, e.g. for comparing the two)
+SEARCH_MODE = os.getenv('SEARCH_MODE', 'full_text')
+
+# PAGE_CACHE_TTL: seconds the public index and events pages are cached for (0 disables)
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '30'))
+
+# PAGE_CACHE_SIZE: maximum number of cached pages kept in memory
+PAGE_CACHE_SIZE = int(os.getenv('PAGE_CACHE_SIZE', '256'))
+
+# FACET_CACHE_TTL: seconds the match counts of the events page filters are cached for per
+# filter set (0 disables); FACET_CACHE_SIZE: maximum number of filter sets kept
+FACET_CACHE_TTL = int(os.getenv('FACET_CACHE_TTL', '60'))
+FACET_CACHE_SIZE = int(os.getenv('FACET_CACHE_SIZE', '256'))
+
+# COUNT_CACHE_TTL: seconds the approximate totals shown on keyset (cursor) pages are reused
+# for per listing query (0 disables); COUNT_CACHE_SIZE: maximum number of totals kept
+COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL', '60'))
+COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', '256'))
+
+# SESSION_BACKEND: 'cookie' (the default signed cookie), or a server-side store that leaves
+# only a session id in the cookie: 'memory' (single server, keeps the SESSION_MEMORY_SIZE
+# most recent sessions), 'database' (user_session table) or 'redis' (SESSION_REDIS_URL).
+# Sessions last PERMANENT_SESSION_LIFETIME from their last change.
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'cookie')
+SESSION_MEMORY_SIZE = int(os.getenv('SESSION_MEMORY_SIZE', '10000'))
+SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+
+# SESSION_PRINCIPAL_TTL: seconds the logged-in user's id, role and names are trusted
+# from the session before they are read from the database again
+SESSION_PRINCIPAL_TTL = int(os.getenv('SESSION_PRINCIPAL_TTL', '300'))
+
+# Admission control for bookings during on-sale spikes. ADMISSION_BACKEND: 'off' (the default),
+# 'memory' (single server), 'database' (admission_state table) or 'redis' (ADMISSION_REDIS_URL).
+# Each event lets through ADMISSION_RATE bookings per second, in bursts of up to ADMISSION_BURST;
+# other buyers wait in a first come, first served waiting room that their browser polls every
+# ADMISSION_POLL_INTERVAL seconds. Once an event sells out, bookings are turned away for
+# ADMISSION_SOLD_OUT_TTL seconds (or until seats are released) without querying the events table.
+ADMISSION_BACKEND = os.getenv('ADMISSION_BACKEND', 'off')
+ADMISSION_RATE = float(os.getenv('ADMISSION_RATE', '20'))
+ADMISSION_BURST = int(os.getenv('ADMISSION_BURST', '20'))
+ADMISSION_POLL_INTERVAL = int(os.getenv('ADMISSION_POLL_INTERVAL', '3'))
+ADMISSION_SOLD_OUT_TTL = int(os.getenv('ADMISSION_SOLD_OUT_TTL', '60'))
+ADMISSION_REDIS_URL = os.getenv('ADMISSION_REDIS_URL', 'redis://localhost:6379/0')
+
+# PASSWORD_HASH_METHOD: werkzeug method with explicit cost (e.g. 'pbkdf2:sha256:260000')
+# or 'bcrypt:<rounds>' (e.g. 'bcrypt:12'). Hashes using other settings are upgraded on login.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+
+# PASSWORD_HASH_WORKERS: threads per worker process used to verify passwords at login
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '4'))
+
+# PASSWORD_HASH_MAX_PENDING: login checks allowed to wait at once before new logins are turned away
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '16'))
+
+# MAX_QUERIES_PER_REQUEST: when set (e.g. in CI), requests running more SQL statements fail
+MAX_QUERIES_PER_REQUEST = int(os.getenv('MAX_QUERIES_PER_REQUEST', '0'))
+
+# PROFILING_ENABLED: record per-route timings, serve /metrics and add Server-Timing headers
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+
+# PROFILE_SAMPLE_RATE: fraction of requests (0.0-1.0) dumped as cProfile files to PROFILE_DIR
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# SQLALCHEMY_ENGINE_OPTIONS: connection pool settings for each worker process.
+# Pool sizes only apply to server databases; SQLite connections are cheap to open.
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+}
+if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+    SQLALCHEMY_ENGINE_OPTIONS.update(
+        pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '5')),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '10')),
+    )
+
+# SQLITE_BUSY_TIMEOUT: milliseconds a SQLite writer waits for the database lock
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))
+
+# Background jobs (flask worker): WORKER_THREADS threads per worker process, each claiming
+# JOB_BATCH_SIZE jobs at a time. Failed jobs are retried JOB_MAX_ATTEMPTS times with
+# exponential backoff from JOB_RETRY_DELAY seconds; jobs locked for JOB_LOCK_TIMEOUT
+# seconds by a worker that died are claimed again.
+WORKER_THREADS = int(os.getenv('WORKER_THREADS', '4'))
+JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', '10'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', '30'))
+JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', '300'))
+
+# REMINDER_CHUNK_SIZE: reservations per day-before reminder job
+REMINDER_CHUNK_SIZE = int(os.getenv('REMINDER_CHUNK_SIZE', '500'))
+
+# Archival: the worker moves events that took place more than ARCHIVE_AFTER_DAYS days ago,
+# with their reservations, to the archive tables in batches of ARCHIVE_BATCH_SIZE events
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+
+# MAIL_BACKEND: 'smtp' to deliver through MAIL_SERVER, or 'outbox' (the default stand-in)
+# to append messages to MAIL_OUTBOX_DIR/outbox.jsonl, optionally with simulated latency
+MAIL_BACKEND = os.getenv('MAIL_BACKEND', 'outbox')
+MAIL_SENDER = os.getenv('MAIL_SENDER', 'EventSphere <no-reply@eventsphere.local>')
+MAIL_SERVER = os.getenv('MAIL_SERVER', 'localhost')
+MAIL_PORT = int(os.getenv('MAIL_PORT', '25'))
+MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', '0') == '1'
+MAIL_OUTBOX_DIR = os.getenv('MAIL_OUTBOX_DIR', 'outbox')
+MAIL_OUTBOX_CONNECT_LATENCY = float(os.getenv('MAIL_OUTBOX_CONNECT_LATENCY', '0'))
+MAIL_OUTBOX_MESSAGE_LATENCY = float(os.getenv('MAIL_OUTBOX_MESSAGE_LATENCY', '0'))
@@ -0,0 +1,75 @@
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Bind keys of the read replicas in SQLALCHEMY_BINDS
+REPLICA_BIND_PREFIX = "replica_"
+
+
+def replica_binds(uris):
+    """
+    Returns the SQLALCHEMY_BINDS entries of the read replica URIs.
+    """
+    return {f"{REPLICA_BIND_PREFIX}{index}": uri for index, uri in enumerate(uris)}
+
+
+class RoutingSession(Session):
+    """
+    Session class of db.session that sends SELECT statements to the replica engine
+    chosen for the current request (info["replica"], see replicas.py) and everything
+    else to the primary. Flushes, other statements and session.connection() (so
+    begin_write) set info["wrote"], after which the session only uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or not getattr(clause, "is_select", False):
+                self.info["wrote"] = True
+            replica = self.info.get("replica")
+            if replica is not None and not self.info.get("wrote"):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def configure_sqlite(app, db, busy_timeout=5000):
+    """
+    Applies the SQLite settings for concurrent web workers to every new connection of
+    the primary and replica engines: WAL journaling so readers don't block the writer,
+    a busy timeout (in milliseconds) so writers wait for the lock instead of failing,
+    and synchronous=NORMAL, which is safe with WAL and avoids an fsync on every commit.
+    Does nothing on other databases.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", set_sqlite_pragmas)
+
+
+def begin_write(session):
+    """
+    On SQLite, opens the session's transaction with BEGIN IMMEDIATE so the reads that
+    decide a write (seat availability, claimable jobs) run under the database write lock.
+    On PostgreSQL the statements take their own row locks, so nothing is needed.
+    """
+    connection = session.connection()
+    if connection.dialect.name == "sqlite":
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def dispose_engine(app, db):
+    """
+    Drops the connections inherited from the parent process after a fork, so each
+    worker opens its own. close=False leaves the parent's connections untouched.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
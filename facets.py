@@ -0,0 +1,148 @@
+import calendar
+from collections import Counter
+from datetime import date, timedelta
+from urllib.parse import urlencode
+from flask import current_app
+from sqlalchemy import case, func, literal_column
+from cache import LRUCache
+
+# Arguments of the events page that narrow the events counted by the facets.
+# event_type and location are facets themselves and are applied after counting.
+BASE_FILTER_ARGS = ("search", "start_date", "end_date", "history")
+
+# Date buckets, in display order
+DATE_BUCKETS = [
+    ("past", "Past"),
+    ("this_week", "This week"),
+    ("this_month", "Later this month"),
+    ("later", "Later"),
+]
+
+# Locations listed on the events page, the busiest first
+MAX_LOCATION_FACETS = 10
+
+
+# Helper function to get the last day of this week (Sunday) and of this month
+def _bucket_bounds(today):
+    week_end = today + timedelta(days=6 - today.weekday())
+    month_end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+    return week_end, max(week_end, month_end)
+
+
+def bucket_dates(bucket, today=None):
+    """
+    Returns the (start_date, end_date) filter of a date bucket, either may be None.
+    """
+    today = today or date.today()
+    week_end, month_end = _bucket_bounds(today)
+    return {
+        "past": (None, today - timedelta(days=1)),
+        "this_week": (today, week_end),
+        "this_month": (week_end + timedelta(days=1), month_end),
+        "later": (month_end + timedelta(days=1), None),
+    }[bucket]
+
+
+def facet_key(args):
+    """
+    Returns the cache key of the counts for the base filters of a request. Empty
+    arguments are dropped, and the date is part of the key so buckets move daily.
+    """
+    values = sorted((name, args[name]) for name in BASE_FILTER_ARGS if args.get(name))
+    return f"facets:{date.today().isoformat()}?{urlencode(values)}"
+
+
+def grouped_counts(query, entity):
+    """
+    Counts the events of a filtered query per (event_type, date bucket, location) in
+    one grouped aggregate query. Returns a list of (event_type, bucket, location,
+    count) tuples, with "" as the type of events that have none.
+    """
+    today = date.today()
+    week_end, month_end = _bucket_bounds(today)
+    bucket = case(
+        (entity.event_date < today, "past"),
+        (entity.event_date <= week_end, "this_week"),
+        (entity.event_date <= month_end, "this_month"),
+        else_="later",
+    ).label("bucket")
+    # Events without a type are counted under "", like in the organizer statistics
+    event_type = func.coalesce(entity.event_type, "")
+    rows = (
+        query.order_by(None)
+        .with_entities(event_type, bucket, entity.location, func.count())
+        # Grouped by the label so PostgreSQL sees the same CASE as in the select
+        .group_by(entity.event_type, literal_column("bucket"), entity.location)
+        .all()
+    )
+    return [tuple(row) for row in rows]
+
+
+def cached_grouped_counts(args, build_query, entity):
+    """
+    Returns grouped_counts() for the base filters of args, from the facet cache when
+    possible. build_query is called with the base filter arguments on a miss.
+    """
+    cache = current_app.extensions.get("facets")
+    key = facet_key(args)
+    rows = cache.get(key) if cache is not None else None
+    if rows is None:
+        base_args = {name: args[name] for name in BASE_FILTER_ARGS if args.get(name)}
+        rows = grouped_counts(build_query(base_args), entity)
+        if cache is not None:
+            cache.set(key, rows, current_app.config["FACET_CACHE_TTL"])
+    return rows
+
+
+def facet_counts(rows, event_type="", location=""):
+    """
+    Sums the grouped counts into the match counts of each facet. Each facet is
+    counted with the other facet's selection applied but not its own, so its
+    entries show what choosing them would return. Only types with matches are
+    listed, plus the selected one so the dropdown can still show it.
+    Returns {"event_type": [(event_type, count)], "date": [(bucket, label, count)],
+    "location": [(location, count)]}.
+    """
+    types, buckets, locations = Counter(), Counter(), Counter()
+    for row_type, bucket, row_location, count in rows:
+        type_matches = not event_type or row_type == event_type
+        location_matches = not location or row_location == location
+        if location_matches:
+            types[row_type] += count
+        if type_matches and row_location:
+            locations[row_location] += count
+        if type_matches and location_matches:
+            buckets[bucket] += count
+    return {
+        "event_type": [
+            (row_type, types[row_type])
+            for row_type in sorted(set(types) | {event_type})
+            if row_type and (types[row_type] or row_type == event_type)
+        ],
+        "date": [
+            (bucket, label, buckets[bucket])
+            for bucket, label in DATE_BUCKETS
+            if buckets[bucket]
+        ],
+        "location": locations.most_common(MAX_LOCATION_FACETS),
+    }
+
+
+def init_app(app):
+    """
+    Sets up the cache of the grouped facet counts (FACET_CACHE_TTL, FACET_CACHE_SIZE).
+    """
+    app.extensions["facets"] = (
+        LRUCache(max_entries=app.config["FACET_CACHE_SIZE"])
+        if app.config["FACET_CACHE_TTL"] > 0
+        else None
+    )
+
+
+def invalidate_facets():
+    """
+    Drops the cached facet counts after events are created, changed or archived.
+    """
+    cache = current_app.extensions.get("facets")
+    if cache is not None:
+        cache.clear()
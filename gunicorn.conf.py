@@ -0,0 +1,24 @@
+import os
+
+# Gunicorn settings, read automatically when gunicorn starts from this directory
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+
+# Give every worker its own connection pool instead of sockets shared with the parent
+def post_fork(server, worker):
+    from app import app
+    from models import db
+    from database import dispose_engine
+
+    dispose_engine(app, db)
+
+
+# With preload_app the parent has imported the app: compile the templates once there
+def when_ready(server):
+    if preload_app:
+        from app import app, precompile_templates
+
+        precompile_templates(app)
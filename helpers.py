@@ -0,0 +1,197 @@
+import time
+from datetime import datetime
+from functools import wraps
+from flask import current_app, flash, g, redirect, request, session, url_for
+from models import db, User, Event
+from pagination import paginate_with_total, KeysetPagination
+from search import apply_search, like_search
+from cache import page_cache
+from facets import bucket_dates, invalidate_facets
+
+
+# Session keys holding the logged-in user's identity (the principal)
+PRINCIPAL_KEYS = ("user_id", "is_business", "username", "company_name", "principal_at")
+
+
+# Helper function to store the identity of the user logging in in the session
+def remember_principal(user):
+    session["user_id"] = user.id
+    session["is_business"] = bool(user.is_business)
+    session["username"] = user.username
+    session["company_name"] = user.company_name
+    session["principal_at"] = time.time()
+
+
+# Helper function to remove the logged-in user's identity from the session
+def forget_principal():
+    for key in PRINCIPAL_KEYS:
+        session.pop(key, None)
+
+
+# Helper function to check if user is authenticated
+def is_authenticated():
+    if "user_id" not in session:
+        return False
+    # The identity in the session is trusted for SESSION_PRINCIPAL_TTL seconds, so
+    # login and role checks run without a query, then it is read again once
+    age = time.time() - session.get("principal_at", 0)
+    if age > current_app.config["SESSION_PRINCIPAL_TTL"]:
+        user = get_current_user()
+        if user is None:
+            forget_principal()
+            return False
+        remember_principal(user)
+    return True
+
+
+# Helper function to get the logged-in user, loaded at most once per request
+def get_current_user():
+    if "user_id" not in session:
+        return None
+    if "current_user" not in g:
+        g.current_user = db.session.get(User, session["user_id"])
+    return g.current_user
+
+
+# Helper function to check if the logged-in user is a business user
+def is_business_user():
+    return is_authenticated() and bool(session.get("is_business"))
+
+
+# Decorator to ensure user is logged in
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not is_authenticated():
+            flash("Please log in to access this page.", "danger")
+            return redirect(url_for("auth.login"))
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+# Decorator to ensure user is a business user
+def business_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not is_business_user():
+            flash("This page is only accessible to business users.", "danger")
+            return redirect(url_for("main.index"))
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+# Helper function to drop every cached public page after events or reservations change.
+# Bookings pass events=False: seat counts leave the facet counts unchanged.
+def invalidate_event_caches(events=True):
+    if events:
+        invalidate_facets()
+    page_cache.invalidate()
+
+
+# Helper function to apply the events page filters to an event query
+def filter_events(query, args, entity=Event):
+    """
+    Filters a query selecting events (or event columns) by the event_type, location,
+    start_date, end_date and search arguments of the events page. Searches are ranked
+    by relevance.
+    entity is the mapped event entity the query selects (Event or the history union).
+    Raises ValueError if a date is not in YYYY-MM-DD format.
+    """
+    search = args.get("search", "")
+    event_type = args.get("event_type", "")
+    location = args.get("location", "")
+    start_date = args.get("start_date", "")
+    end_date = args.get("end_date", "")
+
+    if event_type:
+        query = query.filter(entity.event_type == event_type)
+    if location:
+        query = query.filter(entity.location == location)
+    if start_date:
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d")
+        query = query.filter(entity.event_date >= start_date_obj)
+    if end_date:
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
+        query = query.filter(entity.event_date <= end_date_obj)
+    if search:
+        if current_app.config["SEARCH_MODE"] == "like":
+            query = like_search(query, search, entity)
+        else:
+            # Full-text search ranked by relevance (FTS5 / tsvector)
+            query = apply_search(query, search, db.engine.dialect.name, entity)
+    return query
+
+
+# Helper function to paginate a listing in offset or keyset (cursor) mode
+def paginate_listing(query, keys):
+    """
+    Paginates a listing query ordered by the given unique key columns.
+    Keyset mode is used when it is configured or when the request carries a cursor,
+    otherwise numbered pages are used. per_page is capped by MAX_PER_PAGE.
+    """
+    per_page = request.args.get("per_page", 8, type=int)
+    cursor = request.args.get("cursor")
+    max_per_page = current_app.config["MAX_PER_PAGE"]
+    if cursor is not None or current_app.config["PAGINATION_MODE"] == "keyset":
+        return KeysetPagination(
+            query.order_by(None),
+            keys,
+            cursor=cursor,
+            per_page=per_page,
+            max_per_page=max_per_page,
+        )
+
+    page = request.args.get("page", 1, type=int)
+    return paginate_with_total(
+        query.order_by(*keys),
+        page=page,
+        per_page=per_page,
+        max_per_page=max_per_page,
+    )
+
+
+# Template helper to build the URL of another keyset page, keeping the filters
+def url_for_cursor(cursor):
+    args = request.args.to_dict()
+    args["cursor"] = cursor
+    return url_for(request.endpoint, **args)
+
+
+# Template helper to build the URL of another numbered page, keeping the filters
+def url_for_page(page):
+    args = request.args.to_dict()
+    args["page"] = page
+    return url_for(request.endpoint, **args)
+
+
+# Template helper to build the URL of the first page with some filters changed.
+# date_bucket sets start_date and end_date to the bucket's range; None removes a filter.
+def url_for_filter(date_bucket=None, **changes):
+    args = request.args.to_dict()
+    for name in ("page", "cursor"):
+        args.pop(name, None)
+    if date_bucket is not None:
+        start_date, end_date = bucket_dates(date_bucket)
+        changes["start_date"] = start_date and start_date.isoformat()
+        changes["end_date"] = end_date and end_date.isoformat()
+    args.update(changes)
+    return url_for(
+        request.endpoint,
+        **{name: value for name, value in args.items() if value not in (None, "")},
+    )
+
+
+# Custom Jinja filter to format datetime
+def format_datetime(value, format="%Y-%m-%d"):
+    if value is None:
+        return ""
+    return value.strftime(format)
+
+
+# Custom Jinja filter to format time
+def format_time(value, format="%H:%M"):
+    if value is None:
+        return ""
+    return value.strftime(format)
@@ -0,0 +1,293 @@
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, or_, select, update
+from models import db, Job
+from database import begin_write
+
+# Seconds between two throughput reports of the worker
+STATS_INTERVAL = 10
+
+# Handlers by job kind and periodic tasks, registered with the decorators below
+HANDLERS = {}
+BATCH_KINDS = set()
+PERIODIC_TASKS = []
+
+
+def job_handler(kind, batch=False):
+    """
+    Decorator registering fn(payload) as the handler of a job kind. Handlers return
+    the email messages to send (or nothing); the messages of all the jobs claimed in
+    one batch are sent together over a single mailer connection.
+    With batch=True the handler is called once as fn(payloads) with the payloads of
+    all the jobs of its kind claimed together, and sends no email.
+    """
+
+    def register(fn):
+        HANDLERS[kind] = fn
+        if batch:
+            BATCH_KINDS.add(kind)
+        return fn
+
+    return register
+
+
+def periodic_task(seconds):
+    """
+    Decorator registering fn() to be run by the worker every given number of seconds.
+    """
+
+    def register(fn):
+        PERIODIC_TASKS.append((seconds, fn))
+        return fn
+
+    return register
+
+
+def enqueue(kind, payload, run_at=None, dedupe_key=None):
+    """
+    Adds a job to the session. It is saved by the caller's next commit, so the job is
+    enqueued atomically with the change that caused it (e.g. a new reservation).
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        run_at=run_at or datetime.utcnow(),
+        dedupe_key=dedupe_key,
+    )
+    db.session.add(job)
+    return job
+
+
+def claim_jobs(worker_id, limit, lock_timeout):
+    """
+    Marks up to limit due jobs as running for this worker and returns their
+    (id, kind, payload) rows. On PostgreSQL rows being claimed by another worker are
+    skipped (FOR UPDATE SKIP LOCKED) so workers never wait on each other; on SQLite the
+    claim runs under the database write lock. Jobs left running by a worker that died
+    are claimed again once they have been locked for lock_timeout seconds.
+    """
+    now = datetime.utcnow()
+    begin_write(db.session)
+    due = or_(
+        and_(Job.status == "pending", Job.run_at <= now),
+        and_(
+            Job.status == "running",
+            Job.locked_at < now - timedelta(seconds=lock_timeout),
+        ),
+    )
+    rows = db.session.execute(
+        select(Job.id, Job.kind, Job.payload)
+        .where(due)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if rows:
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_([row.id for row in rows]))
+            .values(
+                status="running",
+                locked_at=now,
+                locked_by=worker_id,
+                attempts=Job.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return rows
+
+
+def complete_jobs(job_ids):
+    """
+    Removes finished jobs. Jobs with a dedupe key are kept as done instead, so the
+    same work is never enqueued again.
+    """
+    if not job_ids:
+        return
+    db.session.execute(
+        delete(Job)
+        .where(Job.id.in_(job_ids), Job.dedupe_key.is_(None))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids))
+        .values(status="done", locked_at=None, locked_by=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def fail_job(job_id, error, max_attempts, retry_delay):
+    """
+    Records a job failure. The job is retried with exponential backoff until it has
+    been attempted max_attempts times, after which it is left as failed.
+    """
+    job = db.session.get(Job, job_id)
+    job.last_error = str(error)[:1000]
+    job.locked_at = None
+    job.locked_by = None
+    if job.attempts >= max_attempts:
+        job.status = "failed"
+    else:
+        job.status = "pending"
+        delay = retry_delay * 2 ** (job.attempts - 1)
+        job.run_at = datetime.utcnow() + timedelta(seconds=delay)
+    db.session.commit()
+
+
+def queue_depth():
+    """
+    Returns the number of jobs in each status.
+    """
+    rows = db.session.execute(select(Job.status, func.count()).group_by(Job.status))
+    return dict(rows.all())
+
+
+class WorkerStats:
+    """
+    Thread-safe totals of the jobs run, failed and emails sent by job kind.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(int))
+        self.started = time.perf_counter()
+
+    def record(self, kind, jobs=0, failed=0, messages=0):
+        with self._lock:
+            totals = self._totals[kind]
+            totals["jobs"] += jobs
+            totals["failed"] += failed
+            totals["messages"] += messages
+
+    def summary(self):
+        """
+        Returns one line per job kind with the totals and throughput so far.
+        """
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        with self._lock:
+            totals = {kind: dict(values) for kind, values in self._totals.items()}
+        return [
+            f"{kind}: {values['jobs']} job(s) ({values['jobs'] / elapsed:.1f}/s), "
+            f"{values['messages']} email(s) ({values['messages'] / elapsed:.1f}/s), "
+            f"{values['failed']} failed"
+            for kind, values in sorted(totals.items())
+        ]
+
+
+def run_batch(worker_id, mailer, config, stats):
+    """
+    Claims a batch of due jobs, runs their handlers and sends all the resulting
+    emails in one mailer call. Returns the number of jobs claimed.
+    """
+    jobs = claim_jobs(worker_id, config["JOB_BATCH_SIZE"], config["JOB_LOCK_TIMEOUT"])
+    if not jobs:
+        return 0
+
+    results, failed = [], []
+    batches = defaultdict(list)
+    for job in jobs:
+        if job.kind in BATCH_KINDS:
+            batches[job.kind].append(job)
+            continue
+        try:
+            messages = HANDLERS[job.kind](job.payload) or []
+            results.append((job, messages))
+        except Exception as error:
+            db.session.rollback()
+            failed.append((job, error))
+    for kind, batch in batches.items():
+        try:
+            HANDLERS[kind]([job.payload for job in batch])
+            results.extend((job, []) for job in batch)
+        except Exception as error:
+            db.session.rollback()
+            failed.extend((job, error) for job in batch)
+
+    messages = [message for job, batch in results for message in batch]
+    try:
+        mailer.send_many(messages)
+    except Exception as error:
+        # Jobs that had emails to send are retried, the others are done
+        failed.extend((job, error) for job, batch in results if batch)
+        results = [(job, batch) for job, batch in results if not batch]
+
+    complete_jobs([job.id for job, batch in results])
+    for job, error in failed:
+        fail_job(job.id, error, config["JOB_MAX_ATTEMPTS"], config["JOB_RETRY_DELAY"])
+
+    for job, batch in results:
+        stats.record(job.kind, jobs=1, messages=len(batch))
+    for job, error in failed:
+        stats.record(job.kind, failed=1)
+    return len(jobs)
+
+
+def run_worker(app, mailer, threads=4, once=False, report=print, poll_interval=1.0):
+    """
+    Runs jobs on a pool of threads until interrupted, or with once=True until no job
+    is due. Periodic tasks run on the calling thread and the throughput of each job
+    kind is reported every STATS_INTERVAL seconds. Returns the WorkerStats.
+    """
+    stats = WorkerStats()
+    stop = threading.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def work(number):
+        worker_id = f"{prefix}:{number}"
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    claimed = run_batch(worker_id, mailer, app.config, stats)
+                except Exception as error:
+                    db.session.rollback()
+                    report(f"{worker_id}: {error}")
+                    claimed = 0
+                if not claimed:
+                    # Running jobs may still enqueue more work (reminder fan-out)
+                    if once and not queue_depth().get("running"):
+                        return
+                    stop.wait(poll_interval)
+
+    def run_periodic_tasks(last_runs):
+        with app.app_context():
+            for seconds, fn in PERIODIC_TASKS:
+                if time.monotonic() - last_runs.get(fn, float("-inf")) < seconds:
+                    continue
+                try:
+                    fn()
+                except Exception as error:
+                    db.session.rollback()
+                    report(f"{fn.__name__}: {error}")
+                last_runs[fn] = time.monotonic()
+
+    last_runs = {}
+    run_periodic_tasks(last_runs)
+    pool = [threading.Thread(target=work, args=(number,)) for number in range(threads)]
+    for thread in pool:
+        thread.start()
+
+    last_report = time.monotonic()
+    try:
+        while any(thread.is_alive() for thread in pool):
+            time.sleep(0.2)
+            if not once:
+                run_periodic_tasks(last_runs)
+            if time.monotonic() - last_report >= STATS_INTERVAL:
+                for line in stats.summary():
+                    report(line)
+                last_report = time.monotonic()
+    except KeyboardInterrupt:
+        stop.set()
+    for thread in pool:
+        thread.join()
+    for line in stats.summary():
+        report(line)
+    return stats
+
@@ -0,0 +1,113 @@
+import json
+import os
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from email.mime.text import MIMEText
+
+# Plain email waiting to be sent. Only the SMTP mailer encodes it as MIME, so job
+# handlers and the outbox stand-in don't pay for building email.message objects.
+Email = namedtuple("Email", ["sender", "to", "subject", "body"])
+
+
+def make_message(sender, to, subject, body):
+    return Email(sender, to, subject, body)
+
+
+# Helper function to encode an email as a MIME message (the compat32 classes are
+# several times faster to build than EmailMessage)
+def to_mime(message):
+    mime = MIMEText(message.body, "plain", "utf-8")
+    mime["From"] = message.sender
+    mime["To"] = message.to
+    mime["Subject"] = message.subject
+    return mime
+
+
+class Mailer:
+    """
+    Interface for sending email. send_many() delivers a batch of messages over a
+    single connection, which is how the worker sends confirmations and reminders.
+    """
+
+    def send_many(self, messages):
+        raise NotImplementedError
+
+
+class SMTPMailer(Mailer):
+    """
+    Sends messages through an SMTP server, opening one connection per batch.
+    """
+
+    def __init__(
+        self,
+        host="localhost",
+        port=25,
+        username=None,
+        password=None,
+        use_tls=False,
+        timeout=30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send_many(self, messages):
+        if not messages:
+            return
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                smtp.send_message(to_mime(message))
+
+
+class OutboxMailer(Mailer):
+    """
+    SMTP stand-in for development and load tests: appends every message as a JSON
+    line to outbox.jsonl in a directory instead of delivering it. connect_latency and
+    message_latency (seconds) simulate the round trips of a real SMTP server.
+    """
+
+    def __init__(self, directory="outbox", connect_latency=0.0, message_latency=0.0):
+        self.directory = directory
+        self.connect_latency = connect_latency
+        self.message_latency = message_latency
+        self._lock = threading.Lock()
+
+    def send_many(self, messages):
+        if not messages:
+            return
+        time.sleep(self.connect_latency + self.message_latency * len(messages))
+        lines = [
+            json.dumps(message._asdict()) + "\n" for message in messages
+        ]
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, "outbox.jsonl")
+        with self._lock, open(path, "a") as outbox:
+            outbox.writelines(lines)
+
+
+def create_mailer(config):
+    """
+    Returns the mailer selected by MAIL_BACKEND: "smtp" or "outbox" (the stand-in).
+    """
+    if config["MAIL_BACKEND"] == "smtp":
+        return SMTPMailer(
+            host=config["MAIL_SERVER"],
+            port=config["MAIL_PORT"],
+            username=config["MAIL_USERNAME"],
+            password=config["MAIL_PASSWORD"],
+            use_tls=config["MAIL_USE_TLS"],
+        )
+    return OutboxMailer(
+        directory=config["MAIL_OUTBOX_DIR"],
+        connect_latency=config["MAIL_OUTBOX_CONNECT_LATENCY"],
+        message_latency=config["MAIL_OUTBOX_MESSAGE_LATENCY"],
+    )
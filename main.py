@@ -0,0 +1,291 @@
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+from sqlalchemy.orm import contains_eager
+from models import db, User, Event, Reservation
+from archive import archived_ids, event_source, include_history, reservation_source
+from admission import admit, is_sold_out, queue_position, waiting_ticket
+from replicas import use_primary
+from booking import reserve_seats, change_reservation_seats, cancel_reservation
+from cache import page_cache
+from facets import cached_grouped_counts, facet_counts
+from helpers import (
+    filter_events,
+    invalidate_event_caches,
+    is_business_user,
+    login_required,
+    paginate_listing,
+)
+
+# Blueprint for the public pages and the reservations of regular users
+bp = Blueprint("main", __name__)
+
+
+# Route for the index page
+@bp.route("/")
+@page_cache.cached
+def index():
+    """
+    Render the index page.
+    Fetches a list of events ordered by start time and limits to 6 for display.
+    """
+    events = Event.query.order_by(Event.start_time).limit(6).all()
+    return render_template("index.html", events=events)
+
+
+# Route for display events
+@bp.route("/events")
+@page_cache.cached
+def events():
+    """
+    Displays the list of events. Includes filters for event type, location, start and end dates,
+    and a search term, with the number of events matching each type, date bucket and location.
+    Archived events are only listed when history=1 is passed.
+    Implements pagination for displaying the events.
+    """
+    # Live events only, unless archived events are asked for with ?history=1
+    history = include_history(request.args)
+    source = event_source(request.args)
+
+    # Build the query based on filters
+    query = filter_events(db.session.query(source), request.args, source)
+
+    # Match counts per event type, date bucket and location, from one grouped query
+    # over the search, date and history filters (cached per filter set)
+    facets = facet_counts(
+        cached_grouped_counts(
+            request.args,
+            lambda args: filter_events(db.session.query(source), args, source),
+            source,
+        ),
+        event_type=request.args.get("event_type", ""),
+        location=request.args.get("location", ""),
+    )
+
+    # Load each event's organizer in the same statement used for the page
+    query = query.join(source.organizer).options(contains_eager(source.organizer))
+
+    # Pagination (items and total count come from a single query)
+    events_paginated = paginate_listing(
+        query, [source.event_date, source.start_time, source.id]
+    )
+
+    return render_template(
+        "events.html",
+        events=events_paginated.items,
+        pagination=events_paginated,
+        facets=facets,
+        history=history,
+        archived=archived_ids(events_paginated.items) if history else set(),
+    )
+
+
+# Route for user profile
+@bp.route("/user_profile")
+@login_required
+def user_profile():
+    """
+    Displays the user profile page with the user's reservations.
+    Implements pagination for the reservations list. Reservations of archived events
+    are only listed when history=1 is passed.
+    """
+    user_id = session["user_id"]
+
+    # Live reservations only, unless archived ones are asked for with ?history=1
+    history = include_history(request.args)
+    reservation = reservation_source(request.args)
+    event = event_source(request.args)
+
+    # Load each reservation's event and organizer in the same query,
+    # limited to the columns the profile cards display
+    query = (
+        db.session.query(reservation)
+        .filter(reservation.user_id == user_id)
+        .join(reservation.event.of_type(event))
+        .join(event.organizer)
+        .options(
+            contains_eager(reservation.event.of_type(event))
+            .load_only(
+                event.title,
+                event.description,
+                event.event_type,
+                event.location,
+                event.event_date,
+                event.start_time,
+                event.duration,
+            )
+            .contains_eager(event.organizer)
+            .load_only(User.company_name)
+        )
+    )
+
+    # Pagination setup for reservations
+    reservations_paginated = paginate_listing(
+        query, [reservation.date, reservation.id]
+    )
+    events = [item.event for item in reservations_paginated.items]
+
+    return render_template(
+        "user_profile.html",
+        username=session["username"],
+        reservations=reservations_paginated.items,
+        pagination=reservations_paginated,
+        history=history,
+        archived=archived_ids(events) if history else set(),
+    )
+
+
+# Route for reserves
+@bp.route("/reserve/<int:event_id>", methods=["GET", "POST"])
+@use_primary
+@login_required
+def reserve(event_id):
+    """
+    Handles reservation creation for a specific event. Includes checks for event existence,
+    user authentication, and seat availability.
+    With admission control on, bookings of sold-out events are turned away and bookings
+    beyond the event's admission rate are sent to its waiting room, both before any
+    query on the events table.
+    """
+    # Check if the user is a business user (business users can't make reservations)
+    if is_business_user():
+        flash("Business users cannot make reservations.", "danger")
+        return redirect(url_for("main.events"))
+
+    if request.method == "POST":
+        try:
+            seats = int(request.form["seats"])
+        except ValueError:
+            flash("Invalid number of seats.", "danger")
+            return redirect(url_for("main.reserve", event_id=event_id))
+
+        if seats < 1:
+            flash("Invalid number of seats.", "danger")
+            return redirect(url_for("main.reserve", event_id=event_id))
+
+        if is_sold_out(event_id):
+            flash("This event is sold out.", "danger")
+            return redirect(url_for("main.events"))
+
+        # Wait in line when too many users are booking the event at once
+        if admit(event_id, seats):
+            return redirect(url_for("main.waiting_room", event_id=event_id))
+
+        # Atomically check availability and create the reservation
+        if reserve_seats(event_id, session["user_id"], seats):
+            invalidate_event_caches(events=False)
+            flash("Reservation successful.", "success")
+        elif db.session.get(Event, event_id) is None:
+            abort(404)
+        else:
+            flash("Not enough seats available.", "danger")
+
+        return redirect(url_for("main.events"))
+
+    # Fetch the event or return 404 if not found
+    event = Event.query.get_or_404(event_id)
+
+    # Available seats come from the maintained reserved_seats counter
+    available_seats = event.available_seats
+
+    return render_template("reserve.html", event=event, available_seats=available_seats)
+
+
+# Route for the waiting room of an event's bookings
+@bp.route("/reserve/<int:event_id>/waiting")
+@login_required
+def waiting_room(event_id):
+    """
+    Shows the user's place in line for booking an event. The page polls
+    waiting_room_position and sends the booking once the user is admitted.
+    """
+    ticket = waiting_ticket(event_id)
+    if ticket is None:
+        return redirect(url_for("main.reserve", event_id=event_id))
+
+    if is_sold_out(event_id):
+        flash("This event is sold out.", "danger")
+        return redirect(url_for("main.events"))
+
+    event = Event.query.get_or_404(event_id)
+    return render_template(
+        "waiting_room.html",
+        event=event,
+        seats=ticket["seats"],
+        position=queue_position(event_id),
+        poll_interval=current_app.config["ADMISSION_POLL_INTERVAL"],
+    )
+
+
+# Route polled by the waiting room page
+@bp.route("/reserve/<int:event_id>/position")
+@login_required
+def waiting_room_position(event_id):
+    """
+    Returns the user's position in the event's waiting room (0 once they may book)
+    and whether the event sold out meanwhile.
+    """
+    response = jsonify(
+        position=queue_position(event_id), sold_out=is_sold_out(event_id)
+    )
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+# Route for edit reservations
+@bp.route("/edit_reservation/<int:reservation_id>", methods=["GET", "POST"])
+@use_primary
+@login_required
+def edit_reservation(reservation_id):
+    """
+    Allows users to edit or cancel their existing reservation.
+    Checks that the reservation exists and that the logged-in user is the one who made the reservation.
+    Handles the update of reservation details.
+    """
+    # Fetch the reservation and the corresponding event or return 404 if not found
+    reservation = Reservation.query.get_or_404(reservation_id)
+    event = Event.query.get_or_404(reservation.event_id)
+
+    # Ensure the logged-in user is the one who made the reservation
+    if session["user_id"] != reservation.user_id:
+        flash("You can only edit your own reservations.", "danger")
+        return redirect(url_for("main.user_profile"))
+
+    # Available seats come from the maintained reserved_seats counter
+    available_seats = event.available_seats
+
+    if request.method == "POST":
+        if "cancel" in request.form:
+            # Delete the reservation if the user chooses to cancel it
+            cancel_reservation(reservation)
+            invalidate_event_caches(events=False)
+            flash("Reservation cancelled successfully.", "success")
+            return redirect(url_for("main.user_profile"))
+
+        # Update the number of seats in the reservation
+        seats = int(request.form["seats"])
+
+        # Atomically check that the extra seats are available and update
+        # (the seats already held by this reservation can be reused)
+        if seats >= 1 and change_reservation_seats(reservation, seats):
+            invalidate_event_caches(events=False)
+            flash("Reservation updated successfully.", "success")
+            return redirect(url_for("main.user_profile"))
+        else:
+            flash("Not enough seats available.", "danger")
+
+    return render_template(
+        "edit_reservation.html",
+        reservation=reservation,
+        event=event,
+        available_seats=available_seats,
+    )
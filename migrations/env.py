@@ -51,6 +51,14 @@ def get_metadata():
     return target_db.metadata
 
 
+# The SQLite full-text search index (event_fts and its shadow tables) is created by
+# raw DDL, so autogenerate must not see it as tables missing from the models
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and reflected and name.startswith('event_fts'):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +73,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +102,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
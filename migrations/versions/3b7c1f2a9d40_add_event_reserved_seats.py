@@ -0,0 +1,34 @@
+"""Add reserved_seats counter to event
+
+Revision ID: 3b7c1f2a9d40
+Revises: edfeb19a7680
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1f2a9d40'
+down_revision = 'edfeb19a7680'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reserved_seats', sa.Integer(),
+                                      nullable=False, server_default='0'))
+
+    # Backfill the counter from the existing reservations
+    op.execute(
+        'UPDATE event SET reserved_seats = ('
+        'SELECT COALESCE(SUM(reservation.seats), 0) FROM reservation '
+        'WHERE reservation.event_id = event.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_column('reserved_seats')
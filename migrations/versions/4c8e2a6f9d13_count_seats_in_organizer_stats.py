@@ -0,0 +1,58 @@
+"""Keep the seats sold of the dashboard in organizer_stats, counted by a job
+
+Revision ID: 4c8e2a6f9d13
+Revises: 6d2f8b1c4e57
+Create Date: 2026-10-22 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2a6f9d13'
+down_revision = '6d2f8b1c4e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('organizer_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seats_sold', sa.Integer(), nullable=False,
+                                      server_default='0'))
+        batch_op.add_column(sa.Column('sold_out_events', sa.Integer(), nullable=False,
+                                      server_default='0'))
+
+    for table in ['event', 'event_archive']:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('counted_seats', sa.Integer(),
+                                          nullable=False, server_default='0'))
+            batch_op.add_column(sa.Column('counted_sold_out', sa.Boolean(),
+                                          nullable=False, server_default=sa.false()))
+
+    # Count the seats already sold, as if the count_seats job had run for every event
+    op.execute(
+        "UPDATE event SET counted_seats = reserved_seats, "
+        "counted_sold_out = (reserved_seats >= capacity)"
+    )
+    op.execute(
+        "UPDATE organizer_stats SET "
+        "seats_sold = (SELECT COALESCE(SUM(reserved_seats), 0) FROM event "
+        "WHERE event.organizer_id = organizer_stats.organizer_id "
+        "AND COALESCE(event.event_type, '') = organizer_stats.event_type), "
+        "sold_out_events = (SELECT COUNT(*) FROM event "
+        "WHERE event.organizer_id = organizer_stats.organizer_id "
+        "AND COALESCE(event.event_type, '') = organizer_stats.event_type "
+        "AND reserved_seats >= capacity)"
+    )
+
+
+def downgrade():
+    for table in ['event_archive', 'event']:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('counted_sold_out')
+            batch_op.drop_column('counted_seats')
+
+    with op.batch_alter_table('organizer_stats', schema=None) as batch_op:
+        batch_op.drop_column('sold_out_events')
+        batch_op.drop_column('seats_sold')
@@ -0,0 +1,42 @@
+"""Sum the seats sold of the dashboard from the events instead of organizer_stats
+
+Revision ID: 6d2f8b1c4e57
+Revises: 9b3e7d5a2c61
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f8b1c4e57'
+down_revision = '9b3e7d5a2c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('organizer_stats', schema=None) as batch_op:
+        batch_op.drop_column('sold_out_events')
+        batch_op.drop_column('seats_sold')
+
+
+def downgrade():
+    with op.batch_alter_table('organizer_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seats_sold', sa.Integer(), nullable=False,
+                                      server_default='0'))
+        batch_op.add_column(sa.Column('sold_out_events', sa.Integer(), nullable=False,
+                                      server_default='0'))
+
+    # Fill the totals the bookings no longer maintained
+    op.execute(
+        "UPDATE organizer_stats SET "
+        "seats_sold = (SELECT COALESCE(SUM(reserved_seats), 0) FROM event "
+        "WHERE event.organizer_id = organizer_stats.organizer_id "
+        "AND COALESCE(event.event_type, '') = organizer_stats.event_type), "
+        "sold_out_events = (SELECT COUNT(*) FROM event "
+        "WHERE event.organizer_id = organizer_stats.organizer_id "
+        "AND COALESCE(event.event_type, '') = organizer_stats.event_type "
+        "AND reserved_seats >= capacity)"
+    )
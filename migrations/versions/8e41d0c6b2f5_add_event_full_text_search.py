@@ -0,0 +1,72 @@
+"""Add full-text search index for events
+
+Revision ID: 8e41d0c6b2f5
+Revises: 3b7c1f2a9d40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e41d0c6b2f5'
+down_revision = '3b7c1f2a9d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+            "title, description, content='event', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN "
+            "INSERT INTO event_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN "
+            "INSERT INTO event_fts(event_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS event_fts_au "
+            "AFTER UPDATE OF title, description ON event BEGIN "
+            "INSERT INTO event_fts(event_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO event_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        # Index the events that already exist
+        op.execute("INSERT INTO event_fts(event_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE event ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_event_search_vector "
+            "ON event USING GIN (search_vector)"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS event_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS event_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS event_fts_ai")
+        op.execute("DROP TABLE IF EXISTS event_fts")
+
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_event_search_vector")
+        op.execute("ALTER TABLE event DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,79 @@
+"""Never reuse event and reservation ids on SQLite
+
+Revision ID: 9b3e7d5a2c61
+Revises: a4d9c2e7f315
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e7d5a2c61'
+down_revision = 'a4d9c2e7f315'
+branch_labels = None
+depends_on = None
+
+# Full-text search triggers on event (see 8e41d0c6b2f5)
+SEARCH_TRIGGERS = {
+    'event_fts_ai': (
+        "CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN "
+        "INSERT INTO event_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END"
+    ),
+    'event_fts_ad': (
+        "CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN "
+        "INSERT INTO event_fts(event_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END"
+    ),
+    'event_fts_au': (
+        "CREATE TRIGGER IF NOT EXISTS event_fts_au "
+        "AFTER UPDATE OF title, description ON event BEGIN "
+        "INSERT INTO event_fts(event_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO event_fts(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END"
+    ),
+}
+
+
+# Helper function to rebuild event and reservation with or without AUTOINCREMENT.
+# Rebuilding event drops its full-text search triggers, so they are recreated after.
+def _rebuild_tables(autoincrement):
+    for trigger in SEARCH_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    for table in ('event', 'reservation'):
+        with op.batch_alter_table(
+            table,
+            recreate='always',
+            table_kwargs={'sqlite_autoincrement': autoincrement},
+        ):
+            pass
+
+    for statement in SEARCH_TRIGGERS.values():
+        op.execute(statement)
+
+
+def upgrade():
+    # PostgreSQL sequences never hand out an id twice already
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _rebuild_tables(True)
+
+    # Continue after the largest id ever used, archived rows included
+    for table in ('event', 'reservation'):
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            "INSERT INTO sqlite_sequence (name, seq) SELECT "
+            f"'{table}', max(coalesce((SELECT max(id) FROM {table}), 0), "
+            f"coalesce((SELECT max(id) FROM {table}_archive), 0))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    _rebuild_tables(False)
@@ -0,0 +1,70 @@
+"""Add event starts_at/ends_at and the venue conflict indexes
+
+Revision ID: a4d9c2e7f315
+Revises: c83f6a1e5d92
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d9c2e7f315'
+down_revision = 'c83f6a1e5d92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    # Nullable so SQLite adds the columns without rebuilding the table (which would
+    # drop the full-text search triggers on event)
+    for table in ('event', 'event_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('starts_at', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('ends_at', sa.DateTime(), nullable=True))
+
+        # Backfill, in the format SQLAlchemy stores datetimes in on SQLite
+        if dialect == 'sqlite':
+            op.execute(
+                f"UPDATE {table} SET "
+                "starts_at = strftime('%Y-%m-%d %H:%M:%S', "
+                "event_date || ' ' || substr(start_time, 1, 8)) || '.000000', "
+                "ends_at = strftime('%Y-%m-%d %H:%M:%S', "
+                "event_date || ' ' || substr(start_time, 1, 8), "
+                "'+' || duration || ' minutes') || '.000000'"
+            )
+        else:
+            op.execute(
+                f"UPDATE {table} SET starts_at = event_date + start_time, "
+                "ends_at = event_date + start_time + duration * interval '1 minute'"
+            )
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.create_index('ix_event_location_starts_at',
+                              ['location', 'starts_at'], unique=False)
+        batch_op.create_index('ix_event_location_duration',
+                              ['location', 'duration'], unique=False)
+
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_event_location_period "
+            "ON event USING GIST (location, tsrange(starts_at, ends_at))"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_event_location_period")
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_location_duration')
+        batch_op.drop_index('ix_event_location_starts_at')
+
+    for table in ('event_archive', 'event'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('ends_at')
+            batch_op.drop_column('starts_at')
@@ -0,0 +1,43 @@
+"""Add indexes for event and reservation listings
+
+Revision ID: c5a9e3d17b62
+Revises: 8e41d0c6b2f5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a9e3d17b62'
+down_revision = '8e41d0c6b2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.create_index('ix_event_event_type_event_date',
+                              ['event_type', 'event_date'], unique=False)
+        batch_op.create_index('ix_event_organizer_id_event_date',
+                              ['organizer_id', 'event_date'], unique=False)
+        batch_op.create_index('ix_event_event_date_start_time',
+                              ['event_date', 'start_time'], unique=False)
+        batch_op.create_index('ix_event_start_time', ['start_time'], unique=False)
+
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.create_index('ix_reservation_event_id', ['event_id'], unique=False)
+        batch_op.create_index('ix_reservation_user_id_date',
+                              ['user_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_index('ix_reservation_user_id_date')
+        batch_op.drop_index('ix_reservation_event_id')
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_start_time')
+        batch_op.drop_index('ix_event_event_date_start_time')
+        batch_op.drop_index('ix_event_organizer_id_event_date')
+        batch_op.drop_index('ix_event_event_type_event_date')
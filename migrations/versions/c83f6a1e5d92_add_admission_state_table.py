@@ -0,0 +1,32 @@
+"""Add admission_state table for the booking waiting rooms
+
+Revision ID: c83f6a1e5d92
+Revises: e7a5f3c28b14
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c83f6a1e5d92'
+down_revision = 'e7a5f3c28b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('admission_state',
+    sa.Column('event_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('refilled_at', sa.DateTime(), nullable=False),
+    sa.Column('next_ticket', sa.Integer(), nullable=False),
+    sa.Column('serving', sa.Integer(), nullable=False),
+    sa.Column('sold_out_until', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+
+
+def downgrade():
+    op.drop_table('admission_state')
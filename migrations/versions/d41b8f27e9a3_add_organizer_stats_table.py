@@ -0,0 +1,44 @@
+"""Add organizer_stats table for the business dashboard
+
+Revision ID: d41b8f27e9a3
+Revises: a7c3e95f1d28
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41b8f27e9a3'
+down_revision = 'a7c3e95f1d28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('organizer_stats',
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), server_default='', nullable=False),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('seats_sold', sa.Integer(), nullable=False),
+    sa.Column('sold_out_events', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['organizer_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('organizer_id', 'event_type')
+    )
+
+    # Fill the statistics of the existing events
+    op.execute(
+        "INSERT INTO organizer_stats "
+        "(organizer_id, event_type, events, capacity, seats_sold, sold_out_events) "
+        "SELECT organizer_id, COALESCE(event_type, ''), COUNT(id), SUM(capacity), "
+        "SUM(reserved_seats), "
+        "SUM(CASE WHEN reserved_seats >= capacity THEN 1 ELSE 0 END) "
+        "FROM event GROUP BY organizer_id, COALESCE(event_type, '')"
+    )
+
+
+def downgrade():
+    op.drop_table('organizer_stats')
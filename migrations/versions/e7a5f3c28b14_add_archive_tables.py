@@ -0,0 +1,68 @@
+"""Add archive tables for past events and their reservations
+
+Revision ID: e7a5f3c28b14
+Revises: b6e2c4d95a17
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a5f3c28b14'
+down_revision = 'b6e2c4d95a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=1000), nullable=False),
+    sa.Column('event_date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('reserved_seats', sa.Integer(), nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=True),
+    sa.Column('location', sa.String(length=120), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['organizer_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('event_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_event_archive_event_date_start_time', ['event_date', 'start_time'], unique=False)
+        batch_op.create_index('ix_event_archive_organizer_id_event_date', ['organizer_id', 'event_date'], unique=False)
+
+    op.create_table('reservation_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('seats', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['event_archive.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('reservation_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_reservation_archive_event_id', ['event_id'], unique=False)
+        batch_op.create_index('ix_reservation_archive_user_id_date', ['user_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reservation_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_reservation_archive_user_id_date')
+        batch_op.drop_index('ix_reservation_archive_event_id')
+
+    op.drop_table('reservation_archive')
+    with op.batch_alter_table('event_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_archive_organizer_id_event_date')
+        batch_op.drop_index('ix_event_archive_event_date_start_time')
+
+    op.drop_table('event_archive')
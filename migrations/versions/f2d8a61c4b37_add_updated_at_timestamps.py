@@ -0,0 +1,40 @@
+"""Add updated_at timestamps to event and reservation
+
+Revision ID: f2d8a61c4b37
+Revises: c5a9e3d17b62
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d8a61c4b37'
+down_revision = 'c5a9e3d17b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant default lets SQLite add the NOT NULL column without rebuilding
+    # the table (which would drop the full-text search triggers on event)
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                      server_default='1970-01-01 00:00:00'))
+
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                      server_default='1970-01-01 00:00:00'))
+
+    # Backfill: events as changed now, reservations as of when they were made
+    op.execute('UPDATE event SET updated_at = CURRENT_TIMESTAMP')
+    op.execute('UPDATE reservation SET updated_at = date')
+
+
+def downgrade():
+    with op.batch_alter_table('reservation', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -1,8 +1,11 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from passwords import DEFAULT_HASH_METHOD, hash_password, needs_rehash, verify_password
+from database import RoutingSession
+from datetime import datetime, timedelta
+from sqlalchemy import event as sa_event
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class User(db.Model):
@@ -19,15 +22,44 @@ class User(db.Model):
     reservations = db.relationship("Reservation", backref="user", lazy="dynamic")
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        method = current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+        self.password_hash = hash_password(password, method)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    # True when the stored hash uses an outdated algorithm or cost
+    def password_needs_rehash(self):
+        method = current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+        return needs_rehash(self.password_hash, method)
 
     def __repr__(self):
         return f"<User {self.username}>"
 
 
+def event_period(event_date, start_time, duration):
+    """
+    Returns the (starts_at, ends_at) datetimes of an event lasting duration minutes.
+    """
+    starts_at = datetime.combine(event_date, start_time)
+    return starts_at, starts_at + timedelta(minutes=duration)
+
+
+# Column defaults filling starts_at and ends_at from the other values of an insert,
+# including the executemany inserts of the bulk import
+def _default_period(context):
+    values = context.get_current_parameters()
+    return event_period(values["event_date"], values["start_time"], values["duration"])
+
+
+def _default_starts_at(context):
+    return _default_period(context)[0]
+
+
+def _default_ends_at(context):
+    return _default_period(context)[1]
+
+
 class Event(db.Model):
     """
     Event model for storing event details.
@@ -40,13 +72,44 @@ class Event(db.Model):
     start_time = db.Column(db.Time, nullable=False)
     duration = db.Column(db.Integer, nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
+    reserved_seats = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Seats and sold-out state already added to organizer_stats by the count_seats job
+    counted_seats = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    counted_sold_out = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
     organizer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     organizer = db.relationship("User", backref="organized_events")
     event_type = db.Column(db.String(50))
     location = db.Column(db.String(120))
+    # When the event takes place, derived from event_date, start_time and duration
+    # for the venue conflict checks (see scheduling.py)
+    starts_at = db.Column(db.DateTime, default=_default_starts_at)
+    ends_at = db.Column(db.DateTime, default=_default_ends_at)
+    # Bumped on every change, including the reserved_seats counter (API validators)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=db.func.now(),
+    )
 
     reservations = db.relationship("Reservation", backref="event", lazy="dynamic")
 
+    # Indexes for the filter and sort columns used by the listing routes
+    __table_args__ = (
+        db.Index("ix_event_event_type_event_date", "event_type", "event_date"),
+        db.Index("ix_event_organizer_id_event_date", "organizer_id", "event_date"),
+        db.Index("ix_event_event_date_start_time", "event_date", "start_time"),
+        db.Index("ix_event_start_time", "start_time"),
+        # Venue conflict checks: events at a location by start, and their longest
+        db.Index("ix_event_location_starts_at", "location", "starts_at"),
+        db.Index("ix_event_location_duration", "location", "duration"),
+        # Never hand out the id of a deleted or archived event again on SQLite
+        {"sqlite_autoincrement": True},
+    )
+
     def __repr__(self):
         return f"Event({self.title}, {self.description})"
 
@@ -65,6 +128,23 @@ class Event(db.Model):
         }
         return event_images.get(self.event_type, "default.jpg")
 
+    # Seats still available, read from the maintained reserved_seats counter
+    @property
+    def available_seats(self):
+        return self.capacity - (self.reserved_seats or 0)
+
+    @property
+    def sold_out(self):
+        return (self.reserved_seats or 0) >= self.capacity
+
+
+# Keep starts_at and ends_at in step when an event is rescheduled
+@sa_event.listens_for(Event, "before_update")
+def _update_event_period(mapper, connection, target):
+    target.starts_at, target.ends_at = event_period(
+        target.event_date, target.start_time, target.duration
+    )
+
 
 class Reservation(db.Model):
     """
@@ -76,6 +156,172 @@ class Reservation(db.Model):
     event_id = db.Column(db.Integer, db.ForeignKey("event.id"), nullable=False)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     seats = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=db.func.now(),
+    )
+
+    # Indexes for looking up reservations by event and by user
+    __table_args__ = (
+        db.Index("ix_reservation_event_id", "event_id"),
+        db.Index("ix_reservation_user_id_date", "user_id", "date"),
+        {"sqlite_autoincrement": True},
+    )
 
     def __repr__(self):
         return f"<Reservation User: {self.user_id}, Event: {self.event_id}>"
+
+
+class ArchivedEvent(db.Model):
+    """
+    Event that took place more than ARCHIVE_AFTER_DAYS ago, moved out of the event
+    table with its original id by archive.py. Same columns as Event.
+    """
+
+    __tablename__ = "event_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.String(1000), nullable=False)
+    event_date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    duration = db.Column(db.Integer, nullable=False)
+    capacity = db.Column(db.Integer, nullable=False)
+    reserved_seats = db.Column(db.Integer, nullable=False, default=0)
+    counted_seats = db.Column(db.Integer, nullable=False, default=0)
+    counted_sold_out = db.Column(db.Boolean, nullable=False, default=False)
+    organizer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    event_type = db.Column(db.String(50))
+    location = db.Column(db.String(120))
+    starts_at = db.Column(db.DateTime)
+    ends_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index(
+            "ix_event_archive_organizer_id_event_date", "organizer_id", "event_date"
+        ),
+        db.Index("ix_event_archive_event_date_start_time", "event_date", "start_time"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedEvent {self.id}>"
+
+
+class ArchivedReservation(db.Model):
+    """
+    Reservation of an archived event, with its original id. Same columns as Reservation.
+    """
+
+    __tablename__ = "reservation_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey("event_archive.id"), nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    seats = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_reservation_archive_event_id", "event_id"),
+        db.Index("ix_reservation_archive_user_id_date", "user_id", "date"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedReservation User: {self.user_id}, Event: {self.event_id}>"
+
+
+class Job(db.Model):
+    """
+    Background job waiting to be run (or being run) by the worker, see jobs.py.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    locked_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.String(1000))
+    # Set for jobs that must only ever be enqueued once, e.g. an event's reminders
+    dedupe_key = db.Column(db.String(200), unique=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Index for claiming the next due jobs
+    __table_args__ = (db.Index("ix_job_status_run_at", "status", "run_at"),)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
+
+
+class UserSession(db.Model):
+    """
+    Server-side session of the "database" SESSION_BACKEND, see sessions.py.
+    """
+
+    id = db.Column(db.String(64), primary_key=True)
+    # Logged-in user, so all of a user's sessions can be dropped at once
+    user_id = db.Column(db.Integer, index=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserSession {self.id[:8]} User: {self.user_id}>"
+
+
+class OrganizerStats(db.Model):
+    """
+    Dashboard totals of an organizer's events of one type, kept up to date when events
+    are created, edited, imported or archived, and rebuilt from the events table by
+    "flask rebuild-stats". Seats sold are added in batches by the count_seats job.
+    """
+
+    __tablename__ = "organizer_stats"
+
+    organizer_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    # Events without a type are counted under ""
+    event_type = db.Column(db.String(50), primary_key=True, server_default="")
+    events = db.Column(db.Integer, nullable=False, default=0)
+    capacity = db.Column(db.Integer, nullable=False, default=0)
+    seats_sold = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    sold_out_events = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=db.func.now(),
+    )
+
+    def __repr__(self):
+        return f"<OrganizerStats {self.organizer_id} {self.event_type!r}>"
+
+
+class AdmissionState(db.Model):
+    """
+    Waiting room of an event for the "database" ADMISSION_BACKEND, see admission.py.
+    """
+
+    __tablename__ = "admission_state"
+
+    # No foreign key: rows are created before the event is looked up
+    event_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # Token bucket admitting bookings, refilled from refilled_at on every visit
+    tokens = db.Column(db.Float, nullable=False)
+    refilled_at = db.Column(db.DateTime, nullable=False)
+    # Last ticket handed out and last ticket admitted
+    next_ticket = db.Column(db.Integer, nullable=False, default=0)
+    serving = db.Column(db.Integer, nullable=False, default=0)
+    sold_out_until = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"<AdmissionState {self.event_id} {self.serving}/{self.next_ticket}>"
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from models import db, User, Event, Reservation, Job
+from jobs import enqueue, job_handler, periodic_task
+from mail import make_message
+
+# Seconds between two checks for events that need their day-before reminders
+REMINDER_SCHEDULE_INTERVAL = 300
+
+# Columns used to write confirmation and reminder emails
+EMAIL_FIELDS = [
+    User.email,
+    User.username,
+    Reservation.seats,
+    Event.title,
+    Event.event_date,
+    Event.start_time,
+    Event.location,
+]
+
+
+# Helper function to select the email fields of reservations
+def _email_rows(*conditions):
+    return db.session.execute(
+        select(*EMAIL_FIELDS)
+        .join(Reservation.user)
+        .join(Reservation.event)
+        .where(*conditions)
+        .order_by(Reservation.id)
+    ).all()
+
+
+# Helper function to describe when and where an event takes place
+def _event_details(row):
+    details = f"{row.title} on {row.event_date:%Y-%m-%d} at {row.start_time:%H:%M}"
+    if row.location:
+        details += f", {row.location}"
+    return details
+
+
+@job_handler("send_confirmation")
+def send_confirmation(payload):
+    """
+    Emails the booking confirmation of a new reservation.
+    Nothing is sent if the reservation was cancelled before the job ran.
+    """
+    sender = current_app.config["MAIL_SENDER"]
+    return [
+        make_message(
+            sender,
+            row.email,
+            f"Booking confirmed: {row.title}",
+            f"Hi {row.username},\n\nYour booking of {row.seats} seat(s) for "
+            f"{_event_details(row)} is confirmed.\n\nEventSphere",
+        )
+        for row in _email_rows(Reservation.id == payload["reservation_id"])
+    ]
+
+
+@periodic_task(REMINDER_SCHEDULE_INTERVAL)
+def schedule_reminders():
+    """
+    Enqueues one event_reminders job for every booked event taking place tomorrow.
+    Each job has a dedupe key, so an event's reminders are only enqueued once.
+    """
+    tomorrow = datetime.utcnow().date() + timedelta(days=1)
+    event_ids = db.session.execute(
+        select(Event.id).where(Event.event_date == tomorrow, Event.reserved_seats > 0)
+    ).scalars()
+    keys = {f"reminders:{event_id}:{tomorrow}": event_id for event_id in event_ids}
+    if not keys:
+        return
+
+    existing = set(
+        db.session.execute(
+            select(Job.dedupe_key).where(Job.dedupe_key.in_(list(keys)))
+        ).scalars()
+    )
+    for key, event_id in keys.items():
+        if key not in existing:
+            enqueue("event_reminders", {"event_id": event_id}, dedupe_key=key)
+    db.session.commit()
+
+
+@job_handler("event_reminders")
+def fan_out_reminders(payload):
+    """
+    Splits an event's reservations into chunks of REMINDER_CHUNK_SIZE and enqueues
+    a send_reminders job for each, so the worker threads (and any other worker
+    processes) send the reminders of a large event in parallel.
+    """
+    chunk_size = current_app.config["REMINDER_CHUNK_SIZE"]
+    reservation_ids = db.session.execute(
+        select(Reservation.id)
+        .where(Reservation.event_id == payload["event_id"])
+        .order_by(Reservation.id)
+    ).scalars().all()
+
+    for start in range(0, len(reservation_ids), chunk_size):
+        chunk = reservation_ids[start : start + chunk_size]
+        enqueue(
+            "send_reminders",
+            {
+                "event_id": payload["event_id"],
+                "first_id": chunk[0],
+                "last_id": chunk[-1],
+            },
+        )
+    db.session.commit()
+
+
+@job_handler("send_reminders")
+def send_reminders(payload):
+    """
+    Emails the day-before reminder to the holders of one chunk of an event's reservations.
+    """
+    sender = current_app.config["MAIL_SENDER"]
+    rows = _email_rows(
+        Reservation.event_id == payload["event_id"],
+        Reservation.id.between(payload["first_id"], payload["last_id"]),
+    )
+    return [
+        make_message(
+            sender,
+            row.email,
+            f"Reminder: {row.title} is tomorrow",
+            f"Hi {row.username},\n\nThis is a reminder of your booking of {row.seats} "
+            f"seat(s) for {_event_details(row)}.\n\nEventSphere",
+        )
+        for row in rows
+    ]
@@ -0,0 +1,177 @@
+import base64
+import json
+from datetime import date, datetime, time as dt_time
+from flask import current_app
+from flask_sqlalchemy.pagination import QueryPagination
+from sqlalchemy import func, tuple_
+from cache import LRUCache
+
+
+class WindowPagination(QueryPagination):
+    """
+    Pagination that fetches the page items and the total count in one round trip,
+    using a COUNT(*) OVER () window column instead of a separate COUNT query.
+    """
+
+    is_keyset = False
+
+    def _query_items(self):
+        query = self._query_args["query"]
+        rows = (
+            query.add_columns(func.count().over().label("total_count"))
+            .limit(self.per_page)
+            .offset(self._query_offset)
+            .all()
+        )
+        self._window_total = rows[0].total_count if rows else None
+        # Queries of several columns keep their rows (total_count is the last column)
+        if len(query.column_descriptions) > 1:
+            return rows
+        return [row[0] for row in rows]
+
+    def _query_count(self):
+        if self._window_total is not None:
+            return self._window_total
+        # An empty first page means there is nothing to count
+        if self.page == 1:
+            return 0
+        # Past the last page the window has no rows, so fall back to COUNT
+        return super()._query_count()
+
+
+# Helper function to paginate a query with WindowPagination
+def paginate_with_total(query, page, per_page, max_per_page=None):
+    """
+    Paginates a Flask-SQLAlchemy query, returning the same pagination object the
+    templates already use, with the items and total loaded by a single statement.
+    """
+    return WindowPagination(
+        query=query,
+        page=page,
+        per_page=per_page,
+        max_per_page=max_per_page,
+        error_out=False,
+    )
+
+
+def cached_count(query):
+    """
+    Returns the row count of a query, reusing a recent result from the count cache for
+    up to COUNT_CACHE_TTL seconds. The value is approximate by design: it can lag
+    behind writes by the TTL.
+    """
+    cache = current_app.extensions.get("counts")
+    statement = query.order_by(None).statement.compile()
+    key = (str(statement), tuple(sorted(statement.params.items(), key=str)))
+    total = cache.get(key) if cache is not None else None
+    if total is None:
+        total = query.order_by(None).count()
+        if cache is not None:
+            cache.set(key, total, current_app.config["COUNT_CACHE_TTL"])
+    return total
+
+
+def init_app(app):
+    """
+    Sets up the cache of the keyset page totals (COUNT_CACHE_TTL, COUNT_CACHE_SIZE).
+    """
+    app.extensions["counts"] = (
+        LRUCache(max_entries=app.config["COUNT_CACHE_SIZE"])
+        if app.config["COUNT_CACHE_TTL"] > 0
+        else None
+    )
+
+
+class KeysetPagination:
+    """
+    Cursor based pagination over a query ordered by a unique tuple of key columns.
+    Each page is fetched with a row comparison on the keys instead of an OFFSET,
+    so deep pages cost the same as the first one. Cursors are opaque strings that
+    encode the keys of the boundary row and the direction to read in.
+    """
+
+    is_keyset = True
+
+    def __init__(self, query, keys, cursor=None, per_page=20, max_per_page=None):
+        if max_per_page is not None:
+            per_page = min(per_page, max_per_page)
+        if per_page < 1:
+            per_page = 20
+
+        self.query = query
+        self.keys = keys
+        self.per_page = per_page
+
+        values, direction = self.decode_cursor(cursor)
+        if direction == "prev":
+            page_query = query.filter(tuple_(*keys) < tuple_(*values)).order_by(
+                *[key.desc() for key in keys]
+            )
+        else:
+            if values is not None:
+                query = query.filter(tuple_(*keys) > tuple_(*values))
+            page_query = query.order_by(*keys)
+
+        # Fetch one extra row to know whether there is another page
+        items = page_query.limit(per_page + 1).all()
+        has_more = len(items) > per_page
+        items = items[:per_page]
+
+        if direction == "prev":
+            items.reverse()
+            self.has_prev = has_more
+            self.has_next = True
+        else:
+            self.has_prev = values is not None
+            self.has_next = has_more
+
+        self.items = items
+        self.prev_cursor = self.encode_cursor(items[0], "prev") if items else None
+        self.next_cursor = self.encode_cursor(items[-1], "next") if items else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def total(self):
+        """
+        Approximate number of rows across all pages, only queried when accessed.
+        """
+        return cached_count(self.query)
+
+    def _key_values(self, item):
+        return [getattr(item, key.key) for key in self.keys]
+
+    def encode_cursor(self, item, direction):
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in self._key_values(item)
+        ]
+        payload = json.dumps({"k": values, "d": direction}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the key values and direction stored in a cursor. A missing or
+        malformed cursor starts from the first page.
+        """
+        if not cursor:
+            return None, "next"
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = [
+                self._parse_key(key, value)
+                for key, value in zip(self.keys, payload["k"], strict=True)
+            ]
+            direction = "prev" if payload["d"] == "prev" else "next"
+        except (ValueError, KeyError, TypeError):
+            return None, "next"
+        return values, direction
+
+    @staticmethod
+    def _parse_key(key, value):
+        python_type = key.type.python_type
+        if python_type in (datetime, date, dt_time):
+            return python_type.fromisoformat(value)
+        return python_type(value)
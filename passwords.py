@@ -0,0 +1,107 @@
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Method used when none is configured: werkzeug PBKDF2 with an explicit iteration count
+DEFAULT_HASH_METHOD = "pbkdf2:sha256:260000"
+
+
+# Helper function to import bcrypt only when a bcrypt method is configured
+def _bcrypt():
+    try:
+        import bcrypt
+    except ImportError:
+        raise RuntimeError(
+            "PASSWORD_HASH_METHOD uses bcrypt but the bcrypt package is not installed."
+        )
+    return bcrypt
+
+
+# Helper function to fit a password of any length into the 72 bytes bcrypt accepts:
+# its SHA-256 digest, base64-encoded so it holds no NUL byte (44 bytes)
+def _bcrypt_input(password):
+    return base64.b64encode(hashlib.sha256(password.encode()).digest())
+
+
+def hash_password(password, method=DEFAULT_HASH_METHOD):
+    """
+    Hashes a password with the given method. Methods are either werkzeug method
+    strings such as "pbkdf2:sha256:260000" or "bcrypt:<rounds>", e.g. "bcrypt:12".
+    bcrypt hashes the SHA-256 digest of the password, so long passwords are accepted.
+    """
+    if method.startswith("bcrypt"):
+        _, _, rounds = method.partition(":")
+        salt = _bcrypt().gensalt(rounds=int(rounds or 12))
+        return _bcrypt().hashpw(_bcrypt_input(password), salt).decode()
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(password_hash, password):
+    """
+    Checks a password against a stored hash produced by any supported method.
+    """
+    if not password_hash:
+        return False
+    if password_hash.startswith("$2"):
+        return _bcrypt().checkpw(_bcrypt_input(password), password_hash.encode())
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash, method=DEFAULT_HASH_METHOD):
+    """
+    Returns True if a stored hash was not produced with the configured method and
+    cost, so it should be replaced the next time the plain password is known.
+    """
+    if not password_hash:
+        return True
+    if method.startswith("bcrypt"):
+        _, _, rounds = method.partition(":")
+        parts = password_hash.split("$")
+        return not (
+            password_hash.startswith("$2")
+            and len(parts) > 2
+            and int(parts[2]) == int(rounds or 12)
+        )
+    return password_hash.split("$", 1)[0] != method
+
+
+class PasswordVerifier:
+    """
+    Runs password checks on a bounded thread pool so a burst of logins cannot tie up
+    every request thread on hashing. When more than max_pending checks are waiting,
+    verify() returns None immediately and the caller should ask the user to retry.
+    """
+
+    def __init__(self, max_workers=4, max_pending=16):
+        self._configure(max_workers, max_pending)
+
+    def _configure(self, max_workers, max_pending):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def init_app(self, app):
+        """
+        Sizes the pool from PASSWORD_HASH_WORKERS and PASSWORD_HASH_MAX_PENDING.
+        """
+        self._configure(
+            app.config["PASSWORD_HASH_WORKERS"], app.config["PASSWORD_HASH_MAX_PENDING"]
+        )
+        app.extensions["password_verifier"] = self
+
+    def verify(self, password_hash, password):
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            return self._executor.submit(
+                verify_password, password_hash, password
+            ).result()
+        finally:
+            self._slots.release()
+
+
+# Bounded pool that runs password checks for login
+password_verifier = PasswordVerifier()
@@ -0,0 +1,146 @@
+import cProfile
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from flask import (
+    Response,
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-endpoint totals of request time, SQL statements, SQL time,
+    ORM rows hydrated and template render time, exported in Prometheus text format.
+    """
+
+    FIELDS = [
+        ("requests", "eventsphere_requests_total", "Requests handled."),
+        ("seconds", "eventsphere_request_seconds_total", "Wall time in requests."),
+        ("sql_statements", "eventsphere_sql_statements_total", "SQL statements run."),
+        ("sql_seconds", "eventsphere_sql_seconds_total", "Time spent running SQL."),
+        ("rows", "eventsphere_rows_hydrated_total", "ORM objects loaded from rows."),
+        ("template_seconds", "eventsphere_template_seconds_total", "Template time."),
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(float))
+        self.collectors = []
+
+    def record(self, endpoint, **values):
+        with self._lock:
+            totals = self._totals[endpoint]
+            totals["requests"] += 1
+            for name, value in values.items():
+                totals[name] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._totals.items()}
+
+    def render(self):
+        """
+        Returns all the metrics in the Prometheus text exposition format.
+        Extra lines can be contributed by callables appended to collectors.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for field, metric, help_text in self.FIELDS:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for endpoint, totals in sorted(snapshot.items()):
+                value = totals.get(field, 0)
+                lines.append(f'{metric}{{endpoint="{endpoint}"}} {value:g}')
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def init_profiling(app, db, enabled=False, sample_rate=0.0, profile_dir="profiles"):
+    """
+    Instruments the app when enabled: records per-endpoint timings through SQLAlchemy
+    engine events and Flask request hooks, adds a Server-Timing header to every response,
+    serves the totals at /metrics and dumps a cProfile file for a sampled fraction of
+    requests. When disabled nothing is registered, so requests pay no overhead.
+    Returns the RequestMetrics instance, or None when disabled.
+    """
+    if not enabled:
+        return None
+
+    metrics = RequestMetrics()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if has_request_context() and "timings" in g:
+            g.timings["sql_statements"] += 1
+            g.timings["sql_seconds"] += elapsed
+
+    def on_load(target, context):
+        if has_request_context() and "timings" in g:
+            g.timings["rows"] += 1
+
+    def on_before_render(sender, template, context, **extra):
+        g.template_start = time.perf_counter()
+
+    def on_rendered(sender, template, context, **extra):
+        if "timings" in g and "template_start" in g:
+            g.timings["template_seconds"] += time.perf_counter() - g.template_start
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(db.Model, "load", on_load, propagate=True)
+    before_render_template.connect(on_before_render, app, weak=False)
+    template_rendered.connect(on_rendered, app, weak=False)
+
+    @app.before_request
+    def start_timing():
+        g.timings = defaultdict(float)
+        g.request_start = time.perf_counter()
+        if sample_rate and random.random() < sample_rate:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_timing(response):
+        if "timings" not in g:
+            return response
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            filename = f"{request.endpoint}-{time.time_ns()}.prof"
+            profiler.dump_stats(os.path.join(profile_dir, filename))
+
+        timings = g.timings
+        elapsed = time.perf_counter() - g.request_start
+        metrics.record(request.endpoint or "unknown", seconds=elapsed, **timings)
+
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                f"app;dur={elapsed * 1000:.1f}",
+                f'db;dur={timings["sql_seconds"] * 1000:.1f};'
+                f'desc="{int(timings["sql_statements"])} queries"',
+                f"tpl;dur={timings['template_seconds'] * 1000:.1f}",
+            ]
+        )
+        return response
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    return metrics
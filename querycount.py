@@ -0,0 +1,85 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+class TooManyQueries(AssertionError):
+    """
+    Raised when a block of code or a request runs more SQL statements than allowed.
+    """
+
+
+class QueryCounter:
+    """
+    Context manager that records every SQL statement executed on an engine.
+    Tests can use it to pin the number of queries a route issues:
+
+        with QueryCounter(db.engine) as counter:
+            client.get("/user_profile")
+        assert counter.count <= 3, counter.statements
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+
+class max_queries(QueryCounter):
+    """
+    QueryCounter that raises TooManyQueries on exit if more than limit statements ran.
+    """
+
+    def __init__(self, engine, limit):
+        super().__init__(engine)
+        self.limit = limit
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        if exc_info[0] is None and self.count > self.limit:
+            raise TooManyQueries(
+                f"{self.count} queries executed, limit is {self.limit}:\n"
+                + "\n".join(self.statements)
+            )
+        return False
+
+
+def init_query_guard(app, db, limit):
+    """
+    Fails every request of the app that runs more than limit SQL statements,
+    including lazy loads triggered while rendering templates. Meant for tests and
+    CI (MAX_QUERIES_PER_REQUEST); nothing is registered when the limit is not set.
+    """
+    if not limit:
+        return
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g.query_statements = g.get("query_statements", []) + [statement]
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", count_statement)
+
+    @app.after_request
+    def check_query_count(response):
+        statements = g.get("query_statements", [])
+        if len(statements) > limit:
+            raise TooManyQueries(
+                f"{request.endpoint} executed {len(statements)} queries, "
+                f"limit is {limit}:\n" + "\n".join(statements)
+            )
+        return response
@@ -0,0 +1,57 @@
+import random
+import time
+from flask import current_app, request, session
+from models import db
+from database import REPLICA_BIND_PREFIX
+
+
+def use_primary(f):
+    """
+    Marks a view whose reads must see the latest data, such as the seat availability
+    of the booking pages, so it always reads from the primary.
+    """
+    f.use_primary = True
+    return f
+
+
+# Helper function to tell whether the current request may read from a replica
+def _can_use_replica(pin_seconds):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, "use_primary", False):
+        return False
+    # Read-your-writes: users who just wrote read their own changes from the primary
+    wrote_at = session.get("wrote_at")
+    return wrote_at is None or time.time() - wrote_at > pin_seconds
+
+
+def init_app(app):
+    """
+    Routes the reads of GET requests to a random read replica from
+    SQLALCHEMY_REPLICA_URIS, and everything else to the primary. A request that
+    writes stamps the session, and that user's reads then stay on the primary for
+    REPLICA_PIN_SECONDS. Does nothing when no replica is configured.
+    """
+    with app.app_context():
+        replicas = [
+            engine
+            for key, engine in db.engines.items()
+            if key is not None and key.startswith(REPLICA_BIND_PREFIX)
+        ]
+    if not replicas:
+        return
+    pin_seconds = app.config["REPLICA_PIN_SECONDS"]
+
+    @app.before_request
+    def choose_database():
+        db.session.info["wrote"] = False
+        db.session.info["replica"] = (
+            random.choice(replicas) if _can_use_replica(pin_seconds) else None
+        )
+
+    @app.after_request
+    def stamp_write(response):
+        if db.session.info.get("wrote"):
+            session["wrote_at"] = time.time()
+        return response
@@ -0,0 +1,157 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import DDL, event, func, select
+from models import db, Event
+from database import begin_write
+
+# PostgreSQL: GiST index over the time range of the events at each location
+# (btree_gist lets the location text share the index with the range)
+POSTGRESQL_SCHEDULE_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "CREATE INDEX IF NOT EXISTS ix_event_location_period "
+    "ON event USING GIST (location, tsrange(starts_at, ends_at))",
+]
+
+# Create the range index whenever the event table is created with db.create_all()
+for statement in POSTGRESQL_SCHEDULE_DDL:
+    event.listen(
+        Event.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+
+def lock_venues(locations):
+    """
+    Holds the scheduling of the given locations until the end of the transaction, so
+    two events can't be checked and saved in the same slot at once: BEGIN IMMEDIATE
+    on SQLite, transaction-level advisory locks on the locations (taken in sorted
+    order) on PostgreSQL.
+    """
+    begin_write(db.session)
+    if db.session.connection().dialect.name != "postgresql":
+        return
+    for location in sorted({location for location in locations if location}):
+        db.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(location))))
+
+
+# Helper function to select the events at a location overlapping [starts_at, ends_at).
+# PostgreSQL uses the GiST range index. Elsewhere the (location, starts_at) index is
+# scanned from starts_at minus the longest event at the location, read from the
+# (location, duration) index, so only events that can still be running are visited.
+def _overlapping(location, starts_at, ends_at):
+    statement = select(Event.id, Event.title, Event.starts_at, Event.ends_at).where(
+        Event.location == location
+    )
+    if db.engine.dialect.name == "postgresql":
+        period = func.tsrange(Event.starts_at, Event.ends_at)
+        return statement.where(period.op("&&")(func.tsrange(starts_at, ends_at)))
+
+    longest = db.session.execute(
+        select(func.max(Event.duration)).where(Event.location == location)
+    ).scalar()
+    if longest is None:
+        return None
+    return statement.where(
+        Event.starts_at >= starts_at - timedelta(minutes=longest),
+        Event.starts_at < ends_at,
+        Event.ends_at > starts_at,
+    )
+
+
+def find_conflicts(location, starts_at, ends_at, exclude_id=None, limit=5):
+    """
+    Returns up to limit events (id, title, starts_at, ends_at rows) at the same
+    location whose time overlaps [starts_at, ends_at), leaving out exclude_id (the
+    event being edited). Events without a location never conflict.
+    """
+    if not location:
+        return []
+    # The event being edited may have unsaved changes
+    with db.session.no_autoflush:
+        statement = _overlapping(location, starts_at, ends_at)
+        if statement is None:
+            return []
+        if exclude_id is not None:
+            statement = statement.where(Event.id != exclude_id)
+        return db.session.execute(
+            statement.order_by(Event.starts_at).limit(limit)
+        ).all()
+
+
+def find_batch_conflicts(proposals):
+    """
+    Checks many proposed events at once, as if they were added one by one in order
+    and the conflicting ones skipped. proposals are dicts with location, starts_at,
+    ends_at and optionally the id of the event they replace.
+    Returns {index: conflicts} for the rejected proposals, where each conflict is an
+    existing event row (see find_conflicts) or the index of an earlier proposal.
+    The existing events of each location are read with one range query and swept
+    together with the proposals in start order.
+    """
+    by_location = defaultdict(list)
+    for index, proposal in enumerate(proposals):
+        if proposal.get("location"):
+            by_location[proposal["location"]].append(index)
+
+    overlaps = defaultdict(list)
+    with db.session.no_autoflush:
+        for location, indexes in by_location.items():
+            replaced = {proposals[index].get("id") for index in indexes}
+            statement = _overlapping(
+                location,
+                min(proposals[index]["starts_at"] for index in indexes),
+                max(proposals[index]["ends_at"] for index in indexes),
+            )
+            existing = [] if statement is None else db.session.execute(statement).all()
+
+            # (starts_at, ends_at, order, item): existing rows, or proposal indexes
+            intervals = [
+                (row.starts_at, row.ends_at, 0, row)
+                for row in existing
+                if row.id not in replaced
+            ] + [
+                (
+                    proposals[index]["starts_at"],
+                    proposals[index]["ends_at"],
+                    1,
+                    index,
+                )
+                for index in indexes
+            ]
+            intervals.sort(key=lambda interval: interval[:3])
+
+            # Every interval overlaps those still running when it starts
+            running = []
+            for number, (starts_at, ends_at, _, item) in enumerate(intervals):
+                while running and running[0][0] <= starts_at:
+                    heapq.heappop(running)
+                for _, _, other in running:
+                    if isinstance(item, int):
+                        overlaps[item].append(other)
+                    if isinstance(other, int):
+                        overlaps[other].append(item)
+                heapq.heappush(running, (ends_at, number, item))
+
+    # Proposals only conflict with earlier proposals that were kept
+    conflicts = {}
+    for index in sorted(overlaps):
+        found = [
+            other
+            for other in overlaps[index]
+            if not isinstance(other, int) or (other < index and other not in conflicts)
+        ]
+        if found:
+            conflicts[index] = found
+    return conflicts
+
+
+def describe_conflict(location, conflict):
+    """
+    Returns the message shown for an existing event clashing with a new one.
+    """
+    return (
+        f'{location} is already booked for "{conflict.title}" from '
+        f"{conflict.starts_at:%Y-%m-%d %H:%M} to {conflict.ends_at:%Y-%m-%d %H:%M}."
+    )
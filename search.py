@@ -0,0 +1,102 @@
+import re
+from sqlalchemy import DDL, column, event, func, or_, literal_column, select, table
+from models import Event
+
+# Lightweight table construct for querying the SQLite FTS5 index
+event_fts = table("event_fts", column("rowid"), column("rank"))
+
+# SQLite: FTS5 index over event title/description, kept in sync by triggers
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+    "title, description, content='event', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN "
+    "INSERT INTO event_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN "
+    "INSERT INTO event_fts(event_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF title, description "
+    "ON event BEGIN "
+    "INSERT INTO event_fts(event_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO event_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+# PostgreSQL: weighted tsvector generated column with a GIN index
+POSTGRESQL_SEARCH_DDL = [
+    "ALTER TABLE event ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_event_search_vector "
+    "ON event USING GIN (search_vector)",
+]
+
+# Create the search index whenever the event table is created with db.create_all()
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Event.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+for statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(
+        Event.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+
+# Helper function to split a search term into plain word tokens
+def _search_tokens(search):
+    return re.findall(r"\w+", search.lower())
+
+
+def like_search(query, search, entity=Event):
+    """
+    Filters an Event query with the original substring LIKE scan of the title and
+    description (SEARCH_MODE = 'like').
+    """
+    search_term = f"%{search}%"
+    return query.filter(
+        or_(entity.title.like(search_term), entity.description.like(search_term))
+    )
+
+
+def apply_search(query, search, dialect_name, entity=Event):
+    """
+    Filters an Event query by a free-text search term and orders it by relevance.
+    Every word must match, and the last word matches as a prefix so partial input
+    still finds results. Uses FTS5 on SQLite and tsvector on PostgreSQL, falling back
+    to a LIKE scan on other databases or when the term has no searchable words.
+    Only live events are indexed, so other entities (the history union) use LIKE.
+    """
+    tokens = _search_tokens(search)
+    if not tokens or entity is not Event:
+        return like_search(query, search, entity)
+
+    if dialect_name == "sqlite":
+        match = " ".join(f'"{token}"' for token in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        # The matches are materialized once: joined directly, SQLite may put the
+        # FTS table inside the loop over the filtered events and run the full-text
+        # query again for every one of them
+        matches = (
+            select(event_fts.c.rowid, event_fts.c.rank)
+            .where(literal_column("event_fts").op("MATCH")(match))
+            .cte("event_matches")
+            .prefix_with("MATERIALIZED")
+        )
+        return query.join(matches, matches.c.rowid == Event.id).order_by(
+            matches.c.rank
+        )
+
+    if dialect_name == "postgresql":
+        ts_query = " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"])
+        search_vector = literal_column("event.search_vector")
+        ts_query = func.to_tsquery("english", ts_query)
+        return query.filter(search_vector.op("@@")(ts_query)).order_by(
+            func.ts_rank(search_vector, ts_query).desc()
+        )
+
+    return like_search(query, search)
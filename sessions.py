@@ -0,0 +1,295 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from sqlalchemy import delete, insert, select
+from werkzeug.datastructures import CallbackDict
+from models import db, UserSession
+from jobs import periodic_task
+
+# Seconds between two deletions of expired sessions from the database store
+SESSION_PRUNE_INTERVAL = 3600
+
+
+class SessionStore:
+    """
+    Interface for the server-side session storage. Sessions are saved as serialized
+    strings under their id, together with the id of the user logged in (if any) so
+    that all the sessions of a user can be dropped at once.
+    """
+
+    def load(self, sid):
+        raise NotImplementedError
+
+    def save(self, sid, data, user_id, ttl):
+        raise NotImplementedError
+
+    def delete(self, sid):
+        raise NotImplementedError
+
+    def delete_user(self, user_id):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-process store for a single server: the most recently used max_entries
+    sessions are kept, each until its TTL runs out.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            data, user_id, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return data
+
+    def save(self, sid, data, user_id, ttl):
+        with self._lock:
+            self._entries[sid] = (data, user_id, time.monotonic() + ttl)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def delete_user(self, user_id):
+        with self._lock:
+            for sid in [
+                sid for sid, entry in self._entries.items() if entry[1] == user_id
+            ]:
+                del self._entries[sid]
+
+
+class DatabaseSessionStore(SessionStore):
+    """
+    Stores sessions in the user_session table, shared by every server using the
+    database. Reads and writes run on their own connection, outside the ORM session
+    of the request. Expired rows are deleted by the worker.
+    """
+
+    def load(self, sid):
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(UserSession.data).where(
+                    UserSession.id == sid, UserSession.expires_at > datetime.utcnow()
+                )
+            ).scalar()
+
+    def save(self, sid, data, user_id, ttl):
+        with db.engine.begin() as connection:
+            connection.execute(delete(UserSession).where(UserSession.id == sid))
+            connection.execute(
+                insert(UserSession).values(
+                    id=sid,
+                    user_id=user_id,
+                    data=data,
+                    expires_at=datetime.utcnow() + timedelta(seconds=ttl),
+                )
+            )
+
+    def delete(self, sid):
+        with db.engine.begin() as connection:
+            connection.execute(delete(UserSession).where(UserSession.id == sid))
+
+    def delete_user(self, user_id):
+        with db.engine.begin() as connection:
+            connection.execute(
+                delete(UserSession).where(UserSession.user_id == user_id)
+            )
+
+    def prune(self):
+        """
+        Deletes the expired sessions and returns how many there were.
+        """
+        with db.engine.begin() as connection:
+            return connection.execute(
+                delete(UserSession).where(UserSession.expires_at <= datetime.utcnow())
+            ).rowcount
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Stores sessions in Redis (or any server speaking its protocol) for several
+    servers. Each session is a key expiring with its TTL, and a set per user lists
+    the user's session ids.
+    """
+
+    def __init__(self, client, prefix="session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _user_key(self, user_id):
+        return f"{self.prefix}user:{user_id}"
+
+    def load(self, sid):
+        data = self.client.get(self.prefix + sid)
+        return data.decode() if isinstance(data, bytes) else data
+
+    def save(self, sid, data, user_id, ttl):
+        pipeline = self.client.pipeline()
+        pipeline.setex(self.prefix + sid, ttl, data)
+        if user_id is not None:
+            pipeline.sadd(self._user_key(user_id), sid)
+            pipeline.expire(self._user_key(user_id), ttl)
+        pipeline.execute()
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def delete_user(self, user_id):
+        sids = self.client.smembers(self._user_key(user_id))
+        keys = [
+            self.prefix + (sid.decode() if isinstance(sid, bytes) else sid)
+            for sid in sids
+        ]
+        self.client.delete(self._user_key(user_id), *keys)
+
+
+# Helper function to connect to Redis only when the redis backend is selected
+def _redis_client(url):
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError(
+            "The redis session backend needs the redis package (pip install redis)."
+        )
+    return redis.Redis.from_url(url)
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    Session whose data lives in a SessionStore; the cookie only holds its random id.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        # User logged in when the session was loaded, to renew the id at login
+        self.loaded_user_id = self.get("user_id")
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Keeps session data in a server-side store instead of the signed cookie, so the
+    cookie stays a fixed ~45 bytes and logging a user out (or changing their role)
+    can drop their sessions everywhere. Sessions are only written when they change,
+    and get a new id whenever a different user logs in.
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.load(sid)
+            if data is not None:
+                try:
+                    return ServerSession(self.serializer.loads(data), sid=sid)
+                except ValueError:
+                    pass
+        return ServerSession(new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.sid and session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+
+        user_id = session.get("user_id")
+        if session.sid is None or user_id != session.loaded_user_id:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+
+        ttl = int(app.permanent_session_lifetime.total_seconds())
+        self.store.save(session.sid, self.serializer.dumps(dict(session)), user_id, ttl)
+        response.vary.add("Cookie")
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def create_session_store(config):
+    """
+    Returns the store selected by SESSION_BACKEND: "memory", "database" or "redis".
+    Returns None for "cookie", which keeps Flask's signed cookie sessions.
+    """
+    backend = config["SESSION_BACKEND"]
+    if backend == "memory":
+        return MemorySessionStore(max_entries=config["SESSION_MEMORY_SIZE"])
+    if backend == "database":
+        return DatabaseSessionStore()
+    if backend == "redis":
+        return RedisSessionStore(_redis_client(config["SESSION_REDIS_URL"]))
+    if backend != "cookie":
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}.")
+    return None
+
+
+def init_app(app):
+    """
+    Installs the server-side session interface when a store is configured.
+    """
+    store = create_session_store(app.config)
+    app.extensions["session_store"] = store
+    if store is not None:
+        app.session_interface = ServerSessionInterface(store)
+
+
+def invalidate_user_sessions(user_id):
+    """
+    Logs a user out of every session, e.g. after their role changed. With cookie
+    sessions this is not possible; their cached identity expires after
+    SESSION_PRINCIPAL_TTL seconds instead.
+    """
+    store = current_app.extensions.get("session_store")
+    if store is not None:
+        store.delete_user(user_id)
+
+
+@periodic_task(SESSION_PRUNE_INTERVAL)
+def prune_sessions():
+    """
+    Deletes expired sessions from the database store.
+    """
+    store = current_app.extensions.get("session_store")
+    if isinstance(store, DatabaseSessionStore):
+        store.prune()
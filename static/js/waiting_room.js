@@ -0,0 +1,31 @@
+// -----------------------------Waiting room
+
+window.addEventListener('DOMContentLoaded', (_event) => {
+  const room = document.getElementById('waiting_room');
+  const form = document.getElementById('booking_form');
+  const position = document.getElementById('position');
+  const interval = Number(room.dataset.pollInterval) * 1000;
+
+  // Ask for the place in line until it is the user's turn, then send the booking
+  const poll = () => {
+    fetch(room.dataset.positionUrl, { headers: { 'Accept': 'application/json' } })
+      .then(response => response.json())
+      .then(state => {
+        if (state.sold_out) {
+          window.location.reload();
+        } else if (state.position === 0) {
+          form.submit();
+        } else {
+          position.textContent = state.position;
+          setTimeout(poll, interval);
+        }
+      })
+      .catch(() => setTimeout(poll, interval));
+  };
+
+  if (room.dataset.position === '0') {
+    form.submit();
+  } else {
+    setTimeout(poll, interval);
+  }
+});
@@ -0,0 +1,239 @@
+from collections import defaultdict
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Event, OrganizerStats
+from database import begin_write
+from jobs import job_handler, periodic_task
+
+# Seconds between two full rebuilds of the statistics by the worker
+STATS_REBUILD_INTERVAL = 3600
+
+# Totals stored for every organizer and event type. Events created, edited, imported
+# or archived change them in the same transaction; bookings only enqueue a count_seats
+# job, so the seats sold are added by the worker in batches.
+STAT_FIELDS = ["events", "capacity", "seats_sold", "sold_out_events"]
+
+
+# Helper function to share seats sold out of capacity, as a percentage
+def _occupancy(seats_sold, capacity):
+    return round(100 * seats_sold / capacity, 1) if capacity else 0.0
+
+
+# Helper function to pick the INSERT construct of the database with ON CONFLICT support
+def _upsert(dialect_name):
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+def record_events(
+    organizer_id, event_type, events=0, capacity=0, seats_sold=0, sold_out_events=0
+):
+    """
+    Adds a number of events, seats of capacity, seats sold and sold-out events (any of
+    them may be negative) to the totals of an organizer's event type, in the caller's
+    transaction. Changes to events are applied this way instead of recomputing the rows.
+    """
+    changes = {
+        "events": events,
+        "capacity": capacity,
+        "seats_sold": seats_sold,
+        "sold_out_events": sold_out_events,
+    }
+    if not any(changes.values()):
+        return
+    insert = _upsert(db.session.connection().dialect.name)
+    db.session.execute(
+        insert(OrganizerStats)
+        .values(organizer_id=organizer_id, event_type=event_type or "", **changes)
+        .on_conflict_do_update(
+            index_elements=["organizer_id", "event_type"],
+            set_={
+                name: getattr(OrganizerStats, name) + change
+                for name, change in changes.items()
+                if change
+            },
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Helper function to tell whether an event has no seat left
+def _sold_out():
+    return Event.reserved_seats >= Event.capacity
+
+
+# Helper function to select the totals of events by organizer and event type, with
+# the seats sold now, or as already counted in organizer_stats
+def _totals_query(counted=False):
+    event_type = func.coalesce(Event.event_type, "")
+    if counted:
+        seats_sold, sold_out = Event.counted_seats, Event.counted_sold_out
+    else:
+        seats_sold, sold_out = Event.reserved_seats, _sold_out()
+    return select(
+        Event.organizer_id,
+        event_type.label("event_type"),
+        func.count(Event.id).label("events"),
+        func.sum(Event.capacity).label("capacity"),
+        func.sum(seats_sold).label("seats_sold"),
+        func.sum(case((sold_out, 1), else_=0)).label("sold_out_events"),
+    ).group_by(Event.organizer_id, event_type)
+
+
+# Helper function to mark the seats of events as counted in organizer_stats
+def _mark_counted(*conditions):
+    db.session.execute(
+        update(Event)
+        .where(*conditions)
+        .values(counted_seats=Event.reserved_seats, counted_sold_out=_sold_out())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def remove_events(event_ids):
+    """
+    Subtracts events that are about to be deleted (archived) from the totals of their
+    organizers, with the seats counted so far, dropping the rows of event types that
+    no longer have any event. Their pending count_seats jobs then find nothing to add.
+    """
+    totals = db.session.execute(
+        _totals_query(counted=True).where(Event.id.in_(event_ids))
+    ).all()
+    for row in totals:
+        db.session.execute(
+            update(OrganizerStats)
+            .where(
+                OrganizerStats.organizer_id == row.organizer_id,
+                OrganizerStats.event_type == row.event_type,
+            )
+            .values(
+                {
+                    name: getattr(OrganizerStats, name) - getattr(row, name)
+                    for name in STAT_FIELDS
+                }
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.session.execute(
+        delete(OrganizerStats)
+        .where(
+            OrganizerStats.organizer_id.in_([row.organizer_id for row in totals]),
+            OrganizerStats.events <= 0,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_stats(organizer_id=None):
+    """
+    Recomputes the statistics of one organizer (or of all organizers) from the events
+    table in the caller's transaction, and returns the number of rows that changed.
+    The events and the existing rows are locked first, so events created meanwhile wait
+    and then add themselves on top of the recomputed totals instead of being lost, and
+    the seats counted here are marked so count_seats jobs don't add them twice.
+    """
+    begin_write(db.session)
+    db.session.flush()
+
+    current_query = select(OrganizerStats).with_for_update()
+    events_query = select(Event.id).with_for_update()
+    totals_query = _totals_query()
+    conditions = []
+    if organizer_id is not None:
+        current_query = current_query.where(
+            OrganizerStats.organizer_id == organizer_id
+        )
+        conditions.append(Event.organizer_id == organizer_id)
+
+    # Events first, in the order bookings and count_seats jobs lock them
+    db.session.execute(events_query.where(*conditions))
+    current = {
+        (row.organizer_id, row.event_type): row
+        for row in db.session.execute(current_query).scalars()
+    }
+    changed = 0
+    for totals in db.session.execute(totals_query.where(*conditions)):
+        row = current.pop((totals.organizer_id, totals.event_type), None)
+        if row is None:
+            row = OrganizerStats(
+                organizer_id=totals.organizer_id, event_type=totals.event_type
+            )
+            db.session.add(row)
+        if any(getattr(row, name) != getattr(totals, name) for name in STAT_FIELDS):
+            for name in STAT_FIELDS:
+                setattr(row, name, getattr(totals, name))
+            changed += 1
+
+    # Types the organizer no longer has any event of
+    for row in current.values():
+        db.session.delete(row)
+        changed += 1
+    _mark_counted(*conditions)
+    db.session.flush()
+    return changed
+
+
+@job_handler("count_seats", batch=True)
+def count_seats(payloads):
+    """
+    Adds the seats booked or released on events since they were last counted to the
+    totals of their organizers, for all the count_seats jobs claimed together: one
+    upsert per organizer and event type instead of one per booking. Each event
+    remembers what it has already added, so running a job twice adds nothing.
+    """
+    event_ids = sorted({payload["event_id"] for payload in payloads})
+    begin_write(db.session)
+    rows = db.session.execute(
+        select(
+            Event.organizer_id,
+            Event.event_type,
+            Event.reserved_seats,
+            Event.capacity,
+            Event.counted_seats,
+            Event.counted_sold_out,
+        )
+        .where(Event.id.in_(event_ids))
+        .order_by(Event.id)
+        .with_for_update()
+    ).all()
+
+    changes = defaultdict(lambda: {"seats_sold": 0, "sold_out_events": 0})
+    for row in rows:
+        change = changes[(row.organizer_id, row.event_type or "")]
+        change["seats_sold"] += row.reserved_seats - row.counted_seats
+        sold_out = row.reserved_seats >= row.capacity
+        change["sold_out_events"] += int(sold_out) - int(row.counted_sold_out)
+    # In a fixed order, so concurrent batches lock the rows the same way
+    for (organizer_id, event_type), change in sorted(changes.items()):
+        record_events(organizer_id, event_type, **change)
+    _mark_counted(Event.id.in_(event_ids))
+    db.session.commit()
+
+
+def organizer_dashboard(organizer_id):
+    """
+    Returns the totals shown on an organizer's dashboard and their breakdown by event
+    type, from the organizer's stored rows alone (one per event type).
+    """
+    rows = db.session.execute(
+        select(OrganizerStats)
+        .where(OrganizerStats.organizer_id == organizer_id)
+        .order_by(OrganizerStats.event_type)
+    ).scalars()
+
+    types = []
+    for row in rows:
+        values = {name: getattr(row, name) for name in STAT_FIELDS}
+        values["occupancy"] = _occupancy(values["seats_sold"], values["capacity"])
+        types.append({"event_type": row.event_type, **values})
+    totals = {name: sum(row[name] for row in types) for name in STAT_FIELDS}
+    totals["occupancy"] = _occupancy(totals["seats_sold"], totals["capacity"])
+    return {"totals": totals, "types": types}
+
+
+@periodic_task(STATS_REBUILD_INTERVAL)
+def rebuild_stats():
+    """
+    Rebuilds every organizer's statistics, repairing any drift from the events table.
+    """
+    refresh_stats()
+    db.session.commit()
@@ -0,0 +1,93 @@
+from datetime import date, time, timedelta
+import pytest
+from app import create_app
+from models import db, User, Event
+from jobs import WorkerStats, run_batch
+from mail import OutboxMailer
+
+TEST_PASSWORD = "password"
+
+
+def make_app(tmp_path, **config):
+    """
+    App on a file-backed SQLite database, so threads share it like web workers do.
+    """
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "PAGE_CACHE_TTL": 0,
+            "FACET_CACHE_TTL": 0,
+            "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+            **config,
+        }
+    )
+    with app.app_context():
+        # Only the primary: replicas are copies of it
+        db.create_all(bind_key=None)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_user(username, is_business=False):
+    """
+    Adds a user with TEST_PASSWORD and returns it.
+    """
+    user = User(
+        username=username,
+        email=f"{username}@example.com",
+        is_business=is_business,
+        company_name=f"{username} Ltd" if is_business else None,
+    )
+    user.set_password(TEST_PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def make_event(organizer, capacity=100, days=30, **fields):
+    """
+    Adds an upcoming event for an organizer and returns it.
+    """
+    values = {
+        "title": "Test Event",
+        "description": "An event for the tests.",
+        "event_date": date.today() + timedelta(days=days),
+        "start_time": time(20, 0),
+        "duration": 120,
+        "capacity": capacity,
+        "event_type": "Concert",
+        "location": "Test Hall",
+    }
+    values.update(fields)
+    event = Event(organizer_id=organizer.id, **values)
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def login(client, username):
+    return client.post("/login", data={"login": username, "password": TEST_PASSWORD})
+
+
+def run_jobs(app, outbox):
+    """
+    Runs the due jobs in batches on the calling thread until none is left, writing
+    their emails to the outbox directory. Returns the number of jobs run.
+    """
+    mailer, stats, total = OutboxMailer(str(outbox)), WorkerStats(), 0
+    while claimed := run_batch("test", mailer, app.config, stats):
+        total += claimed
+    return total
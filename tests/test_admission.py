@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+import pytest
+from flask import session
+import admission
+from admission import ADMISSION_IDLE_TTL, _advance, admit, queue_position
+from models import db
+from conftest import make_app
+
+
+class Clock:
+    """
+    Stands in for the clocks of the memory (monotonic) and database (utcnow) stores.
+    """
+
+    def __init__(self):
+        self.seconds = 1000.0
+        self.started = datetime(2026, 1, 1)
+
+    def advance(self, seconds):
+        self.seconds += seconds
+
+    def monotonic(self):
+        return self.seconds
+
+    def utcnow(self):
+        return self.started + timedelta(seconds=self.seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock.utcnow()
+
+    monkeypatch.setattr(admission.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(admission, "datetime", FakeDatetime)
+    return clock
+
+
+@pytest.fixture(params=["memory", "database"])
+def app(request, tmp_path, clock):
+    # One booking per second, in bursts of up to 3
+    app = make_app(
+        tmp_path, ADMISSION_BACKEND=request.param, ADMISSION_RATE=1, ADMISSION_BURST=3
+    )
+    with app.test_request_context():
+        yield app
+        db.engine.dispose()
+
+
+# Helper function to drop the waiting room of an event that nobody visited for a while
+def drop_idle_room(store, clock, event_id):
+    clock.advance(ADMISSION_IDLE_TTL + 1)
+    if isinstance(store, admission.DatabaseAdmissionStore):
+        assert store.prune() == 1
+    else:
+        del store._rooms[event_id]
+
+
+def test_advance_refills_the_bucket_up_to_the_burst():
+    # 2 tokens left, refilled for 10 seconds at 1 per second: capped at the burst of 3
+    assert _advance(2, 10, 0, 0, 1, 3, new_ticket=False) == (3, 0, 0)
+    # Each token admits one waiting ticket, in order, and the rest keep waiting
+    assert _advance(0, 2.5, 6, 1, 1, 3, new_ticket=False) == (0.5, 6, 3)
+    # A clock going backwards refills nothing
+    assert _advance(1, -5, 1, 1, 1, 3, new_ticket=True) == (0, 2, 2)
+
+
+def test_burst_then_tickets_wait_for_refills(app, clock):
+    store = app.extensions["admission"]
+    # The burst admits the first three tickets at once
+    assert [store.take(1, new_ticket=True) for _ in range(3)] == [
+        (1, 1),
+        (2, 2),
+        (3, 3),
+    ]
+    # The next ones wait, and are admitted in order as tokens come back
+    assert store.take(1, new_ticket=True) == (4, 3)
+    assert store.take(1, new_ticket=True) == (5, 3)
+    clock.advance(1)
+    assert store.take(1, new_ticket=False) == (5, 4)
+    clock.advance(0.5)
+    assert store.take(1, new_ticket=False) == (5, 4)
+    clock.advance(0.5)
+    assert store.take(1, new_ticket=False) == (5, 5)
+    # Other events have their own room
+    assert store.take(2, new_ticket=True) == (1, 1)
+
+
+def test_waiting_position_drops_as_tokens_refill(app, clock):
+    for _ in range(3):
+        assert admit(1, seats=1) == 0
+        session.clear()
+    assert admit(1, seats=2) == 1
+    ticket = session["admission"]
+    session.clear()
+    assert admit(1, seats=1) == 2
+
+    # The same session keeps its place in line
+    assert queue_position(1) == 2
+    assert admit(1) == 2
+    clock.advance(1)
+    assert queue_position(1) == 1
+    clock.advance(1)
+    assert queue_position(1) == 0
+    assert admit(1) == 0
+    assert "admission" not in session
+
+    # The first waiting ticket was admitted by the same refills
+    session["admission"] = ticket
+    assert admit(1) == 0
+
+
+def test_stale_ticket_is_reissued(app, clock):
+    store = app.extensions["admission"]
+    for _ in range(3):
+        store.take(1, new_ticket=True)
+    assert admit(1, seats=2) == 1
+    assert session["admission"]["number"] == 4
+
+    # The new room starts from ticket 1, so ticket 4 would wait for nobody
+    drop_idle_room(store, clock, 1)
+    assert queue_position(1) == 0
+    assert "admission" not in session
+    assert store.take(1, new_ticket=False) == (1, 1)
+
+
+def test_prune_keeps_active_and_sold_out_rooms(tmp_path, clock):
+    app = make_app(tmp_path, ADMISSION_BACKEND="database")
+    store = app.extensions["admission"]
+    with app.app_context():
+        for event_id in [1, 2, 3]:
+            store.take(event_id, new_ticket=True)
+        store.mark_sold_out(2, ADMISSION_IDLE_TTL * 2)
+        clock.advance(ADMISSION_IDLE_TTL + 1)
+        store.take(3, new_ticket=False)
+
+        # Only the idle room without a sold-out mark is dropped
+        assert store.prune() == 1
+        assert store.is_sold_out(2)
+        assert store.take(3, new_ticket=True) == (2, 2)
+        assert store.take(1, new_ticket=False) == (0, 0)
+        db.engine.dispose()
@@ -0,0 +1,65 @@
+from booking import reserve_seats
+from conftest import login, make_event, make_user
+
+
+# Helper function to GET a path, then replay it with the ETag it returned
+def get_twice(client, path):
+    first = client.get(path)
+    second = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    return first, second
+
+
+def test_unchanged_responses_are_not_modified(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        event_id = make_event(organizer).id
+
+    for path in ["/api/v1/events", f"/api/v1/events/{event_id}"]:
+        first, second = get_twice(client, path)
+        assert first.status_code == 200 and first.get_json()
+        assert "no-cache" in first.headers["Cache-Control"]
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_booking_changes_the_etag(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer_id = make_user("buyer").id
+        event_id = make_event(organizer, capacity=10).id
+
+    paths = ["/api/v1/events", f"/api/v1/events/{event_id}"]
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+    with app.app_context():
+        reserve_seats(event_id, buyer_id, 3)
+
+    for path in paths:
+        response = client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etags[path]
+    event = client.get(paths[1]).get_json()["event"]
+    assert event["available_seats"] == 7
+
+
+def test_bad_date_is_rejected(client):
+    response = client.get("/api/v1/events?start_date=next-friday")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Dates must be in YYYY-MM-DD format."}
+
+
+def test_my_reservations_need_a_login(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer_id = make_user("buyer").id
+        reserve_seats(make_event(organizer).id, buyer_id, 2)
+
+    response = client.get("/api/v1/me/reservations")
+    assert response.status_code == 401
+    assert response.get_json() == {"error": "Authentication required."}
+
+    login(client, "buyer")
+    first, second = get_twice(client, "/api/v1/me/reservations")
+    assert [row["seats"] for row in first.get_json()["reservations"]] == [2]
+    assert "private" in first.headers["Cache-Control"]
+    assert second.status_code == 304
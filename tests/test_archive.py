@@ -0,0 +1,43 @@
+from models import db, ArchivedEvent, ArchivedReservation
+from booking import reserve_seats
+from archive import archive_past_events
+from conftest import login, make_event, make_user
+
+
+def test_archived_ids_are_not_reused(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        event = make_event(organizer, days=-100)
+        reservation_id = reserve_seats(event.id, buyer.id, 2).id
+        event_id = event.id
+
+        # The newest event and reservation are archived too
+        assert archive_past_events(days=30, batch_size=10) == 1
+        assert db.session.get(ArchivedEvent, event_id) is not None
+        assert db.session.get(ArchivedReservation, reservation_id) is not None
+
+        new_event = make_event(organizer)
+        assert new_event.id > event_id
+        assert reserve_seats(new_event.id, buyer.id, 1).id > reservation_id
+
+
+def test_user_profile_lists_archived_reservations_with_history(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        past = make_event(organizer, days=-100, title="Past Gig")
+        upcoming = make_event(organizer, title="Next Gig", location="Other Hall")
+        past_reservation_id = reserve_seats(past.id, buyer.id, 2).id
+        reserve_seats(upcoming.id, buyer.id, 1)
+        assert archive_past_events(days=30, batch_size=10) == 1
+    login(client, "buyer")
+
+    page = client.get("/user_profile").get_data(as_text=True)
+    assert "Next Gig" in page and "Past Gig" not in page
+
+    page = client.get("/user_profile?history=1").get_data(as_text=True)
+    assert "Next Gig" in page and "Past Gig" in page
+    # Archived reservations can no longer be edited
+    assert f"/edit_reservation/{past_reservation_id}" not in page
+    assert page.count("/edit_reservation/") == 1
@@ -0,0 +1,127 @@
+import threading
+from sqlalchemy import func
+from models import db, Event, Reservation
+from admission import is_sold_out, reopen
+from booking import cancel_reservation, change_reservation_seats, reserve_seats
+from conftest import make_app, make_event, make_user
+
+
+# Helper function to run target(index) in threads started together, each in its own
+# app context (and so its own database session)
+def run_concurrently(app, count, target):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+    errors = []
+
+    def worker(index):
+        try:
+            with app.app_context():
+                prepared = target(index)
+                barrier.wait()
+                results[index] = prepared()
+        except Exception as error:  # reported by the test below
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    return results
+
+
+# Helper function to compare an event's counter with the seats of its reservations
+def assert_counter_matches(event_id):
+    reserved = db.session.get(Event, event_id).reserved_seats
+    total = (
+        db.session.query(func.coalesce(func.sum(Reservation.seats), 0))
+        .filter(Reservation.event_id == event_id)
+        .scalar()
+    )
+    assert reserved == total
+    return reserved
+
+
+def test_last_seats_are_not_oversold(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyers = [make_user(f"buyer{i}").id for i in range(4)]
+        event_id = make_event(organizer, capacity=10).id
+
+    results = run_concurrently(
+        app,
+        30,
+        lambda i: lambda: reserve_seats(event_id, buyers[i % len(buyers)], 1),
+    )
+
+    assert sum(result is not None for result in results) == 10
+    with app.app_context():
+        assert assert_counter_matches(event_id) == 10
+
+
+def test_concurrent_edits_of_one_reservation_keep_the_counter(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        event_id = make_event(organizer, capacity=100).id
+        reservation_id = reserve_seats(event_id, buyer.id, 2).id
+
+    # Every thread reads the reservation (2 seats) before any of them writes
+    def edit(index):
+        reservation = db.session.get(Reservation, reservation_id)
+        return lambda: change_reservation_seats(reservation, 5)
+
+    assert all(run_concurrently(app, 8, edit))
+    with app.app_context():
+        assert db.session.get(Reservation, reservation_id).seats == 5
+        assert assert_counter_matches(event_id) == 5
+
+
+def test_concurrent_edits_and_cancels_of_one_reservation(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        event_id = make_event(organizer, capacity=100).id
+        reservation_id = reserve_seats(event_id, buyer.id, 2).id
+        reserve_seats(event_id, buyer.id, 3)
+
+    def edit_or_cancel(index):
+        reservation = db.session.get(Reservation, reservation_id)
+        if index % 2:
+            return lambda: cancel_reservation(reservation)
+        return lambda: change_reservation_seats(reservation, 4 + index)
+
+    results = run_concurrently(app, 8, edit_or_cancel)
+
+    # The reservation is cancelled exactly once, whatever ran before
+    assert sum(results[index] for index in range(1, 8, 2)) == 1
+    with app.app_context():
+        assert db.session.get(Reservation, reservation_id) is None
+        assert assert_counter_matches(event_id) == 3
+
+
+def test_refused_booking_renews_the_sold_out_mark(tmp_path):
+    app = make_app(tmp_path, ADMISSION_BACKEND="memory")
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        event_id = make_event(organizer, capacity=2).id
+        reservation = reserve_seats(event_id, buyer.id, 1)
+        assert not is_sold_out(event_id)
+
+        assert reserve_seats(event_id, buyer.id, 1) is not None
+        assert is_sold_out(event_id)
+
+        # Once the mark has expired, the next refused booking sets it again
+        reopen(event_id)
+        assert reserve_seats(event_id, buyer.id, 1) is None
+        assert is_sold_out(event_id)
+
+        reopen(event_id)
+        assert not change_reservation_seats(reservation, 2)
+        assert is_sold_out(event_id)
+
+        assert cancel_reservation(reservation)
+        assert not is_sold_out(event_id)
+        db.engine.dispose()
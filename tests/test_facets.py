@@ -0,0 +1,48 @@
+import re
+from conftest import make_event, make_user
+
+
+# Helper function to read the (label, selected) options of the first type dropdown
+def type_options(page):
+    select = re.search(r'<select name="event_type".*?</select>', page, re.S).group(0)
+    return [
+        (" ".join(label.split()), bool(selected.strip()))
+        for selected, label in re.findall(
+            r"<option value=\"[^\"]+\"\s*(selected)?\s*>(.*?)</option>", select, re.S
+        )
+    ]
+
+
+def test_type_dropdown_lists_matching_types(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, event_type="Concert", location="Cork")
+        make_event(organizer, event_type="Sport", location="Galway", days=31)
+        make_event(organizer, event_type="Sport", location="Galway", days=32)
+
+    page = client.get("/events").get_data(as_text=True)
+    assert type_options(page) == [("Concert (1)", False), ("Sport (2)", False)]
+
+    page = client.get("/events?location=Galway").get_data(as_text=True)
+    assert type_options(page) == [("Sport (2)", False)]
+
+    # The selected type stays listed when nothing matches it
+    page = client.get("/events?location=Galway&event_type=Concert").get_data(
+        as_text=True
+    )
+    assert type_options(page) == [("Concert (0)", True), ("Sport (2)", False)]
+
+
+def test_events_without_a_type_are_counted(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, title="Typed", event_type="Concert", location="Cork")
+        make_event(organizer, title="Untyped", event_type=None, days=31)
+        make_event(organizer, title="Blank", event_type="", days=32)
+
+    response = client.get("/events")
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    # Type-less events are listed and counted, but not offered as a type
+    assert type_options(page) == [("Concert (1)", False)]
+    assert all(title in page for title in ("Typed", "Untyped", "Blank"))
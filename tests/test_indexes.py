@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import event as sa_event
+from models import db
+from booking import reserve_seats
+from conftest import login, make_event, make_user
+
+
+@pytest.fixture
+def listings(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        for day in range(1, 11):
+            event = make_event(
+                organizer,
+                days=day,
+                event_type=["Concert", "Sport"][day % 2],
+                location=f"Hall {day}",
+            )
+            reserve_seats(event.id, buyer.id, 1)
+
+
+# Helper function to run EXPLAIN QUERY PLAN on every SELECT a request runs, with the
+# parameters it ran with. Returns one plan (a list of detail strings) per statement.
+def request_plans(app, client, path):
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sa_event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get(path).status_code == 200
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", record)
+
+    with engine.connect() as connection:
+        return [
+            [
+                row[3]
+                for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            ]
+            for statement, parameters in statements
+        ]
+
+
+# Helper function to tell whether any step of any plan searches with an index
+def uses_index(plans, index):
+    return any(
+        step.startswith("SEARCH") and f"INDEX {index} " in f"{step} "
+        for plan in plans
+        for step in plan
+    )
+
+
+@pytest.mark.parametrize(
+    "user, path, index",
+    [
+        (None, "/events?event_type=Sport", "ix_event_event_type_event_date"),
+        (None, "/events?start_date=2000-01-01", "ix_event_event_date_start_time"),
+        ("buyer", "/user_profile", "ix_reservation_user_id_date"),
+        ("organizer", "/business_profile", "ix_event_organizer_id_event_date"),
+        ("organizer", "/business_profile", "ix_reservation_event_id"),
+    ],
+)
+def test_listing_queries_search_by_index(app, client, listings, user, path, index):
+    if user:
+        login(client, user)
+    plans = request_plans(app, client, path)
+    assert uses_index(plans, index), plans
@@ -0,0 +1,114 @@
+import json
+from datetime import datetime, timedelta
+from models import db, Job
+from booking import reserve_seats
+from jobs import HANDLERS, claim_jobs, complete_jobs, enqueue, fail_job, queue_depth
+from notifications import fan_out_reminders, schedule_reminders
+from conftest import make_app, make_event, make_user, run_jobs
+
+
+# Helper function to make a job due now, whatever its backoff
+def make_due(job_id):
+    db.session.get(Job, job_id).run_at = datetime.utcnow()
+    db.session.commit()
+
+
+def test_claim_and_complete(app):
+    with app.app_context():
+        jobs = [
+            enqueue("a", {"n": 1}),
+            enqueue("b", {"n": 2}, dedupe_key="b:2"),
+            enqueue("c", {"n": 3}, run_at=datetime.utcnow() + timedelta(hours=1)),
+        ]
+        db.session.commit()
+        first_id, second_id, _ = [job.id for job in jobs]
+
+        rows = claim_jobs("worker", limit=10, lock_timeout=300)
+        assert [(row.kind, row.payload) for row in rows] == [
+            ("a", {"n": 1}),
+            ("b", {"n": 2}),
+        ]
+        assert db.session.get(Job, first_id).status == "running"
+        assert db.session.get(Job, first_id).attempts == 1
+        # Running jobs are not claimed again until their lock times out
+        assert claim_jobs("other", limit=10, lock_timeout=300) == []
+        assert len(claim_jobs("other", limit=1, lock_timeout=0)) == 1
+
+        complete_jobs([first_id, second_id])
+        # Jobs with a dedupe key are kept as done, the others are deleted
+        db.session.expire_all()
+        assert db.session.get(Job, first_id) is None
+        assert db.session.get(Job, second_id).status == "done"
+        assert queue_depth() == {"done": 1, "pending": 1}
+
+
+def test_failed_jobs_are_retried_with_backoff(app):
+    with app.app_context():
+        job = enqueue("a", {})
+        db.session.commit()
+        job_id = job.id
+
+        delays = []
+        for attempt in range(3):
+            claim_jobs("worker", limit=1, lock_timeout=300)
+            started = datetime.utcnow()
+            error = ValueError(f"boom {attempt}")
+            fail_job(job_id, error, max_attempts=3, retry_delay=30)
+            job = db.session.get(Job, job_id)
+            delays.append(round((job.run_at - started).total_seconds()))
+            make_due(job_id)
+
+        job = db.session.get(Job, job_id)
+        assert job.status == "failed" and job.attempts == 3
+        assert job.last_error == "boom 2"
+        assert job.locked_by is None
+        # 30 s then 60 s of backoff, and no retry after the last attempt
+        assert delays[:2] == [30, 60]
+
+
+def test_run_batch_retries_failing_handlers(app, tmp_path, monkeypatch):
+    def explode(payload):
+        raise RuntimeError("no luck")
+
+    monkeypatch.setitem(HANDLERS, "explode", explode)
+    with app.app_context():
+        job = enqueue("explode", {})
+        db.session.commit()
+        job_id = job.id
+
+        assert run_jobs(app, tmp_path / "outbox") == 1
+        job = db.session.get(Job, job_id)
+        assert job.status == "pending" and job.attempts == 1
+        assert job.last_error == "no luck"
+        assert job.run_at > datetime.utcnow()
+
+
+def test_reminders_fan_out_in_chunks(tmp_path):
+    app = make_app(tmp_path, REMINDER_CHUNK_SIZE=2)
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        tomorrow = datetime.utcnow().date() + timedelta(days=1)
+        event_id = make_event(organizer, event_date=tomorrow).id
+        for number in range(5):
+            reserve_seats(event_id, make_user(f"buyer{number}").id, 1)
+        run_jobs(app, tmp_path / "outbox")
+
+        schedule_reminders()
+        schedule_reminders()
+        assert queue_depth() == {"pending": 1}
+
+        # The event's five reservations are split into chunks of two
+        [job] = claim_jobs("worker", limit=10, lock_timeout=300)
+        fan_out_reminders(job.payload)
+        complete_jobs([job.id])
+        chunks = [
+            (job.payload["first_id"], job.payload["last_id"])
+            for job in Job.query.filter_by(kind="send_reminders").order_by(Job.id)
+        ]
+        assert chunks == [(1, 2), (3, 4), (5, 5)]
+
+        assert run_jobs(app, tmp_path / "outbox") == 3
+        with open(tmp_path / "outbox" / "outbox.jsonl") as outbox:
+            subjects = [json.loads(line)["subject"] for line in outbox]
+        assert subjects.count("Reminder: Test Event is tomorrow") == 5
+        db.engine.dispose()
@@ -0,0 +1,24 @@
+from models import Event
+from pagination import cached_count
+from conftest import make_app, make_event, make_user
+
+
+def test_keyset_totals_are_kept_in_a_bounded_cache(tmp_path):
+    app = make_app(tmp_path, COUNT_CACHE_SIZE=2)
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        for event_type in ("Concert", "Sport", "Theatre"):
+            make_event(organizer, event_type=event_type, location=None)
+
+        def count(event_type):
+            return cached_count(Event.query.filter_by(event_type=event_type))
+
+        assert [count(name) for name in ("Concert", "Sport", "Theatre")] == [1, 1, 1]
+        for event_type in ("Concert", "Theatre"):
+            make_event(organizer, event_type=event_type, location=None)
+
+        # Theatre is still cached, Concert was evicted by the two newer totals
+        assert count("Theatre") == 1
+        assert count("Concert") == 2
+        app.extensions["counts"].clear()
+        assert count("Theatre") == 2
@@ -0,0 +1,59 @@
+import pytest
+from models import db, User
+from passwords import hash_password, verify_password
+from conftest import TEST_PASSWORD, login, make_app, make_user
+
+pytest.importorskip("bcrypt")
+
+# Lowest bcrypt cost, to keep the tests fast
+BCRYPT_METHOD = "bcrypt:4"
+
+# 128 characters (the most register accepts) and 256 bytes in UTF-8
+LONG_PASSWORD = "pässwörd" * 16
+
+
+def test_bcrypt_hashes_passwords_over_72_bytes():
+    password_hash = hash_password(LONG_PASSWORD, BCRYPT_METHOD)
+    assert verify_password(password_hash, LONG_PASSWORD)
+    # Passwords that only differ after the 72nd byte are still told apart
+    assert not verify_password(password_hash, LONG_PASSWORD[:-1] + "x")
+
+
+def test_register_and_login_with_a_long_password(tmp_path):
+    app = make_app(tmp_path, PASSWORD_HASH_METHOD=BCRYPT_METHOD)
+    client = app.test_client()
+    response = client.post(
+        "/register",
+        data={
+            "username": "long",
+            "email": "long@example.com",
+            "password": LONG_PASSWORD,
+        },
+    )
+    assert response.headers["Location"].endswith("/login")
+
+    response = client.post("/login", data={"login": "long", "password": LONG_PASSWORD})
+    assert response.headers["Location"].endswith("/")
+    with client.session_transaction() as session:
+        assert session["user_id"]
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_login_rehashes_when_the_method_changes(app, client):
+    with app.app_context():
+        make_user("member")
+    app.config["PASSWORD_HASH_METHOD"] = BCRYPT_METHOD
+
+    login(client, "member")
+    with app.app_context():
+        password_hash = User.query.filter_by(username="member").one().password_hash
+    assert password_hash.startswith("$2b$04$")
+
+    # The new hash is kept, and the password still works with it
+    client.get("/logout")
+    login(client, "member")
+    with app.app_context():
+        user = User.query.filter_by(username="member").one()
+        assert user.password_hash == password_hash
+        assert user.check_password(TEST_PASSWORD)
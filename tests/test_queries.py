@@ -0,0 +1,84 @@
+import pytest
+from models import db
+from booking import reserve_seats
+from querycount import max_queries
+from conftest import login, make_event, make_user
+
+
+@pytest.fixture
+def listings(app):
+    """
+    Enough events and reservations that a query per row would break the limits.
+    """
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        event_ids = [
+            make_event(
+                organizer,
+                days=day,
+                title=f"Event {day}",
+                event_type=["Concert", "Sport"][day % 2],
+                location=f"Hall {day % 3}",
+            ).id
+            for day in range(1, 21)
+        ]
+        for event_id in event_ids[:12]:
+            reserve_seats(event_id, buyer.id, 1)
+        return event_ids
+
+
+# Helper function to request a page twice and count the queries of the second request,
+# once the keyset page totals are in the count cache. The page and facet caches are
+# off in the tests, so every listing and facet query still runs.
+def assert_max_queries(app, client, path, limit):
+    assert client.get(path).status_code == 200
+    with app.app_context():
+        engine = db.engine
+    with max_queries(engine, limit):
+        assert client.get(path).status_code == 200
+
+
+@pytest.mark.parametrize(
+    "path, limit",
+    [
+        ("/", 1),
+        # Page and total in one statement, plus the grouped facet counts
+        ("/events", 2),
+        ("/events?event_type=Sport&search=event", 2),
+        ("/events?page=2", 2),
+        ("/events?cursor=", 2),
+    ],
+)
+def test_public_pages(app, client, listings, path, limit):
+    assert_max_queries(app, client, path, limit)
+
+
+@pytest.mark.parametrize(
+    "path, limit",
+    [
+        # The logged-in user comes from the session, not from a query
+        ("/user_profile", 1),
+        ("/user_profile?history=1", 2),
+        ("/", 1),
+        ("/events", 2),
+    ],
+)
+def test_user_pages(app, client, listings, path, limit):
+    login(client, "buyer")
+    assert_max_queries(app, client, path, limit)
+
+
+@pytest.mark.parametrize(
+    "path, limit",
+    [
+        # The event page, its reservations, the stats rows and the seats sold per type
+        ("/business_profile", 3),
+        ("/business_profile?history=1", 4),
+        ("/create_event", 0),
+        ("/edit_event/{event_id}", 2),
+    ],
+)
+def test_business_pages(app, client, listings, path, limit):
+    login(client, "organizer")
+    assert_max_queries(app, client, path.format(event_id=listings[0]), limit)
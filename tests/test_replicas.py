@@ -0,0 +1,52 @@
+import sqlite3
+from models import db, Reservation
+from querycount import QueryCounter
+from conftest import login, make_app, make_event, make_user
+
+
+def test_reads_use_the_replica_until_the_user_writes(tmp_path):
+    # The replica is a copy of the primary taken before "Fresh Gig" was added
+    primary = make_app(tmp_path)
+    with primary.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_user("buyer")
+        event_id = make_event(organizer, title="Copied Gig").id
+        # Copied with the backup API, which includes the pages still in the WAL
+        source = sqlite3.connect(tmp_path / "test.db")
+        copy = sqlite3.connect(tmp_path / "replica.db")
+        source.backup(copy)
+        source.close()
+        copy.close()
+        make_event(make_user("late"), title="Fresh Gig", days=40)
+        db.engine.dispose()
+
+    app = make_app(
+        tmp_path, SQLALCHEMY_REPLICA_URIS=[f"sqlite:///{tmp_path / 'replica.db'}"]
+    )
+    client = app.test_client()
+    login(client, "buyer")
+    with app.app_context():
+        replica = db.engines["replica_0"]
+
+    with QueryCounter(replica) as replica_reads:
+        page = client.get("/events").get_data(as_text=True)
+    assert replica_reads.count
+    assert "Copied Gig" in page and "Fresh Gig" not in page
+
+    # Booking writes to the primary, and pins this session's reads to it
+    with QueryCounter(replica) as replica_reads:
+        client.post(f"/reserve/{event_id}", data={"seats": "2"})
+        page = client.get("/events").get_data(as_text=True)
+    assert not replica_reads.count
+    assert "Fresh Gig" in page
+    with app.app_context():
+        assert db.session.query(Reservation.seats).scalar() == 2
+
+    # Other sessions still read from the replica
+    with QueryCounter(replica) as replica_reads:
+        page = app.test_client().get("/events").get_data(as_text=True)
+    assert replica_reads.count
+    assert "Fresh Gig" not in page
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
@@ -0,0 +1,108 @@
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from models import db, Event
+from bulk import import_events
+from scheduling import find_conflicts
+from conftest import login, make_event, make_user
+
+DAY = date.today() + timedelta(days=30)
+
+
+# Helper function to check a slot at Test Hall, from HH:MM on DAY (plus days)
+def conflicts_at(start, minutes, days=0, **options):
+    starts_at = datetime.combine(DAY + timedelta(days=days), time.fromisoformat(start))
+    ends_at = starts_at + timedelta(minutes=minutes)
+    return [
+        row.title
+        for row in find_conflicts("Test Hall", starts_at, ends_at, **options)
+    ]
+
+
+def test_overlap_at_the_same_venue(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, title="Gig")  # 20:00 to 22:00
+        make_event(organizer, title="Elsewhere", location="Other Hall")
+
+        assert conflicts_at("21:00", 120) == ["Gig"]
+        assert conflicts_at("19:00", 300) == ["Gig"]
+        assert conflicts_at("20:30", 30) == ["Gig"]
+
+
+def test_back_to_back_events_do_not_conflict(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, title="Gig")  # 20:00 to 22:00
+
+        assert conflicts_at("22:00", 60) == []
+        assert conflicts_at("18:00", 120) == []
+        assert conflicts_at("21:59", 60) == ["Gig"]
+
+
+def test_events_spanning_midnight_and_several_days(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, title="Late Show", start_time=time(23, 0), duration=180)
+        make_event(
+            organizer,
+            title="Festival",
+            days=40,
+            start_time=time(10, 0),
+            duration=3 * 24 * 60,
+        )
+
+        assert conflicts_at("01:00", 60, days=1) == ["Late Show"]
+        assert conflicts_at("02:00", 60, days=1) == []
+        # Started two days before the slot and still running
+        assert conflicts_at("12:00", 60, days=12) == ["Festival"]
+        assert conflicts_at("10:00", 60, days=13) == []
+
+
+def test_edit_does_not_conflict_with_itself(app, client):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        event_id = make_event(organizer, title="Gig").id
+        assert conflicts_at("20:00", 120, exclude_id=event_id) == []
+    login(client, "organizer")
+
+    response = client.post(
+        f"/edit_event/{event_id}",
+        data={
+            "title": "Gig",
+            "description": "Now half an hour longer.",
+            "location": "Test Hall",
+            "event_date": DAY.isoformat(),
+            "start_time": "20:00",
+            "duration": "150",
+            "capacity": "100",
+        },
+    )
+    assert response.headers["Location"].endswith("/business_profile")
+    with app.app_context():
+        assert db.session.get(Event, event_id).duration == 150
+
+
+def test_import_rejects_overlaps_within_one_batch(app):
+    with app.app_context():
+        organizer_id = make_user("organizer", is_business=True).id
+        rows = [
+            {
+                "title": title,
+                "description": "Imported.",
+                "event_date": DAY.isoformat(),
+                "start_time": start_time,
+                "duration": "120",
+                "capacity": "50",
+                "event_type": "Concert",
+                "location": "Test Hall",
+            }
+            for title, start_time in [("First", "20:00"), ("Second", "21:00")]
+        ]
+        stream = io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+        report = import_events(stream, "jsonl", organizer_id, batch_size=10)
+
+        assert report["imported"] == 1 and report["rejected"] == 1
+        assert report["errors"] == [(2, "Overlaps line 1 at Test Hall.")]
+        assert db.session.query(Event.title).scalar() == "First"
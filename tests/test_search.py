@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from models import db, Event
+from helpers import filter_events
+from conftest import make_event, make_user
+
+
+@pytest.fixture
+def events(app):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        make_event(organizer, title="Jazz Night", location="Cork")
+        make_event(organizer, title="Jazz Brunch", event_type="Festival", location=None)
+        make_event(organizer, title="Rock Show", location="Galway")
+
+
+@pytest.mark.parametrize("mode", ["full_text", "like"])
+def test_search_filters_events(app, client, events, mode):
+    app.config["SEARCH_MODE"] = mode
+
+    page = client.get("/events?search=jazz").get_data(as_text=True)
+    assert "Jazz Night" in page and "Jazz Brunch" in page
+    assert "Rock Show" not in page
+
+    page = client.get("/events?search=jazz&event_type=Concert").get_data(as_text=True)
+    assert "Jazz Night" in page
+    assert "Jazz Brunch" not in page and "Rock Show" not in page
+
+
+def test_full_text_matches_are_read_once(app, events):
+    with app.test_request_context():
+        query = filter_events(
+            db.session.query(Event), {"search": "jazz", "event_type": "Concert"}
+        )
+        statement = query.statement.compile(
+            db.engine, compile_kwargs={"literal_binds": True}
+        )
+        plan = [
+            row[3]
+            for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {statement}"))
+        ]
+    assert "MATERIALIZE event_matches" in plan
@@ -0,0 +1,91 @@
+import pytest
+from models import db
+from conftest import login, make_app, make_user
+
+
+@pytest.fixture(params=["memory", "database"])
+def app(request, tmp_path):
+    app = make_app(tmp_path, SESSION_BACKEND=request.param)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+# Helper function to read the session id the client holds
+def session_id(client):
+    cookie = client.get_cookie("session")
+    return cookie.value if cookie is not None else None
+
+
+# Helper function to tell whether a client is logged in, from a login-only page
+def logged_in(client):
+    return client.get("/user_profile").status_code == 200
+
+
+def test_login_keeps_only_an_id_in_the_cookie(app, client):
+    with app.app_context():
+        user_id = make_user("member").id
+    login(client, "member")
+
+    sid = session_id(client)
+    assert len(sid) == 43
+    assert logged_in(client)
+    with app.app_context():
+        assert f'"user_id":{user_id}' in app.session_interface.store.load(sid)
+
+
+def test_login_rotates_the_session_id(app, client):
+    with app.app_context():
+        make_user("member")
+    # The flashed "please log in" message starts an anonymous session
+    assert not logged_in(client)
+    anonymous_sid = session_id(client)
+    assert anonymous_sid
+
+    login(client, "member")
+    assert session_id(client) != anonymous_sid
+    with app.app_context():
+        assert app.session_interface.store.load(anonymous_sid) is None
+
+    # A session id planted before the login is of no use afterwards
+    other = app.test_client()
+    other.set_cookie("session", anonymous_sid)
+    assert not logged_in(other)
+
+
+def test_logout_invalidates_the_session(app, client):
+    with app.app_context():
+        make_user("member")
+    login(client, "member")
+    sid = session_id(client)
+
+    client.get("/logout")
+    assert not logged_in(client)
+    # A copy of the cookie taken while logged in no longer works
+    other = app.test_client()
+    other.set_cookie("session", sid)
+    assert not logged_in(other)
+
+
+def test_set_role_logs_the_user_out_everywhere(app, client):
+    with app.app_context():
+        user_id = make_user("member").id
+        make_user("bystander")
+    login(client, "member")
+    second_device = app.test_client()
+    login(second_device, "member")
+    bystander = app.test_client()
+    login(bystander, "bystander")
+
+    result = app.test_cli_runner().invoke(
+        args=["set-role", str(user_id), "business", "--company-name", "Member Ltd"]
+    )
+    assert result.exit_code == 0, result.output
+
+    assert not logged_in(client)
+    assert not logged_in(second_device)
+    assert logged_in(bystander)
+
+    # The new role applies from the next login
+    login(client, "member")
+    assert client.get("/business_profile").status_code == 200
@@ -0,0 +1,114 @@
+import io
+import json
+from datetime import date, timedelta
+from models import db, Event
+from booking import cancel_reservation, reserve_seats
+from bulk import import_events
+from querycount import QueryCounter
+from stats import count_seats, organizer_dashboard, refresh_stats
+from conftest import login, make_event, make_user, run_jobs
+
+
+# Helper function to build the create/edit event form
+def event_form(days=30, **fields):
+    form = {
+        "title": "Form Event",
+        "description": "Created through the form.",
+        "location": f"Hall {days}",
+        "event_date": (date.today() + timedelta(days=days)).isoformat(),
+        "start_time": "20:00",
+        "duration": "120",
+        "capacity": "100",
+        "event_type": "Concert",
+    }
+    form.update(fields)
+    return form
+
+
+def test_event_changes_keep_the_stats_exact(app, client):
+    with app.app_context():
+        organizer_id = make_user("organizer", is_business=True).id
+    login(client, "organizer")
+
+    client.post("/create_event", data=event_form(days=10))
+    client.post("/create_event", data=event_form(days=11, event_type="Sport"))
+    with app.app_context():
+        event_id = db.session.query(Event.id).filter_by(event_type="Concert").scalar()
+    client.post(f"/edit_event/{event_id}", data=event_form(days=10, capacity="250"))
+
+    lines = [
+        json.dumps({**event_form(days=20 + day), "event_type": event_type})
+        for day, event_type in enumerate(["Concert", "Concert", "Theatre"])
+    ]
+    with app.app_context():
+        report = import_events(
+            io.BytesIO("\n".join(lines).encode()), "jsonl", organizer_id, batch_size=2
+        )
+        assert report["imported"] == 3
+
+        totals = organizer_dashboard(organizer_id)["totals"]
+        assert totals["events"] == 5 and totals["capacity"] == 650
+        # Nothing left for a full rebuild to repair
+        assert refresh_stats(organizer_id) == 0
+
+
+def test_bookings_are_counted_by_the_worker(app, tmp_path):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        buyer = make_user("buyer")
+        full_id = make_event(organizer, capacity=2).id
+        other_id = make_event(organizer, capacity=10, days=40, event_type="Sport").id
+        refresh_stats()
+        db.session.commit()
+
+        with QueryCounter(db.engine) as bookings:
+            reserve_seats(full_id, buyer.id, 2)
+            reservation = reserve_seats(other_id, buyer.id, 3)
+            cancel_reservation(reservation)
+            reserve_seats(other_id, buyer.id, 1)
+        assert not [s for s in bookings.statements if "organizer_stats" in s]
+        assert organizer_dashboard(organizer.id)["totals"]["seats_sold"] == 0
+
+        # Three confirmations and four count_seats jobs, the latter claimed together
+        # and added with one upsert per event type
+        with QueryCounter(db.engine) as worker:
+            assert run_jobs(app, tmp_path / "outbox") == 7
+        upserts = [s for s in worker.statements if "INSERT INTO organizer_stats" in s]
+        assert len(upserts) == 2
+
+        dashboard = organizer_dashboard(organizer.id)
+        assert dashboard["totals"]["seats_sold"] == 3
+        assert dashboard["totals"]["sold_out_events"] == 1
+        assert dashboard["totals"]["occupancy"] == 25.0
+        assert [row["seats_sold"] for row in dashboard["types"]] == [2, 1]
+
+        # Counting an event again adds nothing, and a rebuild has nothing to repair
+        count_seats([{"event_id": full_id}])
+        assert organizer_dashboard(organizer.id) == dashboard
+        assert refresh_stats(organizer.id) == 0
+
+
+def test_dashboard_reads_only_the_stats_rows(app, tmp_path):
+    with app.app_context():
+        organizer = make_user("organizer", is_business=True)
+        organizer_id, buyer_id = organizer.id, make_user("buyer").id
+        event_types = ["Concert", "Sport"]
+        event_ids = [
+            make_event(organizer, days=10 + day, event_type=event_types[day % 2]).id
+            for day in range(30)
+        ]
+        refresh_stats()
+        db.session.commit()
+        for day, event_id in enumerate(event_ids):
+            reserve_seats(event_id, buyer_id, 1 + day % 3)
+        run_jobs(app, tmp_path / "outbox")
+
+        with QueryCounter(db.engine) as counter:
+            dashboard = organizer_dashboard(organizer_id)
+        assert counter.count == 1, counter.statements
+        assert "organizer_stats" in counter.statements[0]
+        assert " event" not in counter.statements[0].replace("event_type", "")
+        # One row per event type, whatever the number of events
+        assert [row["event_type"] for row in dashboard["types"]] == ["Concert", "Sport"]
+        assert dashboard["totals"]["events"] == 30
+        assert dashboard["totals"]["seats_sold"] == 60